@@ -0,0 +1,52 @@
+"""create estatisticas_estabelecimentos rollup table
+
+Revision ID: 20261019_1000
+Revises: 20251127_0730
+Create Date: 2026-10-19 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_1000'
+down_revision = '20251127_0730'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'estatisticas_estabelecimentos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('nivel', sa.String(length=32), nullable=False),
+        sa.Column('uf', sa.String(length=2), nullable=True),
+        sa.Column('municipio', sa.String(length=4), nullable=True),
+        sa.Column('cnae_fiscal_principal', sa.String(length=7), nullable=True),
+        sa.Column('situacao_cadastral', sa.String(length=2), nullable=True),
+        sa.Column('porte_empresa', sa.String(length=2), nullable=True),
+        sa.Column('opcao_simples', sa.String(length=1), nullable=True),
+        sa.Column('opcao_mei', sa.String(length=1), nullable=True),
+        sa.Column('total', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        comment='Rollups de estabelecimentos por UF, município, CNAE, situação, porte, Simples e MEI'
+    )
+    op.create_index(
+        'idx_estatisticas_nivel_uf_municipio',
+        'estatisticas_estabelecimentos',
+        ['nivel', 'uf', 'municipio', 'cnae_fiscal_principal'],
+        unique=False
+    )
+    op.create_index(
+        'idx_estatisticas_nivel_cnae',
+        'estatisticas_estabelecimentos',
+        ['nivel', 'cnae_fiscal_principal', 'uf'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_estatisticas_nivel_cnae', table_name='estatisticas_estabelecimentos')
+    op.drop_index('idx_estatisticas_nivel_uf_municipio', table_name='estatisticas_estabelecimentos')
+    op.drop_table('estatisticas_estabelecimentos')
@@ -0,0 +1,43 @@
+"""add estabelecimentos.cnaes generated array with GIN index
+
+Revision ID: 20261019_1100
+Revises: 20261019_1000
+Create Date: 2026-10-19 11:00:00
+
+NOTE: adding a stored generated column rewrites estabelecimentos.
+Run during the maintenance window (or right before a fresh load).
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_1100'
+down_revision = '20261019_1000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        ALTER TABLE estabelecimentos
+        ADD COLUMN cnaes integer[]
+        GENERATED ALWAYS AS (
+            array_remove(string_to_array(
+                coalesce(cnae_fiscal_principal, '') || ',' || coalesce(cnae_fiscal_secundaria, ''), ','
+            ), '')::integer[]
+        ) STORED
+    """)
+    op.execute("COMMENT ON COLUMN estabelecimentos.cnaes IS 'CNAE principal + secundários como inteiros (gerado, indexado com GIN)'")
+    op.create_index(
+        'idx_estabelecimentos_cnaes',
+        'estabelecimentos',
+        ['cnaes'],
+        unique=False,
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_estabelecimentos_cnaes', table_name='estabelecimentos')
+    op.drop_column('estabelecimentos', 'cnaes')
@@ -0,0 +1,31 @@
+"""create cnpj_documentos table
+
+Revision ID: 20261019_1200
+Revises: 20261019_1100
+Create Date: 2026-10-19 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_1200'
+down_revision = '20261019_1100'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'cnpj_documentos',
+        sa.Column('cnpj_completo', sa.String(length=14), nullable=False),
+        sa.Column('documento', postgresql.JSON(astext_type=sa.Text()), nullable=False),
+        sa.Column('atualizado_em', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('cnpj_completo', name='cnpj_documentos_pkey')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('cnpj_documentos')
@@ -0,0 +1,57 @@
+"""store api keys as keyed hashes
+
+Revision ID: 20261019_1300
+Revises: 20261019_1200
+Create Date: 2026-10-19 13:00:00
+
+Existing plaintext keys are hashed in place (HMAC-SHA256 with SECRET_KEY),
+so they keep working; the plaintext column is dropped.
+
+"""
+import hashlib
+import hmac
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_1300'
+down_revision = '20261019_1200'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('api_keys', sa.Column('key_hash', sa.String(length=64), nullable=True))
+    op.add_column('api_keys', sa.Column('key_prefix', sa.String(length=16), nullable=True))
+
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, key FROM api_keys")).fetchall()
+    for key_id, key in rows:
+        key_hash = hmac.new(
+            settings.SECRET_KEY.encode('utf-8'), key.encode('utf-8'), hashlib.sha256
+        ).hexdigest()
+        conn.execute(
+            sa.text("UPDATE api_keys SET key_hash = :key_hash, key_prefix = :key_prefix WHERE id = :id"),
+            {"key_hash": key_hash, "key_prefix": key[:12], "id": key_id}
+        )
+
+    op.alter_column('api_keys', 'key_hash', nullable=False)
+    op.alter_column('api_keys', 'key_prefix', nullable=False)
+    op.create_index('ix_api_keys_key_hash', 'api_keys', ['key_hash'], unique=True)
+    op.drop_index('ix_api_keys_key', table_name='api_keys')
+    op.drop_column('api_keys', 'key')
+
+
+def downgrade() -> None:
+    # Plaintext keys cannot be recovered; existing keys must be reissued
+    op.add_column('api_keys', sa.Column('key', sa.String(), nullable=True))
+    op.execute("UPDATE api_keys SET key = key_hash")
+    op.alter_column('api_keys', 'key', nullable=False)
+    op.create_index('ix_api_keys_key', 'api_keys', ['key'], unique=True)
+    op.drop_index('ix_api_keys_key_hash', table_name='api_keys')
+    op.drop_column('api_keys', 'key_prefix')
+    op.drop_column('api_keys', 'key_hash')
@@ -0,0 +1,27 @@
+"""add subscriptions.queries_period_start
+
+Revision ID: 20261019_1400
+Revises: 20261019_1300
+Create Date: 2026-10-19 14:00:00
+
+queries_used now counts the month starting at queries_period_start;
+the metering flush resets it when a new month begins.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_1400'
+down_revision = '20261019_1300'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('subscriptions', sa.Column('queries_period_start', sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('subscriptions', 'queries_period_start')
@@ -0,0 +1,47 @@
+"""create etl_checkpoints table
+
+Revision ID: 20261019_1500
+Revises: 20261019_1400
+Create Date: 2026-10-19 15:00:00
+
+Per-file ETL progress (downloaded, extracted, loaded, indexed) so a
+failed job can be resumed without reloading completed files.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_1500'
+down_revision = '20261019_1400'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'etl_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.String(), nullable=False),
+        sa.Column('zip_file', sa.String(), nullable=False),
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('stage', sa.String(), nullable=False),
+        sa.Column('zip_bytes', sa.BigInteger(), nullable=True),
+        sa.Column('rows_loaded', sa.BigInteger(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error_message', sa.String(), nullable=True),
+        sa.Column('loaded_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('job_id', 'zip_file', name='uq_etl_checkpoints_job_file'),
+    )
+    op.create_index('ix_etl_checkpoints_id', 'etl_checkpoints', ['id'], unique=False)
+    op.create_index('ix_etl_checkpoints_job_id', 'etl_checkpoints', ['job_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_etl_checkpoints_job_id', table_name='etl_checkpoints')
+    op.drop_index('ix_etl_checkpoints_id', table_name='etl_checkpoints')
+    op.drop_table('etl_checkpoints')
@@ -0,0 +1,29 @@
+"""add etl_status control columns
+
+Revision ID: 20261019_1600
+Revises: 20261019_1500
+Create Date: 2026-10-19 16:00:00
+
+control_command (pause/cancel) and max_parallel_copies (throttle) are
+written by the API and polled by the ETL worker between files.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_1600'
+down_revision = '20261019_1500'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('etl_status', sa.Column('control_command', sa.String(), nullable=True))
+    op.add_column('etl_status', sa.Column('max_parallel_copies', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('etl_status', 'max_parallel_copies')
+    op.drop_column('etl_status', 'control_command')
@@ -0,0 +1,33 @@
+"""add etl_status throughput columns
+
+Revision ID: 20261019_1800
+Revises: 20261019_1600
+Create Date: 2026-10-19 18:00:00
+
+Byte counters and records/bytes per second written by the worker's
+progress reporter; the ETA is derived from bytes instead of files.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261019_1800'
+down_revision = '20261019_1600'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('etl_status', sa.Column('bytes_total', sa.BigInteger(), nullable=True))
+    op.add_column('etl_status', sa.Column('bytes_processed', sa.BigInteger(), nullable=True))
+    op.add_column('etl_status', sa.Column('records_per_second', sa.Float(), nullable=True))
+    op.add_column('etl_status', sa.Column('bytes_per_second', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('etl_status', 'bytes_per_second')
+    op.drop_column('etl_status', 'records_per_second')
+    op.drop_column('etl_status', 'bytes_processed')
+    op.drop_column('etl_status', 'bytes_total')
@@ -3,15 +3,24 @@ API v1 Router
 Aggregates all API endpoints
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
-from app.api.v1.endpoints import health, cnpj, auth, cnpj_insights, etl
+from app.api.v1.endpoints import health, cnpj, auth, cnpj_insights, etl, estatisticas, export
+from app.core.deps import require_quota
+from app.core.generation import conditional_get
 
 api_router = APIRouter()
 
 # Include endpoint routers
 api_router.include_router(health.router, tags=["health"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
-api_router.include_router(cnpj.router, prefix="/cnpj", tags=["cnpj"])
-api_router.include_router(cnpj_insights.router, prefix="/insights", tags=["insights"])
+
+# Data endpoints: each request counts against the plan's monthly limit
+# CNPJ data and insights also answer conditional GETs for the loaded generation
+metered = [Depends(require_quota)]
+cacheable = metered + [Depends(conditional_get)]
+api_router.include_router(cnpj.router, prefix="/cnpj", tags=["cnpj"], dependencies=cacheable)
+api_router.include_router(cnpj_insights.router, prefix="/insights", tags=["insights"], dependencies=cacheable)
+api_router.include_router(estatisticas.router, prefix="/stats", tags=["stats"], dependencies=metered)
+api_router.include_router(export.router, prefix="/export", tags=["export"], dependencies=metered)
 api_router.include_router(etl.router, prefix="/etl", tags=["etl"])
@@ -3,15 +3,33 @@ Authentication Endpoints
 Login, signup, token refresh
 """
 
+from typing import List
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.db.session import get_async_db
 from app.models.user import User
-from app.schemas.auth import UserLogin, UserSignup, Token, UserResponse
-from app.core.security import verify_password, get_password_hash, create_access_token
-from app.core.deps import get_current_user as get_current_user_dep
+from app.models.api_key import APIKey
+from app.schemas.auth import (
+    UserLogin,
+    UserSignup,
+    Token,
+    UserResponse,
+    APIKeyCreate,
+    APIKeyResponse,
+    APIKeyCreated,
+)
+from app.core.security import (
+    verify_password_async,
+    get_password_hash_async,
+    password_needs_rehash,
+    create_access_token,
+)
+from app.core.deps import get_current_user as get_current_user_dep, get_current_superuser
+from app.core.principal import AuthenticatedUser, invalidate_principal, principal_cache
+from app.core.api_keys import generate_api_key, evict_api_key
 
 router = APIRouter()
 
@@ -38,12 +56,17 @@ async def login(
         )
     
     # Verify password
-    if not verify_password(credentials.password, user.hashed_password):
+    if not await verify_password_async(credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha incorretos"
         )
     
+    # Upgrade hashes made with an older cost factor
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await get_password_hash_async(credentials.password)
+        await db.commit()
+    
     # Check if user is active
     if not user.is_active:
         raise HTTPException(
@@ -85,7 +108,7 @@ async def signup(
     new_user = User(
         email=user_data.email,
         full_name=user_data.full_name,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await get_password_hash_async(user_data.password),
         is_active=True,
         is_superuser=False,
         is_verified=False,
@@ -100,10 +123,110 @@ async def signup(
 
 @router.get("/me", response_model=UserResponse)
 async def get_me(
-    current_user: User = Depends(get_current_user_dep)
+    current_user: AuthenticatedUser = Depends(get_current_user_dep)
 ):
     """
     Get current user info
     Requires authentication
     """
     return current_user
+
+
+@router.post("/users/{user_id}/deactivate", response_model=UserResponse)
+async def deactivate_user(
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_superuser)
+):
+    """
+    Deactivate a user
+    Admin only - also evicts the user's cached principals
+    """
+    user = await db.get(User, user_id)
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Usuário não encontrado"
+        )
+    
+    user.is_active = False
+    await db.commit()
+    await db.refresh(user)
+    
+    invalidate_principal(user_id)
+    
+    return user
+
+
+@router.post("/api-keys", response_model=APIKeyCreated, status_code=status.HTTP_201_CREATED)
+async def create_api_key(
+    request: APIKeyCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_user_dep)
+):
+    """
+    Create an API key for the current user
+    The plaintext key is returned only in this response
+    """
+    key, key_prefix, key_hash = generate_api_key()
+    
+    api_key = APIKey(
+        user_id=current_user.id,
+        key_hash=key_hash,
+        key_prefix=key_prefix,
+        name=request.name,
+        is_active=True,
+        expires_at=request.expires_at,
+    )
+    
+    db.add(api_key)
+    await db.commit()
+    await db.refresh(api_key)
+    
+    return APIKeyCreated(
+        **APIKeyResponse.model_validate(api_key).model_dump(),
+        key=key,
+    )
+
+
+@router.get("/api-keys", response_model=List[APIKeyResponse])
+async def list_api_keys(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_user_dep)
+):
+    """
+    List the current user's API keys
+    """
+    result = await db.execute(
+        select(APIKey)
+        .where(APIKey.user_id == current_user.id)
+        .order_by(APIKey.created_at.desc())
+    )
+    return result.scalars().all()
+
+
+@router.delete("/api-keys/{api_key_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_api_key(
+    api_key_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_user_dep)
+):
+    """
+    Revoke an API key
+    Takes effect immediately on this worker (cache eviction) and within
+    API_KEY_CACHE_TTL_SECONDS on the others
+    """
+    api_key = await db.get(APIKey, api_key_id)
+    
+    if not api_key or api_key.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="API key não encontrada"
+        )
+    
+    api_key.is_active = False
+    await db.commit()
+    
+    evict_api_key(api_key.key_hash)
+    principal_cache.pop((api_key.user_id, api_key.key_hash))
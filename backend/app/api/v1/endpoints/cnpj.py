@@ -3,20 +3,84 @@ CNPJ Endpoints
 Company data query endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
 from app.db.base import get_db
+from app.core.dimensions import dimensions
+from app.core.responses import fast_json
 from app.models.empresa import Estabelecimento, Empresa, Socio
+from app.models.documento import CNPJDocumento
 
 router = APIRouter()
 
 
+def montar_documento(estabelecimento: Estabelecimento, empresa: Empresa, socios: list) -> dict:
+    """
+    Assemble the CNPJ payload from the source tables
+    
+    Fallback for CNPJs not yet in cnpj_documentos; key order matches
+    app.etl.documents.build_documents_sql.
+    """
+    return {
+        "cnpj": estabelecimento.cnpj_completo,
+        "razao_social": empresa.razao_social if empresa else None,
+        "nome_fantasia": estabelecimento.nome_fantasia,
+        "situacao_cadastral": estabelecimento.situacao_cadastral,
+        "situacao_cadastral_descricao": dimensions.situacao(estabelecimento.situacao_cadastral),
+        "data_situacao_cadastral": estabelecimento.data_situacao_cadastral,
+        "motivo_situacao_cadastral": estabelecimento.motivo_situacao_cadastral,
+        "motivo_situacao_cadastral_descricao": dimensions.motivo(estabelecimento.motivo_situacao_cadastral),
+        "endereco": {
+            "logradouro": estabelecimento.logradouro,
+            "numero": estabelecimento.numero,
+            "complemento": estabelecimento.complemento,
+            "bairro": estabelecimento.bairro,
+            "cep": estabelecimento.cep,
+            "municipio": estabelecimento.municipio,
+            "municipio_descricao": dimensions.municipio(estabelecimento.municipio),
+            "uf": estabelecimento.uf,
+            "cidade_exterior": estabelecimento.cidade_exterior,
+            "pais": estabelecimento.pais,
+            "pais_descricao": dimensions.pais(estabelecimento.pais),
+        },
+        "contato": {
+            "email": estabelecimento.email,
+            "telefone_1": f"({estabelecimento.ddd_1}) {estabelecimento.telefone_1 or ''}" if estabelecimento.ddd_1 else None,
+            "telefone_2": f"({estabelecimento.ddd_2}) {estabelecimento.telefone_2 or ''}" if estabelecimento.ddd_2 else None,
+        },
+        "atividade": {
+            "cnae_principal": estabelecimento.cnae_fiscal_principal,
+            "cnae_principal_descricao": dimensions.cnae(estabelecimento.cnae_fiscal_principal),
+            "cnae_secundaria": estabelecimento.cnae_fiscal_secundaria,
+        },
+        "socios": [
+            {
+                "nome": socio.nome_socio,
+                "cpf_cnpj": socio.cpf_cnpj_socio,
+                "qualificacao": socio.qualificacao_socio,
+                "qualificacao_descricao": dimensions.qualificacao(socio.qualificacao_socio),
+                "data_entrada": socio.data_entrada_sociedade,
+            }
+            for socio in socios
+        ],
+        "capital_social": empresa.capital_social if empresa else None,
+        "porte": empresa.porte_empresa if empresa else None,
+        "porte_descricao": dimensions.porte(empresa.porte_empresa) if empresa else None,
+        "natureza_juridica": empresa.natureza_juridica if empresa else None,
+        "natureza_juridica_descricao": dimensions.natureza(empresa.natureza_juridica) if empresa else None,
+    }
+
+
 @router.get("/{cnpj}")
-async def get_cnpj(cnpj: str, db: Session = Depends(get_db)):
+async def get_cnpj(cnpj: str, response: Response, db: Session = Depends(get_db)):
     """
     Get complete CNPJ information
     
+    Served from cnpj_documentos (single primary-key fetch). Falls back to
+    assembling the payload from the source tables when the document
+    table has not been built for the current load yet.
+    
     Args:
         cnpj: CNPJ number (14 digits, with or without formatting)
         
@@ -33,6 +97,19 @@ async def get_cnpj(cnpj: str, db: Session = Depends(get_db)):
             detail="CNPJ inválido. Deve conter 14 dígitos."
         )
     
+    # Precomputed document
+    documento = db.get(CNPJDocumento, cnpj_clean)
+    
+    if documento:
+        return fast_json({
+            "success": True,
+            "data": documento.documento,
+            "metadata": {
+                "cached": False,
+                "timestamp": documento.atualizado_em.isoformat() if documento.atualizado_em else None,
+            }
+        }, response)
+    
     # Query establishment
     estabelecimento = db.query(Estabelecimento).filter(
         Estabelecimento.cnpj_completo == cnpj_clean
@@ -52,56 +129,25 @@ async def get_cnpj(cnpj: str, db: Session = Depends(get_db)):
     # Query socios
     socios = db.query(Socio).filter(
         Socio.cnpj_basico == estabelecimento.cnpj_basico
-    ).all()
+    ).order_by(Socio.id).all()
     
-    return {
+    return fast_json({
         "success": True,
-        "data": {
-            "cnpj": cnpj_clean,
-            "razao_social": empresa.razao_social if empresa else None,
-            "nome_fantasia": estabelecimento.nome_fantasia,
-            "situacao_cadastral": estabelecimento.situacao_cadastral,
-            "data_situacao_cadastral": estabelecimento.data_situacao_cadastral,
-            "endereco": {
-                "logradouro": estabelecimento.logradouro,
-                "numero": estabelecimento.numero,
-                "complemento": estabelecimento.complemento,
-                "bairro": estabelecimento.bairro,
-                "cep": estabelecimento.cep,
-                "municipio": estabelecimento.municipio,
-                "uf": estabelecimento.uf,
-            },
-            "contato": {
-                "email": estabelecimento.email,
-                "telefone_1": f"({estabelecimento.ddd_1}) {estabelecimento.telefone_1}" if estabelecimento.ddd_1 else None,
-                "telefone_2": f"({estabelecimento.ddd_2}) {estabelecimento.telefone_2}" if estabelecimento.ddd_2 else None,
-            },
-            "atividade": {
-                "cnae_principal": estabelecimento.cnae_fiscal_principal,
-                "cnae_secundaria": estabelecimento.cnae_fiscal_secundaria,
-            },
-            "socios": [
-                {
-                    "nome": socio.nome_socio,
-                    "cpf_cnpj": socio.cpf_cnpj_socio,
-                    "qualificacao": socio.qualificacao_socio,
-                    "data_entrada": socio.data_entrada_sociedade,
-                }
-                for socio in socios
-            ],
-            "capital_social": empresa.capital_social if empresa else None,
-            "porte": empresa.porte_empresa if empresa else None,
-            "natureza_juridica": empresa.natureza_juridica if empresa else None,
-        },
+        "data": montar_documento(estabelecimento, empresa, socios),
         "metadata": {
             "cached": False,
             "timestamp": estabelecimento.updated_at.isoformat() if estabelecimento.updated_at else None,
         }
-    }
+    }, response)
 
 
 @router.get("/search/razao-social")
-async def search_by_razao_social(q: str, db: Session = Depends(get_db), limit: int = 10):
+async def search_by_razao_social(
+    q: str,
+    response: Response,
+    db: Session = Depends(get_db),
+    limit: int = 10
+):
     """
     Search companies by razao social
     
@@ -126,14 +172,16 @@ async def search_by_razao_social(q: str, db: Session = Depends(get_db), limit: i
         Empresa.razao_social.ilike(f"%{q}%")
     ).limit(limit).all()
     
-    return {
+    return fast_json({
         "success": True,
         "data": [
             {
                 "cnpj_basico": empresa.cnpj_basico,
                 "razao_social": empresa.razao_social,
                 "natureza_juridica": empresa.natureza_juridica,
+                "natureza_juridica_descricao": dimensions.natureza(empresa.natureza_juridica),
                 "porte": empresa.porte_empresa,
+                "porte_descricao": dimensions.porte(empresa.porte_empresa),
             }
             for empresa in empresas
         ],
@@ -142,4 +190,4 @@ async def search_by_razao_social(q: str, db: Session = Depends(get_db), limit: i
             "results_count": len(empresas),
             "limit": limit,
         }
-    }
+    }, response)
@@ -4,11 +4,13 @@ Endpoints para insights adicionais de CNPJ
 - Outras empresas de um sócio
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
 
 from app.db.session import get_async_db
+from app.core.dimensions import dimensions
+from app.core.responses import fast_json
 from app.models.empresa import Empresa, Estabelecimento, Socio
 
 router = APIRouter()
@@ -17,6 +19,7 @@ router = APIRouter()
 @router.get("/filiais/{cnpj_basico}")
 async def get_filiais(
     cnpj_basico: str,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     db: AsyncSession = Depends(get_async_db)
@@ -84,7 +87,7 @@ async def get_filiais(
     )
     filiais = result.scalars().all()
     
-    return {
+    return fast_json({
         "cnpj_basico": cnpj_basico,
         "total_filiais": total_filiais,
         "matriz": {
@@ -92,7 +95,9 @@ async def get_filiais(
             "nome_fantasia": matriz.nome_fantasia,
             "uf": matriz.uf,
             "municipio": matriz.municipio,
+            "municipio_descricao": dimensions.municipio(matriz.municipio),
             "situacao_cadastral": matriz.situacao_cadastral,
+            "situacao_cadastral_descricao": dimensions.situacao(matriz.situacao_cadastral),
         },
         "filiais": [
             {
@@ -101,7 +106,9 @@ async def get_filiais(
                 "nome_fantasia": f.nome_fantasia,
                 "uf": f.uf,
                 "municipio": f.municipio,
+                "municipio_descricao": dimensions.municipio(f.municipio),
                 "situacao_cadastral": f.situacao_cadastral,
+                "situacao_cadastral_descricao": dimensions.situacao(f.situacao_cadastral),
                 "logradouro": f.logradouro,
                 "numero": f.numero,
                 "bairro": f.bairro,
@@ -109,12 +116,13 @@ async def get_filiais(
             }
             for f in filiais
         ]
-    }
+    }, response)
 
 
 @router.get("/socio/{cpf_cnpj}/empresas")
 async def get_empresas_socio(
     cpf_cnpj: str,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     db: AsyncSession = Depends(get_async_db)
@@ -186,22 +194,26 @@ async def get_empresas_socio(
             "razao_social": empresa.razao_social,
             "nome_fantasia": estabelecimento.nome_fantasia,
             "qualificacao_socio": socio.qualificacao_socio,
+            "qualificacao_socio_descricao": dimensions.qualificacao(socio.qualificacao_socio),
             "data_entrada": socio.data_entrada_sociedade,
             "situacao_cadastral": estabelecimento.situacao_cadastral,
+            "situacao_cadastral_descricao": dimensions.situacao(estabelecimento.situacao_cadastral),
             "uf": estabelecimento.uf,
             "municipio": estabelecimento.municipio,
+            "municipio_descricao": dimensions.municipio(estabelecimento.municipio),
         })
     
-    return {
+    return fast_json({
         "cpf_cnpj": cpf_cnpj_limpo,
         "total_empresas": total,
         "empresas": empresas_list
-    }
+    }, response)
 
 
 @router.get("/socio/nome/{nome}")
 async def get_empresas_socio_por_nome(
     nome: str,
+    response: Response,
     skip: int = 0,
     limit: int = 50,
     db: AsyncSession = Depends(get_async_db)
@@ -258,6 +270,7 @@ async def get_empresas_socio_por_nome(
                 "nome": socio.nome_socio,
                 "cpf_cnpj": socio.cpf_cnpj_socio,
                 "qualificacao": socio.qualificacao_socio,
+                "qualificacao_descricao": dimensions.qualificacao(socio.qualificacao_socio),
             },
             "empresa": {
                 "cnpj_basico": empresa.cnpj_basico,
@@ -266,10 +279,95 @@ async def get_empresas_socio_por_nome(
                 "nome_fantasia": estabelecimento.nome_fantasia,
                 "uf": estabelecimento.uf,
                 "municipio": estabelecimento.municipio,
+                "municipio_descricao": dimensions.municipio(estabelecimento.municipio),
             }
         })
     
-    return {
+    return fast_json({
         "total": len(resultados),
         "resultados": resultados
-    }
+    }, response)
+
+
+@router.get("/cnae/{cnae}")
+async def get_estabelecimentos_por_cnae(
+    cnae: str,
+    response: Response,
+    uf: Optional[str] = None,
+    municipio: Optional[str] = None,
+    situacao: Optional[str] = None,
+    somente_principal: bool = False,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Busca estabelecimentos que exercem um CNAE (principal ou secundário).
+    
+    Usa o índice GIN em estabelecimentos.cnaes, combinado com o índice
+    (uf, municipio) quando os filtros de localização são informados.
+    
+    Args:
+        cnae: Código CNAE (7 dígitos, com ou sem formatação: 6201-5/01)
+        uf: Filtro por UF (sigla)
+        municipio: Filtro por código do município
+        situacao: Filtro por situação cadastral (ex: 02 = ativa)
+        somente_principal: Considerar apenas o CNAE principal
+        skip: Paginação
+        limit: Limite (max 100)
+    
+    Returns:
+        {
+            "cnae": "6201501",
+            "total": 100,
+            "estabelecimentos": [...]
+        }
+    """
+    cnae_limpo = ''.join(filter(str.isdigit, cnae))
+    
+    if len(cnae_limpo) != 7:
+        raise HTTPException(status_code=400, detail="CNAE deve ter 7 dígitos")
+    
+    if somente_principal:
+        condicoes = [Estabelecimento.cnae_fiscal_principal == cnae_limpo]
+    else:
+        condicoes = [Estabelecimento.cnaes.contains([int(cnae_limpo)])]
+    
+    if uf:
+        condicoes.append(Estabelecimento.uf == uf.upper())
+    if municipio:
+        condicoes.append(Estabelecimento.municipio == municipio)
+    if situacao:
+        condicoes.append(Estabelecimento.situacao_cadastral == situacao)
+    
+    result = await db.execute(
+        select(Estabelecimento)
+        .where(and_(*condicoes))
+        .order_by(Estabelecimento.id)
+        .offset(skip)
+        .limit(min(limit, 100))
+    )
+    estabelecimentos = result.scalars().all()
+    
+    return fast_json({
+        "cnae": cnae_limpo,
+        "cnae_descricao": dimensions.cnae(cnae_limpo),
+        "total": len(estabelecimentos),
+        "estabelecimentos": [
+            {
+                "cnpj_completo": e.cnpj_completo,
+                "nome_fantasia": e.nome_fantasia,
+                "cnae_principal": e.cnae_fiscal_principal,
+                "cnae_principal_descricao": dimensions.cnae(e.cnae_fiscal_principal),
+                "cnae_principal_match": e.cnae_fiscal_principal == cnae_limpo,
+                "situacao_cadastral": e.situacao_cadastral,
+                "situacao_cadastral_descricao": dimensions.situacao(e.situacao_cadastral),
+                "uf": e.uf,
+                "municipio": e.municipio,
+                "municipio_descricao": dimensions.municipio(e.municipio),
+                "bairro": e.bairro,
+                "cep": e.cep,
+            }
+            for e in estabelecimentos
+        ]
+    }, response)
@@ -0,0 +1,135 @@
+"""
+Endpoints de estatísticas agregadas
+- Contagem de estabelecimentos por UF, município, CNAE, situação, porte, Simples e MEI
+
+Servido exclusivamente pela tabela estatisticas_estabelecimentos,
+reconstruída pelo ETL a cada carga.
+"""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, desc
+
+from app.db.session import get_async_db
+from app.models.estatistica import EstatisticaEstabelecimento
+from app.etl.aggregates import choose_level
+from app.core.dimensions import dimensions
+
+router = APIRouter()
+
+# Nome do parâmetro na API -> coluna da tabela de rollups
+DIMENSOES = {
+    "uf": "uf",
+    "municipio": "municipio",
+    "cnae": "cnae_fiscal_principal",
+    "situacao": "situacao_cadastral",
+    "porte": "porte_empresa",
+    "simples": "opcao_simples",
+    "mei": "opcao_mei",
+}
+
+# Dimensões com descrição no cache de dimensões
+DESCRICOES = {
+    "municipio": dimensions.municipio,
+    "cnae": dimensions.cnae,
+    "situacao": dimensions.situacao,
+    "porte": dimensions.porte,
+}
+
+
+def _descrever(grupo: dict) -> dict:
+    """Acrescenta <dimensão>_descricao aos códigos do grupo"""
+    for dimensao in list(grupo):
+        if dimensao in DESCRICOES:
+            grupo[f"{dimensao}_descricao"] = DESCRICOES[dimensao](grupo[dimensao])
+    return grupo
+
+
+@router.get("/estabelecimentos")
+async def get_estatisticas_estabelecimentos(
+    group_by: str = "uf",
+    uf: Optional[str] = None,
+    municipio: Optional[str] = None,
+    cnae: Optional[str] = None,
+    situacao: Optional[str] = None,
+    porte: Optional[str] = None,
+    simples: Optional[str] = None,
+    mei: Optional[str] = None,
+    limit: int = 1000,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Contagem de estabelecimentos agrupada por dimensões.
+
+    Args:
+        group_by: Dimensões separadas por vírgula
+                  (uf, municipio, cnae, situacao, porte, simples, mei)
+        uf, municipio, cnae, situacao, porte, simples, mei: Filtros opcionais
+        limit: Máximo de grupos retornados (max 10000)
+
+    Returns:
+        {
+            "group_by": ["municipio", "cnae"],
+            "filtros": {"uf": "SP", "situacao": "02"},
+            "total": 123456,
+            "resultados": [{"municipio": "7107", "cnae": "6201501", "total": 987}, ...]
+        }
+    """
+    agrupamento = [d.strip() for d in group_by.split(",") if d.strip()]
+    invalidas = [d for d in agrupamento if d not in DIMENSOES]
+    if invalidas:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Dimensões inválidas: {', '.join(invalidas)}. Use: {', '.join(DIMENSOES)}"
+        )
+
+    filtros = {
+        "uf": uf.upper() if uf else None,
+        "municipio": municipio,
+        "cnae": ''.join(filter(str.isdigit, cnae)) if cnae else None,
+        "situacao": situacao,
+        "porte": porte,
+        "simples": simples.upper() if simples else None,
+        "mei": mei.upper() if mei else None,
+    }
+    filtros = {k: v for k, v in filtros.items() if v}
+
+    nivel = choose_level(DIMENSOES[d] for d in set(agrupamento) | set(filtros))
+    if nivel is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Combinação de dimensões não disponível nas estatísticas agregadas"
+        )
+
+    condicoes = [EstatisticaEstabelecimento.nivel == nivel] + [
+        getattr(EstatisticaEstabelecimento, DIMENSOES[d]) == v
+        for d, v in filtros.items()
+    ]
+    colunas = [
+        getattr(EstatisticaEstabelecimento, DIMENSOES[d]).label(d)
+        for d in agrupamento
+    ]
+    total_col = func.sum(EstatisticaEstabelecimento.total)
+
+    # Total geral com os filtros aplicados
+    result = await db.execute(select(total_col).where(*condicoes))
+    total = result.scalar() or 0
+
+    # Grupos
+    result = await db.execute(
+        select(*colunas, total_col.label("total"))
+        .where(*condicoes)
+        .group_by(*colunas)
+        .order_by(desc("total"))
+        .limit(min(limit, 10000))
+    )
+
+    return {
+        "group_by": agrupamento,
+        "filtros": filtros,
+        "total": int(total),
+        "resultados": [
+            _descrever({**row._mapping, "total": int(row.total)})
+            for row in result.all()
+        ],
+    }
@@ -1,35 +1,42 @@
 """
 ETL Endpoints
 Admin-only endpoints for managing ETL jobs
+
+Jobs are only enqueued and controlled here (etl_status rows); they run in
+the separate job runner process (python -m app.etl.job_runner). Live
+progress and logs come from the runner's NOTIFYs (app.etl.events).
 """
 
 import os
-import asyncio
 import logging
-from typing import List
+from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, text, update
 
 from app.db.session import get_async_db
-from app.models.user import User
+from app.core.principal import AuthenticatedUser
 from app.models.etl_status import ETLStatus
-from app.core.deps import get_current_superuser
+from app.models.etl_checkpoint import ETLCheckpoint
+from app.core.deps import get_current_superuser, get_streaming_superuser
+from app.etl.events import etl_events, publish
 from app.schemas.etl import (
     ETLStartRequest,
     ETLStartResponse,
     ETLStatusResponse,
     ETLValidationResponse,
-    ETLLogsResponse
+    ETLLogsResponse,
+    ETLCheckpointResponse,
+    ETLThrottleRequest,
+    ETLControlResponse
 )
-from app.etl.worker_v2 import ETLWorker
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Global ETL task reference
-current_etl_task = None
+ACTIVE_STATUSES = ("queued", "running", "paused")
 
 
 def get_disk_space():
@@ -40,35 +47,31 @@ def get_disk_space():
     return free_gb, used_gb
 
 
-def check_postgres_running() -> bool:
-    """Check if PostgreSQL container is running"""
+async def check_postgres_running(db: AsyncSession) -> bool:
+    """Check that PostgreSQL answers (no docker inside the API container)"""
     try:
-        import subprocess
-        result = subprocess.run(
-            ["docker", "ps", "--filter", "name=postgres", "--format", "{{.Names}}"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        return "postgres" in result.stdout.lower()
+        await db.execute(text("SELECT 1"))
+        return True
     except Exception:
+        await db.rollback()
         return False
 
 
 async def check_tables_exist(db: AsyncSession) -> bool:
     """Check if required tables exist"""
     try:
-        # Simple check - try to count empresas
-        result = await db.execute("SELECT COUNT(*) FROM empresas LIMIT 1")
+        # Simple check - read one row of empresas
+        await db.execute(text("SELECT 1 FROM empresas LIMIT 1"))
         return True
     except Exception:
+        await db.rollback()
         return False
 
 
 @router.get("/validate", response_model=ETLValidationResponse)
 async def validate_etl(
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(get_current_superuser)
+    current_user: AuthenticatedUser = Depends(get_current_superuser)
 ):
     """
     Validate ETL pre-conditions
@@ -87,7 +90,7 @@ async def validate_etl(
         errors.append(f"❌ Espaço crítico: {free_gb:.1f}GB. Mínimo: 15GB")
     
     # Check PostgreSQL
-    postgres_running = check_postgres_running()
+    postgres_running = await check_postgres_running(db)
     if not postgres_running:
         errors.append("❌ PostgreSQL não está rodando")
     
@@ -107,33 +110,29 @@ async def validate_etl(
     }
 
 
-async def run_etl_worker(job_id: str, skip_download: bool, tables: List[str]):
-    """Background task to run ETL worker"""
-    global current_etl_task
-    try:
-        worker = ETLWorker(job_id=job_id, skip_download=skip_download, tables=tables)
-        await worker.run()
-    except Exception as e:
-        logger.error(f"ETL worker failed: {e}", exc_info=True)
-    finally:
-        current_etl_task = None
+async def get_running_job(db: AsyncSession) -> Optional[ETLStatus]:
+    """Latest job that is queued, running or paused"""
+    result = await db.execute(
+        select(ETLStatus)
+        .where(ETLStatus.status.in_(ACTIVE_STATUSES))
+        .order_by(desc(ETLStatus.created_at))
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
 
 
 @router.post("/start", response_model=ETLStartResponse)
 async def start_etl(
     request: ETLStartRequest,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(get_current_superuser)
+    current_user: AuthenticatedUser = Depends(get_current_superuser)
 ):
     """
-    Start ETL job
+    Enqueue an ETL job (picked up by the job runner)
     Admin only
     """
-    global current_etl_task
-    
     # Check if already running
-    if current_etl_task is not None and not current_etl_task.done():
+    if await get_running_job(db) is not None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="ETL job já está em execução"
@@ -153,35 +152,31 @@ async def start_etl(
     
     etl_status = ETLStatus(
         job_id=job_id,
-        status="idle",
+        status="queued",
         progress_percent=0.0,
         files_processed=0,
         files_total=0,
-        records_imported=0
+        records_imported=0,
+        job_metadata={"tables": request.tables, "skip_download": request.skip_download}
     )
     
     db.add(etl_status)
     await db.commit()
-    await db.refresh(etl_status)
-    
-    # Start background task
-    current_etl_task = asyncio.create_task(
-        run_etl_worker(job_id, request.skip_download, request.tables)
-    )
+    await notify_status(db, etl_status)
     
-    logger.info(f"ETL job {job_id} started by {current_user.email}")
+    logger.info(f"ETL job {job_id} queued by {current_user.email}")
     
     return {
-        "status": "started",
+        "status": "queued",
         "job_id": job_id,
-        "message": "ETL iniciado com sucesso"
+        "message": "ETL enfileirado: o job runner inicia em instantes"
     }
 
 
 @router.get("/status", response_model=ETLStatusResponse)
 async def get_etl_status(
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(get_current_superuser)
+    current_user: AuthenticatedUser = Depends(get_current_superuser)
 ):
     """
     Get current ETL status
@@ -210,66 +205,264 @@ async def get_etl_status(
 @router.get("/logs", response_model=ETLLogsResponse)
 async def get_etl_logs(
     lines: int = 100,
-    current_user: User = Depends(get_current_superuser)
+    current_user: AuthenticatedUser = Depends(get_current_superuser)
 ):
     """
-    Get ETL logs
+    Get recent ETL log lines (published by the job runner, kept in memory)
     Admin only
     """
-    import subprocess
+    log_lines = list(etl_events.log_lines)[-lines:] if lines > 0 else []
+    
+    if not log_lines:
+        return {
+            "logs": ["Logs não disponíveis"],
+            "total_lines": 0
+        }
     
+    return {
+        "logs": log_lines,
+        "total_lines": len(log_lines)
+    }
+
+
+@router.get("/stream")
+async def stream_etl(
+    last_event_id: Optional[str] = Header(default=None),
+    current_user: AuthenticatedUser = Depends(get_streaming_superuser)
+):
+    """
+    Live ETL progress and logs (Server-Sent Events)
+    
+    Events: `progress` (full status snapshot of the current job) and `log`
+    (list of lines). Reconnecting with Last-Event-ID replays the log lines
+    missed, while still buffered.
+    Admin only (authenticated without a request-scoped DB session, which
+    would stay checked out for the life of the stream)
+    """
     try:
-        # Try to read from log file
-        result = subprocess.run(
-            ["tail", "-n", str(lines), "/var/log/etl.log"],
-            capture_output=True,
-            text=True,
-            timeout=5
+        last_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_id = None
+    
+    return StreamingResponse(
+        etl_events.sse(last_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def notify_status(db: AsyncSession, etl_status: ETLStatus):
+    """Push a status change made here to the live stream (/etl/stream)"""
+    await publish(db, "progress", {
+        "job_id": etl_status.job_id,
+        "status": etl_status.status,
+        "control_command": etl_status.control_command,
+        "max_parallel_copies": etl_status.max_parallel_copies,
+        "error_message": etl_status.error_message
+    })
+    await db.commit()
+
+
+async def get_active_job(db: AsyncSession) -> ETLStatus:
+    """Latest job that is queued, running or paused (404 otherwise)"""
+    etl_status = await get_running_job(db)
+    
+    if not etl_status:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Nenhum job ETL em execução"
         )
-        
-        if result.returncode == 0:
-            log_lines = result.stdout.strip().split('\n')
-            return {
-                "logs": log_lines,
-                "total_lines": len(log_lines)
-            }
-    except Exception:
-        pass
     
-    # Fallback: empty logs
+    return etl_status
+
+
+def control_response(etl_status: ETLStatus, message: str) -> dict:
     return {
-        "logs": ["Logs não disponíveis"],
-        "total_lines": 0
+        "job_id": etl_status.job_id,
+        "status": etl_status.status,
+        "control_command": etl_status.control_command,
+        "max_parallel_copies": etl_status.max_parallel_copies,
+        "message": message
     }
 
 
-@router.post("/pause")
+@router.post("/pause", response_model=ETLControlResponse)
 async def pause_etl(
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(get_current_superuser)
+    current_user: AuthenticatedUser = Depends(get_current_superuser)
 ):
     """
-    Pause ETL job
+    Pause the running ETL job
+    Takes effect once the files being loaded finish; no new file starts
     Admin only
-    (Not fully implemented - requires worker cooperation)
     """
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Pause not implemented yet"
-    )
+    etl_status = await get_active_job(db)
+    
+    if etl_status.control_command == "cancel":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Job ETL já está sendo cancelado"
+        )
+    
+    etl_status.control_command = "pause"
+    await db.commit()
+    await notify_status(db, etl_status)
+    
+    logger.info(f"ETL job {etl_status.job_id} paused by {current_user.email}")
+    
+    return control_response(etl_status, "Pausa solicitada: o ETL para após os arquivos em andamento")
 
 
-@router.post("/resume")
+@router.post("/resume", response_model=ETLControlResponse)
 async def resume_etl(
+    job_id: Optional[str] = None,
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(get_current_superuser)
+    current_user: AuthenticatedUser = Depends(get_current_superuser)
 ):
     """
-    Resume ETL job
+    Resume an ETL job (latest job when job_id is omitted)
+    
+    A paused job continues where it stopped. A failed or cancelled job is
+    re-queued: files already loaded are skipped and the interrupted file
+    is reloaded from scratch.
     Admin only
-    (Not fully implemented - requires worker state persistence)
     """
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Resume not implemented yet"
+    query = select(ETLStatus)
+    if job_id:
+        query = query.where(ETLStatus.job_id == job_id)
+    else:
+        query = query.order_by(desc(ETLStatus.created_at)).limit(1)
+    etl_status = (await db.execute(query)).scalar_one_or_none()
+    
+    if not etl_status:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job ETL não encontrado"
+        )
+    
+    # Paused (or pause requested): clear the command, the worker picks it up
+    if etl_status.status in ACTIVE_STATUSES:
+        if etl_status.control_command != "pause":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Job ETL não está pausado (status atual: {etl_status.status})"
+            )
+        etl_status.control_command = None
+        await db.commit()
+        await notify_status(db, etl_status)
+        
+        logger.info(f"ETL job {etl_status.job_id} resumed by {current_user.email}")
+        
+        return control_response(etl_status, "ETL retomado")
+    
+    if etl_status.status not in ("error", "cancelled"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Apenas jobs pausados, com erro ou cancelados podem ser retomados (status atual: {etl_status.status})"
+        )
+    
+    if await get_running_job(db) is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="ETL job já está em execução"
+        )
+    
+    result = await db.execute(
+        select(ETLCheckpoint.stage).where(ETLCheckpoint.job_id == etl_status.job_id)
+    )
+    stages = result.scalars().all()
+    loaded = sum(1 for stage in stages if stage in ("loaded", "indexed"))
+    
+    # Back to the queue; the runner resumes it from its checkpoints
+    etl_status.status = "queued"
+    etl_status.control_command = None
+    etl_status.error_message = None
+    await db.commit()
+    await notify_status(db, etl_status)
+    
+    logger.info(f"ETL job {etl_status.job_id} re-queued by {current_user.email}")
+    
+    return control_response(etl_status, f"ETL reiniciado: {loaded} de {len(stages)} arquivos já carregados")
+
+
+@router.post("/cancel", response_model=ETLControlResponse)
+async def cancel_etl(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_superuser)
+):
+    """
+    Cancel the running ETL job
+    Files being loaded finish (or roll back); the job can be resumed later
+    Admin only
+    """
+    etl_status = await get_active_job(db)
+    
+    # Not claimed yet: nothing to stop. Conditional so a concurrent claim wins
+    result = await db.execute(
+        update(ETLStatus)
+        .where(ETLStatus.job_id == etl_status.job_id, ETLStatus.status == "queued")
+        .values(status="cancelled", completed_at=datetime.utcnow())
+    )
+    if not result.rowcount:
+        etl_status.control_command = "cancel"
+    await db.commit()
+    await db.refresh(etl_status)
+    await notify_status(db, etl_status)
+    
+    logger.info(f"ETL job {etl_status.job_id} cancelled by {current_user.email}")
+    
+    return control_response(etl_status, "Cancelamento solicitado")
+
+
+@router.post("/throttle", response_model=ETLControlResponse)
+async def throttle_etl(
+    request: ETLThrottleRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_superuser)
+):
+    """
+    Change how many files the running job loads in parallel
+    Applies to the next file started
+    Admin only
+    """
+    etl_status = await get_active_job(db)
+    
+    etl_status.max_parallel_copies = request.max_parallel_copies
+    await db.commit()
+    await notify_status(db, etl_status)
+    
+    logger.info(
+        f"ETL job {etl_status.job_id} throttled to {request.max_parallel_copies or 'default'} "
+        f"parallel copies by {current_user.email}"
+    )
+    
+    return control_response(
+        etl_status,
+        f"Cópias em paralelo: {request.max_parallel_copies or 'padrão do servidor'}"
+    )
+
+
+@router.get("/checkpoints", response_model=List[ETLCheckpointResponse])
+async def get_etl_checkpoints(
+    job_id: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthenticatedUser = Depends(get_current_superuser)
+):
+    """
+    Per-file progress of a job (latest job when job_id is omitted)
+    Admin only
+    """
+    if not job_id:
+        result = await db.execute(
+            select(ETLStatus.job_id).order_by(desc(ETLStatus.created_at)).limit(1)
+        )
+        job_id = result.scalar_one_or_none()
+        if job_id is None:
+            return []
+    
+    result = await db.execute(
+        select(ETLCheckpoint)
+        .where(ETLCheckpoint.job_id == job_id)
+        .order_by(ETLCheckpoint.id)
     )
+    return result.scalars().all()
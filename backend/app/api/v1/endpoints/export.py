@@ -0,0 +1,184 @@
+"""
+Export Endpoints
+Streaming filtered exports (CSV / NDJSON) for lead lists
+"""
+
+import csv
+import json
+import logging
+from io import StringIO
+from typing import AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, and_
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.core.deps import get_current_user
+from app.db.session import async_engine
+from app.models.empresa import Empresa, Estabelecimento
+from app.core.principal import AuthenticatedUser
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = [
+    Estabelecimento.cnpj_completo,
+    Empresa.razao_social,
+    Estabelecimento.nome_fantasia,
+    Estabelecimento.situacao_cadastral,
+    Estabelecimento.data_inicio_atividade,
+    Estabelecimento.cnae_fiscal_principal,
+    Empresa.porte_empresa,
+    Estabelecimento.tipo_logradouro,
+    Estabelecimento.logradouro,
+    Estabelecimento.numero,
+    Estabelecimento.complemento,
+    Estabelecimento.bairro,
+    Estabelecimento.cep,
+    Estabelecimento.uf,
+    Estabelecimento.municipio,
+    Estabelecimento.ddd_1,
+    Estabelecimento.telefone_1,
+    Estabelecimento.email,
+]
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def build_export_query(
+    uf: Optional[str],
+    municipio: Optional[str],
+    cnae: Optional[str],
+    situacao: Optional[str],
+) -> Select:
+    """Build the export SELECT for the given filters"""
+    condicoes = []
+
+    if uf:
+        condicoes.append(Estabelecimento.uf == uf.upper())
+    if municipio:
+        condicoes.append(Estabelecimento.municipio == municipio)
+    if cnae:
+        condicoes.append(Estabelecimento.cnaes.contains([int(cnae)]))
+    if situacao:
+        condicoes.append(Estabelecimento.situacao_cadastral == situacao)
+
+    return (
+        select(*EXPORT_COLUMNS)
+        .join(Empresa, Empresa.cnpj_basico == Estabelecimento.cnpj_basico, isouter=True)
+        .where(and_(*condicoes))
+    )
+
+
+def encode_csv(rows, header: Optional[List[str]] = None) -> str:
+    """Encode a batch of rows as CSV"""
+    buffer = StringIO()
+    writer = csv.writer(buffer, delimiter=';', lineterminator='\n')
+    if header:
+        writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def encode_ndjson(rows) -> str:
+    """Encode a batch of rows as newline-delimited JSON"""
+    return "".join(
+        json.dumps(dict(row._mapping), ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+async def stream_export(request: Request, query: Select, formato: str) -> AsyncIterator[str]:
+    """
+    Stream query results through a server-side cursor
+
+    Memory stays bounded by EXPORT_BATCH_SIZE rows; the cursor is closed
+    as soon as the client disconnects.
+    """
+    header = [column.key for column in EXPORT_COLUMNS]
+    exported = 0
+
+    async with async_engine.connect() as conn:
+        result = await conn.stream(
+            query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+        )
+
+        async for rows in result.partitions():
+            if await request.is_disconnected():
+                logger.info(f"Export cancelled by client after {exported:,} rows")
+                break
+
+            if formato == "csv":
+                yield encode_csv(rows, header if exported == 0 else None)
+            else:
+                yield encode_ndjson(rows)
+
+            exported += len(rows)
+        else:
+            if exported == 0 and formato == "csv":
+                yield encode_csv([], header)
+
+    logger.info(f"Export finished: {exported:,} rows")
+
+
+@router.get("/estabelecimentos")
+async def export_estabelecimentos(
+    request: Request,
+    formato: str = "csv",
+    uf: Optional[str] = None,
+    municipio: Optional[str] = None,
+    cnae: Optional[str] = None,
+    situacao: Optional[str] = None,
+    current_user: AuthenticatedUser = Depends(get_current_user)
+):
+    """
+    Exporta estabelecimentos filtrados em CSV ou NDJSON (streaming)
+
+    Args:
+        formato: csv (separado por ';') ou ndjson
+        uf: Filtro por UF (sigla)
+        municipio: Filtro por código do município
+        cnae: CNAE principal ou secundário (ex: 6201-5/01)
+        situacao: Situação cadastral (ex: 02 = ativa)
+
+    Returns:
+        Arquivo transmitido em chunks (Transfer-Encoding: chunked)
+    """
+    if formato not in MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Formato inválido. Use: {', '.join(MEDIA_TYPES)}"
+        )
+
+    cnae_limpo = None
+    if cnae:
+        cnae_limpo = ''.join(filter(str.isdigit, cnae))
+        if len(cnae_limpo) != 7:
+            raise HTTPException(status_code=400, detail="CNAE deve ter 7 dígitos")
+
+    if not any([uf, municipio, cnae_limpo]):
+        raise HTTPException(
+            status_code=400,
+            detail="Informe ao menos um filtro: uf, municipio ou cnae"
+        )
+
+    query = build_export_query(uf, municipio, cnae_limpo, situacao)
+
+    logger.info(
+        f"Export started by {current_user.email}: "
+        f"formato={formato} uf={uf} municipio={municipio} cnae={cnae_limpo} situacao={situacao}"
+    )
+
+    return StreamingResponse(
+        stream_export(request, query, formato),
+        media_type=MEDIA_TYPES[formato],
+        headers={
+            "Content-Disposition": f'attachment; filename="estabelecimentos.{formato}"',
+            "X-Accel-Buffering": "no",  # Nginx: forward chunks as they are produced
+        },
+    )
@@ -3,11 +3,35 @@ Health Check Endpoint
 System health and status monitoring
 """
 
+import asyncio
+import time
+
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.cache import TTLCache
+from app.core.dimensions import dimensions
+from app.core.generation import data_generation
+from app.core.principal import principal_cache
+from app.core.api_keys import api_key_cache
+from app.db.session import async_engine, database_url
 
 router = APIRouter()
 
+# Last probe result, shared by every caller for HEALTH_CACHE_SECONDS
+_probe_cache = TTLCache(maxsize=1, ttl=settings.HEALTH_CACHE_SECONDS)
+_probe_lock = asyncio.Lock()
+_redis = None
+
+# Probe connections bypass the app pool: a saturated pool is "degraded"
+# (see probe_pool), only an unreachable database is "down"
+_probe_engine = create_async_engine(database_url, poolclass=NullPool)
+
 
 @router.get("/health")
 async def health_check():
@@ -23,20 +47,140 @@ async def health_check():
     }
 
 
+async def probe_database() -> dict:
+    """Timed SELECT 1 on a fresh connection (outside the app pool)"""
+    async def select_one():
+        async with _probe_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(select_one(), timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS)
+    except Exception as e:
+        return {"status": "down", "error": f"{type(e).__name__}: {e}"[:200]}
+
+    return {"status": "up", "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+def probe_pool() -> dict:
+    """Async engine pool usage (saturated = every connection checked out)"""
+    pool = async_engine.pool
+    capacity = pool.size() + settings.DATABASE_MAX_OVERFLOW
+    checked_out = pool.checkedout()
+    return {
+        "status": "saturated" if checked_out >= capacity else "ok",
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "size": pool.size(),
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+    }
+
+
+async def probe_redis() -> dict:
+    """PING, only when Redis backs the rate limiter"""
+    global _redis
+
+    if settings.RATE_LIMIT_BACKEND != "redis":
+        return {"status": "not_used"}
+
+    import redis.asyncio as redis
+
+    if _redis is None:
+        _redis = redis.from_url(settings.REDIS_URL)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(_redis.ping(), timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS)
+    except Exception as e:
+        return {"status": "down", "error": f"{type(e).__name__}: {e}"[:200]}
+
+    return {"status": "up", "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+def probe_data() -> dict:
+    """Loaded generation and its age"""
+    if not data_generation.known:
+        return {"status": "not_loaded"}
+
+    age_days = (datetime.utcnow() - data_generation.completed_at.replace(tzinfo=None)).total_seconds() / 86400
+    return {
+        "status": "stale" if age_days > settings.DATA_MAX_AGE_DAYS else "ok",
+        "generation": data_generation.job_id,
+        "loaded_at": data_generation.completed_at.isoformat(),
+        "age_days": round(age_days, 1),
+    }
+
+
+def probe_caches() -> dict:
+    """In-process caches"""
+    return {
+        "status": "ok" if dimensions.ready else "not_loaded",
+        "dimensions": {
+            "ready": dimensions.ready,
+            "loaded_at": dimensions.loaded_at.isoformat() if dimensions.loaded_at else None,
+        },
+        "principals": len(principal_cache),
+        "api_keys": len(api_key_cache),
+    }
+
+
+async def run_probes() -> dict:
+    """All probes, cached for HEALTH_CACHE_SECONDS (one probe at a time)"""
+    cached = _probe_cache.get("health")
+    if cached is not None:
+        return cached
+
+    async with _probe_lock:
+        cached = _probe_cache.get("health")
+        if cached is not None:
+            return cached
+
+        database, redis_status = await asyncio.gather(probe_database(), probe_redis())
+        components = {
+            "api": {"status": "up"},
+            "database": database,
+            "pool": probe_pool(),
+            "redis": redis_status,
+            "data": probe_data(),
+            "cache": probe_caches(),
+        }
+
+        if database["status"] != "up":
+            overall = "unhealthy"
+        elif (
+            components["pool"]["status"] != "ok"
+            or redis_status["status"] == "down"
+            or components["data"]["status"] != "ok"
+            or components["cache"]["status"] != "ok"
+        ):
+            overall = "degraded"
+        else:
+            overall = "healthy"
+
+        result = {
+            "status": overall,
+            "timestamp": datetime.utcnow().isoformat(),
+            "service": "AuthBrasil CNPJ API",
+            "version": settings.VERSION,
+            "components": components,
+        }
+        _probe_cache.set("health", result)
+        return result
+
+
 @router.get("/health/detailed")
 async def detailed_health_check():
     """
     Detailed health check
-    Includes database and cache status (to be implemented)
+    Probes database, pool, Redis, loaded data and caches
+    
+    Results are cached for HEALTH_CACHE_SECONDS, so load balancer polling
+    adds at most one SELECT 1 per interval per worker.
+    Returns 503 when the database is unreachable (degraded is still 200,
+    including a saturated pool: busy nodes must stay in rotation).
     """
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "service": "AuthBrasil CNPJ API",
-        "version": "0.1.0",
-        "components": {
-            "api": "operational",
-            "database": "not_configured",  # Will be updated when DB is ready
-            "cache": "not_configured",     # Will be updated when Redis is ready
-        }
-    }
+    result = await run_probes()
+    return JSONResponse(
+        result,
+        status_code=503 if result["status"] == "unhealthy" else 200,
+    )
@@ -0,0 +1,146 @@
+"""
+API Keys
+Keyed-hash storage, cached resolution and batched last_used_at updates
+"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import secrets
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.principal import AuthenticatedUser, get_principal
+from app.db.session import async_session
+from app.models.api_key import APIKey
+
+logger = logging.getLogger(__name__)
+
+API_KEY_PREFIX = "ab_live_"
+INVALID_KEY_TTL_SECONDS = 5  # Short negative caching for unknown keys
+INVALID_KEY_CACHE_MAX_ENTRIES = 1000
+
+
+class CachedAPIKey(NamedTuple):
+    id: int
+    user_id: int
+    expires_at: Optional[datetime]
+
+
+# key_hash -> CachedAPIKey (bounded LRU)
+api_key_cache = TTLCache(
+    maxsize=settings.API_KEY_CACHE_MAX_ENTRIES,
+    ttl=settings.API_KEY_CACHE_TTL_SECONDS,
+)
+
+# key_hashes with no active key: kept apart, so a spray of random bearer
+# strings cannot evict valid keys from api_key_cache
+invalid_key_cache = TTLCache(maxsize=INVALID_KEY_CACHE_MAX_ENTRIES, ttl=INVALID_KEY_TTL_SECONDS)
+
+# api_key id -> last time it was used (flushed in batches)
+_last_used: Dict[int, datetime] = {}
+
+
+def hash_api_key(key: str) -> str:
+    """HMAC-SHA256 of the key with SECRET_KEY (hex)"""
+    return hmac.new(
+        settings.SECRET_KEY.encode('utf-8'), key.encode('utf-8'), hashlib.sha256
+    ).hexdigest()
+
+
+def generate_api_key() -> Tuple[str, str, str]:
+    """
+    Generate a new API key
+
+    Returns:
+        (plaintext key, display prefix, key hash) - plaintext is shown once
+    """
+    key = f"{API_KEY_PREFIX}{secrets.token_urlsafe(32)}"
+    return key, key[:12], hash_api_key(key)
+
+
+def is_api_key(credential: str) -> bool:
+    """JWTs have three dot-separated segments; API keys have none"""
+    return credential.count(".") != 2
+
+
+async def authenticate_api_key(db: AsyncSession, key: str) -> Optional[AuthenticatedUser]:
+    """
+    Resolve an API key to its user
+
+    Hits the database only on a cache miss; usage is recorded in memory
+    and written by the periodic last_used_at flush.
+    """
+    key_hash = hash_api_key(key)
+    entry = api_key_cache.get(key_hash)
+
+    if entry is None:
+        if invalid_key_cache.get(key_hash):
+            return None
+
+        result = await db.execute(
+            select(APIKey.id, APIKey.user_id, APIKey.expires_at)
+            .where(APIKey.key_hash == key_hash, APIKey.is_active.is_(True))
+        )
+        row = result.first()
+
+        if row is None:
+            invalid_key_cache.set(key_hash, True)
+            return None
+
+        entry = CachedAPIKey(*row)
+        api_key_cache.set(key_hash, entry)
+
+    if entry.expires_at and entry.expires_at < datetime.utcnow():
+        return None
+
+    _last_used[entry.id] = datetime.utcnow()
+
+    return await get_principal(db, entry.user_id, key_hash)
+
+
+def evict_api_key(key_hash: str):
+    """Drop a key from the cache (revocation)"""
+    api_key_cache.pop(key_hash)
+    invalid_key_cache.pop(key_hash)
+
+
+async def flush_last_used() -> int:
+    """Write pending last_used_at values in a single executemany; re-queued if the write fails"""
+    if not _last_used:
+        return 0
+
+    pending = dict(_last_used)
+    _last_used.clear()
+
+    try:
+        async with async_session() as db:
+            await db.execute(update(APIKey), [
+                {"id": key_id, "last_used_at": used_at}
+                for key_id, used_at in pending.items()
+            ])
+            await db.commit()
+    except Exception:
+        # Uses recorded during the write are newer: keep those
+        for key_id, used_at in pending.items():
+            if key_id not in _last_used or _last_used[key_id] < used_at:
+                _last_used[key_id] = used_at
+        raise
+
+    return len(pending)
+
+
+async def run_last_used_flusher():
+    """Background task: flush last_used_at every API_KEY_LAST_USED_FLUSH_SECONDS"""
+    while True:
+        await asyncio.sleep(settings.API_KEY_LAST_USED_FLUSH_SECONDS)
+        try:
+            await flush_last_used()
+        except Exception as e:
+            logger.warning(f"Failed to flush api_keys.last_used_at: {e}")
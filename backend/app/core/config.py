@@ -3,7 +3,9 @@ Application Configuration
 Manages environment variables and application settings
 """
 
+from datetime import datetime
 from typing import List
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -59,6 +61,17 @@ Obtenha sua API Key criando uma conta em [authbrasil.app.br](https://authbrasil.
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    AUTH_CACHE_TTL_SECONDS: int = 30  # Cached principal lifetime (bounds staleness across workers)
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    API_KEY_CACHE_TTL_SECONDS: int = 60
+    API_KEY_CACHE_MAX_ENTRIES: int = 10000
+    API_KEY_LAST_USED_FLUSH_SECONDS: int = 30  # Batched api_keys.last_used_at writes
+    BCRYPT_ROUNDS: int = 12  # bcrypt cost factor (each +1 doubles hashing time)
+    PASSWORD_HASH_WORKERS: int = 4  # Threads reserved for bcrypt, off the event loop
+    
+    # Usage metering (Plan.query_limit per calendar month)
+    METERING_FLUSH_SECONDS: int = 10  # Batched subscriptions.queries_used writes
+    METERING_FLUSH_MAX_PENDING: int = 1000  # Flush early past this many unflushed queries
     
     # Database
     DATABASE_URL: str
@@ -77,8 +90,13 @@ Obtenha sua API Key criando uma conta em [authbrasil.app.br](https://authbrasil.
     ]
     
     # Rate Limiting
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # memory (per worker) | redis (shared)
     RATE_LIMIT_PER_MINUTE: int = 60
-    RATE_LIMIT_LOGIN_ATTEMPTS: int = 5
+    RATE_LIMIT_LOGIN_ATTEMPTS: int = 5  # Per minute per IP (login and signup)
+    RATE_LIMIT_SEARCH_PER_MINUTE: int = 20  # Searches, insights and exports
+    RATE_LIMIT_MAX_KEYS: int = 100000  # In-process buckets kept (LRU)
+    RATE_LIMIT_REDIS_RETRY_SECONDS: int = 10  # In-process buckets for this long after a Redis failure
     
     # Stripe
     STRIPE_SECRET_KEY: str = ""
@@ -94,6 +112,55 @@ Obtenha sua API Key criando uma conta em [authbrasil.app.br](https://authbrasil.
     RECEITA_BASE_URL: str = "https://arquivos.receitafederal.gov.br/dados/cnpj/dados_abertos_cnpj/"
     ETL_CHUNK_SIZE: int = 100000
     ETL_TEMP_DIR: str = "/tmp/etl_receita"
+    ETL_BUILD_DOCUMENTS: bool = True  # Rebuild cnpj_documentos after each load
+    ETL_MAX_PARALLEL_COPIES: int = 2  # Files loaded concurrently within a table group (/etl/throttle overrides)
+    ETL_CONTROL_POLL_SECONDS: float = 5.0  # How often the worker checks pause/cancel/throttle
+    ETL_PROGRESS_FLUSH_SECONDS: float = 2.0  # Minimum interval between etl_status progress writes
+    ETL_EVENT_BUFFER_SIZE: int = 500  # Recent ETL log batches kept per API process (SSE replay)
+    ETL_LOG_BUFFER_LINES: int = 1000  # Recent ETL log lines kept per API process (/etl/logs)
+    ETL_STREAM_HEARTBEAT_SECONDS: float = 15.0  # Keep-alive comment on idle /etl/stream connections
+    ETL_RUNNER_POLL_SECONDS: float = 5.0  # How often app.etl.job_runner looks for queued jobs
+    ETL_BUSINESS_HOURS: str = ""  # e.g. "08:00-18:00" or "22:00-06:00" (overnight); empty disables the cap
+    ETL_BUSINESS_HOURS_MAX_COPIES: int = 1  # Concurrency cap inside ETL_BUSINESS_HOURS
+    ETL_TIMEZONE: str = "America/Sao_Paulo"  # Timezone of ETL_BUSINESS_HOURS
+    
+    # HTTP caching (ETag/Last-Modified follow the last completed ETL load)
+    DATA_GENERATION_POLL_SECONDS: int = 60  # How fast workers notice a new load
+    HTTP_CACHE_CONTROL: str = "public, no-cache"  # Caches store, but revalidate (auth/quota still apply)
+    
+    # Monitoring
+    METRICS_ENABLED: bool = True  # Prometheus /metrics (set PROMETHEUS_MULTIPROC_DIR with several workers)
+    HEALTH_CACHE_SECONDS: int = 5  # Probe results shared by all health checks in this window
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 2.0
+    DATA_MAX_AGE_DAYS: int = 45  # Older loads report data as stale (Receita publishes monthly)
+    
+    # SQL tracing
+    SQL_SLOW_QUERY_MS: int = 200  # Statements slower than this are logged (parameters redacted)
+    SQL_EXPLAIN_SAMPLE_RATE: float = 0.0  # Share of slow SELECTs re-run under EXPLAIN (ANALYZE, BUFFERS)
+    SQL_QUERY_COUNT_WARN: int = 10  # Requests running more statements are logged (N+1)
+    SQL_TRACE_HEADER: bool = False  # Send Server-Timing: db;dur=...;desc="N queries"
+    
+    # Compression (gzip, or brotli when installed)
+    COMPRESSION_MIN_SIZE: int = 1024  # Smaller bodies are sent as is
+    COMPRESSION_LOOKUP_MIN_SIZE: int = 8192  # Single-CNPJ lookups: only documents with many sócios
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # Dynamic content: favour speed over ratio
+    
+    # Export
+    EXPORT_BATCH_SIZE: int = 5000  # Rows fetched per server-side cursor round trip
+    
+    @field_validator("ETL_BUSINESS_HOURS")
+    @classmethod
+    def validate_business_hours(cls, value: str) -> str:
+        """Fail at startup, not mid-load; normalized to zero-padded HH:MM-HH:MM"""
+        value = value.strip()
+        if not value:
+            return value
+        try:
+            start, end = (datetime.strptime(part.strip(), "%H:%M") for part in value.split("-"))
+        except ValueError:
+            raise ValueError(f"ETL_BUSINESS_HOURS must be \"HH:MM-HH:MM\", got {value!r}")
+        return f"{start:%H:%M}-{end:%H:%M}"
     
     model_config = SettingsConfigDict(
         env_file=".env",
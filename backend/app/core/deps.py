@@ -3,25 +3,26 @@ Dependencies for FastAPI endpoints
 JWT authentication, database sessions, etc.
 """
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from app.core.config import settings
-from app.db.session import get_async_db
-from app.models.user import User
+from app.db.session import async_session, get_async_db
+from app.core.principal import AuthenticatedUser, get_principal
+from app.core.api_keys import is_api_key, authenticate_api_key
+from app.core.metering import meter
 
 security = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_async_db)
-) -> User:
+async def authenticate(db: AsyncSession, token: str) -> AuthenticatedUser:
     """
-    Get current user from JWT token
+    User of a JWT token or an API key (both as Bearer)
+    
+    The user snapshot is cached per (user id, credential) for
+    AUTH_CACHE_TTL_SECONDS, so steady-state requests do no DB round trip.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -29,10 +30,24 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    if is_api_key(token):
+        user = await authenticate_api_key(db, token)
+        
+        if user is None:
+            raise credentials_exception
+        
+        if not user.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Usuário inativo"
+            )
+        
+        return user
+    
     try:
         # Decode JWT token
         payload = jwt.decode(
-            credentials.credentials,
+            token,
             settings.JWT_SECRET_KEY,
             algorithms=[settings.JWT_ALGORITHM]
         )
@@ -42,11 +57,8 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    # Get user from database
-    result = await db.execute(
-        select(User).where(User.id == user_id)
-    )
-    user = result.scalar_one_or_none()
+    # Get user (cached principal, database on miss)
+    user = await get_principal(db, user_id, token)
     
     if user is None:
         raise credentials_exception
@@ -60,16 +72,78 @@ async def get_current_user(
     return user
 
 
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> AuthenticatedUser:
+    """Get current user from a JWT token or an API key (both as Bearer)"""
+    return await authenticate(db, credentials.credentials)
+
+
+def require_superuser(current_user: AuthenticatedUser) -> AuthenticatedUser:
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso negado. Apenas administradores podem acessar esta funcionalidade."
+        )
+    return current_user
+
+
 async def get_current_superuser(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: AuthenticatedUser = Depends(get_current_user)
+) -> AuthenticatedUser:
     """
     Get current superuser (admin only)
     Requires user to be a superuser
     """
-    if not current_user.is_superuser:
+    return require_superuser(current_user)
+
+
+async def get_streaming_superuser(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> AuthenticatedUser:
+    """
+    Superuser for long-lived responses (SSE)
+    
+    get_async_db is a yield dependency: its session would only be closed
+    when the stream ends, pinning a pooled connection for hours. The
+    user is resolved on a short-lived session instead.
+    """
+    async with async_session() as db:
+        user = await authenticate(db, credentials.credentials)
+    return require_superuser(user)
+
+
+async def require_quota(
+    response: Response,
+    current_user: AuthenticatedUser = Depends(get_current_user)
+) -> AuthenticatedUser:
+    """
+    Count the request against the user's monthly plan limit
+    Superusers are not metered
+    """
+    if current_user.is_superuser:
+        return current_user
+    
+    if current_user.subscription_id is None or current_user.query_limit is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Acesso negado. Apenas administradores podem acessar esta funcionalidade."
+            detail="Nenhuma assinatura ativa. Escolha um plano para consultar a API."
         )
+    
+    remaining = meter.try_consume(current_user)
+    
+    if remaining is None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Limite mensal de consultas do plano atingido",
+            headers={
+                "X-Quota-Limit": str(current_user.query_limit),
+                "X-Quota-Remaining": "0",
+            },
+        )
+    
+    response.headers["X-Quota-Limit"] = str(current_user.query_limit)
+    response.headers["X-Quota-Remaining"] = str(remaining)
+    
     return current_user
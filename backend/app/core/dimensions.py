@@ -0,0 +1,123 @@
+"""
+Dimension Cache
+In-memory lookup maps (code -> description) for the Receita auxiliary tables
+"""
+
+import logging
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
+
+from sqlalchemy import select
+
+from app.db.session import async_session
+from app.models.auxiliar import CNAE, Municipio, Natureza, Pais, Qualificacao, Motivo
+from app.models.empresa import SITUACOES_CADASTRAIS, PORTES_EMPRESA
+
+logger = logging.getLogger(__name__)
+
+# Dimension name -> auxiliary table model
+DIMENSION_TABLES = {
+    "cnaes": CNAE,
+    "municipios": Municipio,
+    "naturezas": Natureza,
+    "paises": Pais,
+    "qualificacoes": Qualificacao,
+    "motivos": Motivo,
+}
+
+
+def code_key(code: str) -> str:
+    """
+    Normalize codes so '0049' and '49' resolve to the same entry
+
+    cnpj_documentos applies the same rule in SQL (etl.documents._code_key),
+    so both lookup paths return the same descriptions.
+    """
+    return code.strip().lstrip('0') or '0'
+
+
+def _freeze(mapping: Dict[str, str]) -> Mapping[str, str]:
+    return MappingProxyType({code_key(code): desc for code, desc in mapping.items()})
+
+
+class DimensionCache:
+    """
+    Immutable code -> description maps, loaded once and swapped on refresh
+
+    Readers never lock: a refresh builds new maps and replaces the
+    reference in a single assignment.
+    """
+
+    def __init__(self):
+        self._maps: Mapping[str, Mapping[str, str]] = MappingProxyType({
+            "situacoes": _freeze(SITUACOES_CADASTRAIS),
+            "portes": _freeze(PORTES_EMPRESA),
+        })
+        self.loaded_at: Optional[datetime] = None
+
+    @property
+    def ready(self) -> bool:
+        """True once the auxiliary tables have been loaded"""
+        return self.loaded_at is not None
+
+    async def load(self) -> Dict[str, int]:
+        """
+        (Re)load all auxiliary tables into memory
+
+        Returns:
+            Number of entries per dimension
+        """
+        maps = {
+            "situacoes": _freeze(SITUACOES_CADASTRAIS),
+            "portes": _freeze(PORTES_EMPRESA),
+        }
+
+        async with async_session() as db:
+            for name, model in DIMENSION_TABLES.items():
+                result = await db.execute(select(model.codigo, model.descricao))
+                maps[name] = _freeze({
+                    codigo: descricao
+                    for codigo, descricao in result.all()
+                    if codigo is not None
+                })
+
+        self._maps = MappingProxyType(maps)
+        self.loaded_at = datetime.utcnow()
+
+        counts = {name: len(values) for name, values in maps.items()}
+        logger.info(f"Dimension cache loaded: {counts}")
+        return counts
+
+    def describe(self, dimension: str, code: Optional[str]) -> Optional[str]:
+        """Description for a code, or None if unknown"""
+        if not code:
+            return None
+        return self._maps.get(dimension, {}).get(code_key(code))
+
+    def cnae(self, code: Optional[str]) -> Optional[str]:
+        return self.describe("cnaes", code)
+
+    def municipio(self, code: Optional[str]) -> Optional[str]:
+        return self.describe("municipios", code)
+
+    def natureza(self, code: Optional[str]) -> Optional[str]:
+        return self.describe("naturezas", code)
+
+    def pais(self, code: Optional[str]) -> Optional[str]:
+        return self.describe("paises", code)
+
+    def qualificacao(self, code: Optional[str]) -> Optional[str]:
+        return self.describe("qualificacoes", code)
+
+    def motivo(self, code: Optional[str]) -> Optional[str]:
+        return self.describe("motivos", code)
+
+    def situacao(self, code: Optional[str]) -> Optional[str]:
+        return self.describe("situacoes", code)
+
+    def porte(self, code: Optional[str]) -> Optional[str]:
+        return self.describe("portes", code)
+
+
+dimensions = DimensionCache()
@@ -0,0 +1,157 @@
+"""
+Data generation
+Identifies the loaded Receita snapshot (last completed ETL) for HTTP caching
+"""
+
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.dimensions import dimensions
+from app.db.session import async_session
+from app.middleware.compression import negotiate
+from app.models.etl_status import ETLStatus
+
+logger = logging.getLogger(__name__)
+
+
+class DataGeneration:
+    """
+    The ETL job whose data is currently served
+
+    Refreshed by a background poll; when a new load completes, the
+    dimension cache is reloaded and every ETag changes.
+    """
+
+    def __init__(self):
+        self.job_id: Optional[str] = None
+        self.completed_at: Optional[datetime] = None
+        self.last_modified: Optional[str] = None  # HTTP-date
+
+    @property
+    def known(self) -> bool:
+        return self.job_id is not None
+
+    async def refresh(self) -> bool:
+        """
+        Read the latest completed ETL job
+
+        Returns:
+            True if the generation changed
+        """
+        async with async_session() as db:
+            result = await db.execute(
+                select(ETLStatus.job_id, ETLStatus.completed_at)
+                .where(ETLStatus.status == "completed", ETLStatus.completed_at.isnot(None))
+                .order_by(ETLStatus.completed_at.desc())
+                .limit(1)
+            )
+            row = result.first()
+
+        if row is None or row.job_id == self.job_id:
+            return False
+
+        self.job_id = row.job_id
+        self.completed_at = row.completed_at.replace(tzinfo=timezone.utc, microsecond=0)
+        self.last_modified = format_datetime(self.completed_at, usegmt=True)
+        return True
+
+    def etag(self, request: Request) -> str:
+        """Strong ETag for a URL under the current generation"""
+        seed = f"{self.job_id}:{settings.VERSION}:{request.url.path}?{request.url.query}"
+        return '"' + hashlib.sha1(seed.encode("utf-8")).hexdigest() + '"'
+
+
+data_generation = DataGeneration()
+
+
+def _strip_encoding(etag: str) -> str:
+    """Drop the suffix CompressionMiddleware adds to encoded representations"""
+    for suffix in ('-gzip"', '-br"'):
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+
+def _matching_etag(if_none_match: str, etag: str) -> Optional[str]:
+    """
+    The If-None-Match candidate that matches etag (weak comparison, as
+    required for If-None-Match), as the client sent it
+
+    Candidates may carry an encoding suffix: the 304 must name that
+    representation, or a cache could not freshen its gzip/br copy.
+    """
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or _strip_encoding(candidate.removeprefix("W/")) == etag:
+            return candidate
+    return None
+
+
+def _negotiated_etag(request: Request, etag: str) -> str:
+    """ETag of the representation CompressionMiddleware would send for this request"""
+    encoding = negotiate(request.headers.get("accept-encoding", ""))
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+def _not_modified_since(if_modified_since: str) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return since is not None and since.tzinfo is not None and data_generation.completed_at <= since
+
+
+async def conditional_get(request: Request, response: Response):
+    """
+    ETag / Last-Modified / Cache-Control for data derived from the current load
+
+    Answers 304 before the endpoint runs when the client's copy is current,
+    so the body is never assembled.
+    """
+    if not data_generation.known:
+        return
+
+    etag = data_generation.etag(request)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": data_generation.last_modified,
+        "Cache-Control": settings.HTTP_CACHE_CONTROL,
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+
+    if if_none_match:
+        matched = _matching_etag(if_none_match, etag)
+    elif if_modified_since and _not_modified_since(if_modified_since):
+        matched = "*"
+    else:
+        matched = None
+
+    if matched is not None:
+        # CompressionMiddleware leaves 304s alone: set what it sets on the 200
+        headers["ETag"] = _negotiated_etag(request, etag) if matched == "*" else matched
+        headers["Vary"] = "Accept-Encoding"
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+
+
+async def run_generation_watcher():
+    """Background task: pick up new ETL loads every DATA_GENERATION_POLL_SECONDS"""
+    while True:
+        await asyncio.sleep(settings.DATA_GENERATION_POLL_SECONDS)
+        try:
+            if await data_generation.refresh():
+                logger.info(f"New data generation {data_generation.job_id}, reloading dimensions")
+                await dimensions.load()
+        except Exception as e:
+            logger.warning(f"Data generation refresh failed: {e}")
@@ -0,0 +1,144 @@
+"""
+Usage metering
+Per-subscription monthly query counters, enforced in memory and flushed in batches
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.principal import AuthenticatedUser
+from app.db.session import async_session
+
+logger = logging.getLogger(__name__)
+
+# (subscription id, period start) -> count
+UsageKey = Tuple[int, date]
+
+FLUSH_SQL = text("""
+    UPDATE subscriptions AS s
+    SET queries_used = CASE
+            WHEN s.queries_period_start = :period THEN COALESCE(s.queries_used, 0) + v.n
+            ELSE v.n
+        END,
+        queries_period_start = :period
+    FROM unnest(CAST(:ids AS integer[]), CAST(:counts AS integer[])) AS v(id, n)
+    WHERE s.id = v.id
+      AND (s.queries_period_start IS NULL OR s.queries_period_start <= :period)
+    RETURNING s.id, s.queries_used
+""")
+
+
+def current_period() -> date:
+    """First day of the current (UTC) month"""
+    return datetime.utcnow().date().replace(day=1)
+
+
+class UsageMeter:
+    """
+    Monthly query counters for this worker
+
+    Each request increments an in-memory counter, so enforcement costs no
+    database round trip. Increments are written to subscriptions.queries_used
+    in one UPDATE every METERING_FLUSH_SECONDS (or once METERING_FLUSH_MAX_PENDING
+    are waiting), and the returned totals resync the local counters with what
+    other workers have flushed. A crash loses at most one flush window.
+    """
+
+    def __init__(self):
+        self._used: Dict[UsageKey, int] = {}
+        self._pending: Dict[UsageKey, int] = defaultdict(int)
+        self._pending_total = 0
+        self._lock = asyncio.Lock()
+        self._early_flush: Optional[asyncio.Task] = None
+
+    def usage(self, user: AuthenticatedUser) -> int:
+        """Queries used by the user's subscription in the current month"""
+        key = (user.subscription_id, current_period())
+        used = self._used.get(key)
+        if used is None:
+            used = user.queries_used if user.queries_period_start == key[1] else 0
+            self._used[key] = used
+        return used
+
+    def try_consume(self, user: AuthenticatedUser) -> Optional[int]:
+        """
+        Count one query against the user's plan
+
+        Returns:
+            Remaining queries, or None if the monthly limit is reached
+        """
+        used = self.usage(user)
+        if used >= user.query_limit:
+            return None
+
+        key = (user.subscription_id, current_period())
+        self._used[key] = used + 1
+        self._pending[key] += 1
+        self._pending_total += 1
+
+        if self._pending_total >= settings.METERING_FLUSH_MAX_PENDING and not (
+            self._early_flush and not self._early_flush.done()
+        ):
+            self._early_flush = asyncio.create_task(self.flush())
+
+        return user.query_limit - used - 1
+
+    async def flush(self) -> int:
+        """Write pending increments; re-queued if the write fails"""
+        async with self._lock:
+            if not self._pending:
+                return 0
+
+            pending, self._pending = self._pending, defaultdict(int)
+            self._pending_total = 0
+
+            by_period: Dict[date, Dict[int, int]] = defaultdict(dict)
+            for (subscription_id, period), count in pending.items():
+                by_period[period][subscription_id] = count
+
+            try:
+                async with async_session() as db:
+                    totals = {}
+                    for period, counts in sorted(by_period.items()):
+                        result = await db.execute(FLUSH_SQL, {
+                            "period": period,
+                            "ids": list(counts),
+                            "counts": list(counts.values()),
+                        })
+                        totals.update({(row.id, period): row.queries_used for row in result})
+                    await db.commit()
+            except Exception:
+                for key, count in pending.items():
+                    self._pending[key] += count
+                    self._pending_total += count
+                raise
+
+            # Database totals include other workers' flushes
+            for key, total in totals.items():
+                self._used[key] = total + self._pending.get(key, 0)
+
+            # Forget previous months
+            period = current_period()
+            for key in [k for k in self._used if k[1] != period]:
+                del self._used[key]
+
+            return sum(pending.values())
+
+
+meter = UsageMeter()
+
+
+async def run_usage_flusher():
+    """Background task: flush usage every METERING_FLUSH_SECONDS"""
+    while True:
+        await asyncio.sleep(settings.METERING_FLUSH_SECONDS)
+        try:
+            await meter.flush()
+        except Exception as e:
+            logger.warning(f"Failed to flush subscription usage: {e}")
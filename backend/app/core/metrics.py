@@ -0,0 +1,147 @@
+"""
+Metrics
+Prometheus instruments and scrape-time collectors for the /metrics endpoint
+"""
+
+import os
+import time
+
+from fastapi import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Gauge,
+    Histogram,
+    generate_latest,
+    REGISTRY,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+from sqlalchemy import select
+
+from app.core.api_keys import api_key_cache
+from app.core.dimensions import dimensions
+from app.core.principal import principal_cache
+from app.db.base import engine
+from app.db.session import async_engine, async_session
+from app.models.etl_status import ETLStatus
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_SECONDS = Histogram(
+    "db_query_duration_seconds_per_request",
+    "Total SQL time spent by one request, by route template",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    "db_queries_per_request",
+    "Number of SQL statements executed by one request, by route template",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100),
+)
+
+ETL_RECORDS = Gauge("etl_records_imported", "Records imported by the latest ETL job")
+ETL_ROWS_PER_SECOND = Gauge("etl_rows_per_second", "Average import rate of the latest ETL job")
+ETL_BYTES_PER_SECOND = Gauge("etl_bytes_per_second", "ZIP bytes loaded per second by the latest ETL job")
+ETL_PROGRESS = Gauge("etl_progress_percent", "Progress of the latest ETL job")
+ETL_RUNNING = Gauge("etl_running", "1 while an ETL job is running")
+
+ETL_REFRESH_SECONDS = 5  # Scrapes within this window reuse the last etl_status read
+_etl_refreshed_at = 0.0
+
+
+class PoolCollector:
+    """Connection pool state of both engines, read at scrape time"""
+
+    def collect(self):
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections in use", labels=["engine"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Connections above pool_size", labels=["engine"])
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["engine"])
+
+        for name, pool in (("async", async_engine.pool), ("sync", engine.pool)):
+            checked_out.add_metric([name], pool.checkedout())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+            size.add_metric([name], pool.size())
+
+        yield checked_out
+        yield overflow
+        yield size
+
+
+class CacheCollector:
+    """Hit/miss counters of the in-process caches"""
+
+    def collect(self):
+        hits = CounterMetricFamily("cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache misses", labels=["cache"])
+        ratio = GaugeMetricFamily("cache_hit_ratio", "Hits / lookups since start", labels=["cache"])
+        entries = GaugeMetricFamily("cache_entries", "Entries currently cached", labels=["cache"])
+
+        for name, cache in (("principal", principal_cache), ("api_key", api_key_cache)):
+            hits.add_metric([name], cache.hits)
+            misses.add_metric([name], cache.misses)
+            lookups = cache.hits + cache.misses
+            ratio.add_metric([name], cache.hits / lookups if lookups else 0.0)
+            entries.add_metric([name], len(cache))
+
+        yield hits
+        yield misses
+        yield ratio
+        yield entries
+
+        yield GaugeMetricFamily("dimension_cache_ready", "1 once lookup tables are loaded", value=int(dimensions.ready))
+
+
+REGISTRY.register(PoolCollector())
+REGISTRY.register(CacheCollector())
+
+
+async def refresh_etl_metrics():
+    """Read the latest etl_status row (the ETL may run in another process)"""
+    global _etl_refreshed_at
+
+    if time.monotonic() - _etl_refreshed_at < ETL_REFRESH_SECONDS:
+        return
+    _etl_refreshed_at = time.monotonic()
+
+    async with async_session() as db:
+        result = await db.execute(
+            select(ETLStatus).order_by(ETLStatus.created_at.desc()).limit(1)
+        )
+        job = result.scalar_one_or_none()
+
+    if job is None:
+        return
+
+    records = job.records_imported or 0
+    ETL_RECORDS.set(records)
+    if job.records_per_second is not None:
+        ETL_ROWS_PER_SECOND.set(job.records_per_second)
+    else:
+        ETL_ROWS_PER_SECOND.set(records / job.elapsed_seconds if job.elapsed_seconds else 0)
+    ETL_BYTES_PER_SECOND.set(job.bytes_per_second or 0)
+    ETL_PROGRESS.set(job.progress_percent or 0)
+    ETL_RUNNING.set(1 if job.status == "running" else 0)
+
+
+async def metrics_endpoint():
+    """Prometheus exposition"""
+    try:
+        await refresh_etl_metrics()
+    except Exception:
+        pass  # Database down: still expose request and pool metrics
+
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,98 @@
+"""
+Authenticated principal
+Cached snapshot of the user (and plan limits) behind a request
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+from app.models.subscription import Subscription
+from app.models.plan import Plan
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Immutable user snapshot - what endpoints see as current_user"""
+    id: int
+    email: str
+    full_name: Optional[str]
+    is_active: bool
+    is_superuser: bool
+    is_verified: bool
+    subscription_id: Optional[int] = None
+    query_limit: Optional[int] = None
+    queries_used: int = 0
+    queries_period_start: Optional[date] = None
+
+
+# (user_id, credential) -> AuthenticatedUser
+principal_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+async def load_principal(db: AsyncSession, user_id: int) -> Optional[AuthenticatedUser]:
+    """Load a user and its active subscription limits in one query"""
+    result = await db.execute(
+        select(
+            User,
+            Subscription.id,
+            Plan.query_limit,
+            Subscription.queries_used,
+            Subscription.queries_period_start,
+        )
+        .outerjoin(
+            Subscription,
+            and_(Subscription.user_id == User.id, Subscription.is_active.is_(True))
+        )
+        .outerjoin(Plan, Plan.id == Subscription.plan_id)
+        .where(User.id == user_id)
+        .order_by(Subscription.created_at.desc())
+        .limit(1)
+    )
+    row = result.first()
+
+    if row is None:
+        return None
+
+    user, subscription_id, query_limit, queries_used, queries_period_start = row
+    return AuthenticatedUser(
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        is_active=bool(user.is_active),
+        is_superuser=bool(user.is_superuser),
+        is_verified=bool(user.is_verified),
+        subscription_id=subscription_id,
+        query_limit=query_limit,
+        queries_used=queries_used or 0,
+        queries_period_start=queries_period_start,
+    )
+
+
+async def get_principal(db: AsyncSession, user_id: int, credential: str) -> Optional[AuthenticatedUser]:
+    """Cached principal lookup; hits the database only on a miss"""
+    key = (user_id, credential)
+    principal = principal_cache.get(key)
+
+    if principal is None:
+        principal = await load_principal(db, user_id)
+        if principal is not None:
+            principal_cache.set(key, principal)
+
+    return principal
+
+
+def invalidate_principal(user_id: int):
+    """Drop every cached principal of a user (deactivation, plan change, ...)"""
+    for key in principal_cache.keys():
+        if key[0] == user_id:
+            principal_cache.pop(key)
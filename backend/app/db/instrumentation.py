@@ -0,0 +1,188 @@
+"""
+Database instrumentation
+SQLAlchemy cursor hooks: per-request SQL stats, slow-query log, sampled EXPLAIN
+"""
+
+import asyncio
+import logging
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_LOGGED_STATEMENT = 2000
+EXPLAIN_STATEMENT_TIMEOUT_MS = 30000
+EXPLAIN_MAX_IN_FLIGHT = 2
+
+
+@dataclass
+class QueryStats:
+    """SQL activity of one request"""
+    queries: int = 0
+    seconds: float = 0.0
+    route: Optional[Callable[[], str]] = None  # "METHOD /route/{template}", resolved once routed
+
+
+# Set by the metrics middleware for the duration of a request
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+# EXPLAIN runs for the sync engine happen off the caller's thread
+_explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+_explains_in_flight = 0
+
+
+def _compact(statement: str) -> str:
+    statement = re.sub(r"\s+", " ", statement).strip()
+    if len(statement) > MAX_LOGGED_STATEMENT:
+        return statement[:MAX_LOGGED_STATEMENT] + "..."
+    return statement
+
+
+def _redact_value(value: Any) -> Any:
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return f"<str:{len(value)}>"
+    if isinstance(value, (list, tuple)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """Parameter shapes only (types and lengths), never values"""
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {key: _redact_value(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact_value(value) for value in parameters]
+    return _redact_value(parameters)
+
+
+# Plan lines that print expressions (and so the bound or inlined values)
+_PLAN_EXPRESSION = re.compile(
+    r"^\s*(?:Index Cond|Recheck Cond|TID Cond|Hash Cond|Merge Cond|Filter|Join Filter"
+    r"|One-Time Filter|Order By|Cache Key|Output):"
+)
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMERIC_LITERAL = re.compile(r"(?<![\w.$])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?(?![\w.])")
+
+
+def redact_plan(plan: str) -> str:
+    """
+    EXPLAIN text without literal values
+
+    psycopg2 inlines parameters on the client and asyncpg custom plans show
+    the bound values, so conditions would print search terms and CPF/CNPJ
+    numbers. String literals are masked everywhere; numbers only on
+    expression lines, so costs, rows, timings and buffers stay readable.
+    """
+    lines = []
+    for line in plan.splitlines():
+        line = _STRING_LITERAL.sub("'?'", line)
+        if _PLAN_EXPRESSION.match(line):
+            line = _NUMERIC_LITERAL.sub("?", line)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _explain_sql(statement: str) -> str:
+    return f"EXPLAIN (ANALYZE, BUFFERS) {statement}"
+
+
+def _log_plan(statement: str, rows):
+    plan = redact_plan("\n".join(row[0] for row in rows))
+    logger.warning(f"EXPLAIN for slow query: {_compact(statement)}\n{plan}")
+
+
+def _explain_sync(engine: Engine, statement: str, parameters):
+    global _explains_in_flight
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {EXPLAIN_STATEMENT_TIMEOUT_MS}")
+            _log_plan(statement, conn.exec_driver_sql(_explain_sql(statement), parameters).all())
+            conn.rollback()
+    except Exception as e:
+        logger.warning(f"EXPLAIN capture failed: {e}")
+    finally:
+        _explains_in_flight -= 1
+
+
+async def _explain_async(engine: AsyncEngine, statement: str, parameters):
+    global _explains_in_flight
+    try:
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql(f"SET LOCAL statement_timeout = {EXPLAIN_STATEMENT_TIMEOUT_MS}")
+            result = await conn.exec_driver_sql(_explain_sql(statement), parameters)
+            _log_plan(statement, result.all())
+            await conn.rollback()
+    except Exception as e:
+        logger.warning(f"EXPLAIN capture failed: {e}")
+    finally:
+        _explains_in_flight -= 1
+
+
+def _schedule_explain(conn, statement: str, parameters):
+    """
+    Re-run a sampled slow SELECT under EXPLAIN (ANALYZE, BUFFERS) on a
+    separate connection of the same engine, without blocking the caller
+    """
+    global _explains_in_flight
+
+    if not statement.lstrip()[:6].upper() == "SELECT" or "FOR UPDATE" in statement.upper():
+        return
+    if _explains_in_flight >= EXPLAIN_MAX_IN_FLIGHT:
+        return
+    if random.random() >= settings.SQL_EXPLAIN_SAMPLE_RATE:
+        return
+
+    if conn.dialect.is_async:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        _explains_in_flight += 1
+        loop.create_task(_explain_async(AsyncEngine(conn.engine), statement, parameters))
+    else:
+        _explains_in_flight += 1
+        _explain_executor.submit(_explain_sync, conn.engine, statement, parameters)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+    if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.1f} ms"
+            f"{', ' + stats.route() if stats and stats.route else ''}): "
+            f"{_compact(statement)} | params={redact_parameters(parameters, executemany)}"
+        )
+        if settings.SQL_EXPLAIN_SAMPLE_RATE > 0 and not executemany:
+            _schedule_explain(conn, statement, parameters)
+
+
+def instrument_engine(engine: Engine):
+    """Attach the hooks (pass async_engine.sync_engine for the async engine)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
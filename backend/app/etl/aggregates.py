@@ -0,0 +1,118 @@
+"""
+Aggregates Module
+Builds the estatisticas_estabelecimentos rollups once per load
+"""
+
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# Dimension -> source expression (estabelecimentos e, empresas emp, simples s)
+DIMENSIONS: Dict[str, str] = {
+    "uf": "e.uf",
+    "municipio": "e.municipio",
+    "cnae_fiscal_principal": "e.cnae_fiscal_principal",
+    "situacao_cadastral": "e.situacao_cadastral",
+    "porte_empresa": "emp.porte_empresa",
+    "opcao_simples": "s.opcao_simples",
+    "opcao_mei": "s.opcao_mei",
+}
+
+# Rollup levels (grouping sets) materialized in a single pass.
+# Queries are answered from the smallest level covering their dimensions.
+ROLLUP_LEVELS: Dict[str, Tuple[str, ...]] = {
+    "cnae": ("cnae_fiscal_principal", "situacao_cadastral"),
+    "uf_cnae": ("uf", "cnae_fiscal_principal", "situacao_cadastral"),
+    "uf_perfil": ("uf", "situacao_cadastral", "porte_empresa", "opcao_simples", "opcao_mei"),
+    "municipio_cnae": ("uf", "municipio", "cnae_fiscal_principal", "situacao_cadastral"),
+    "municipio_perfil": ("uf", "municipio", "situacao_cadastral", "porte_empresa", "opcao_simples", "opcao_mei"),
+    "completo": tuple(DIMENSIONS),
+}
+
+
+def choose_level(dimensions: Iterable[str]) -> Optional[str]:
+    """
+    Pick the smallest rollup level containing all requested dimensions
+
+    Returns:
+        Level name, or None if no level covers the dimensions
+    """
+    wanted = set(dimensions)
+    candidates = [
+        (len(level_dims), name)
+        for name, level_dims in ROLLUP_LEVELS.items()
+        if wanted.issubset(level_dims)
+    ]
+    return min(candidates)[1] if candidates else None
+
+
+def _grouping_mask(level_dims: Tuple[str, ...]) -> int:
+    """GROUPING() bitmask for a level (bit set = dimension rolled up)"""
+    names = list(DIMENSIONS)
+    return sum(
+        1 << (len(names) - 1 - i)
+        for i, name in enumerate(names)
+        if name not in level_dims
+    )
+
+
+def build_rollup_sql() -> str:
+    """Build the INSERT ... GROUPING SETS statement for all levels"""
+    columns = list(DIMENSIONS)
+    expressions = [DIMENSIONS[c] for c in columns]
+
+    level_case = "\n".join(
+        f"            WHEN {_grouping_mask(dims)} THEN '{name}'"
+        for name, dims in ROLLUP_LEVELS.items()
+    )
+    grouping_sets = ",\n".join(
+        f"            ({', '.join(DIMENSIONS[d] for d in dims)})"
+        for dims in ROLLUP_LEVELS.values()
+    )
+
+    return f"""
+        INSERT INTO estatisticas_estabelecimentos (nivel, {', '.join(columns)}, total)
+        SELECT
+            CASE GROUPING({', '.join(expressions)})
+{level_case}
+            END,
+            {', '.join(expressions)},
+            COUNT(*)
+        FROM estabelecimentos e
+        LEFT JOIN empresas emp ON emp.cnpj_basico = e.cnpj_basico
+        LEFT JOIN simples s ON s.cnpj_basico = e.cnpj_basico
+        GROUP BY GROUPING SETS (
+{grouping_sets}
+        )
+    """
+
+
+async def rebuild_aggregates(session: AsyncSession) -> int:
+    """
+    Rebuild estatisticas_estabelecimentos from the loaded tables
+
+    Runs in a single transaction: readers keep seeing the previous
+    rollups until the commit.
+
+    Returns:
+        Number of rollup rows written
+    """
+    logger.info("Rebuilding estatisticas_estabelecimentos...")
+
+    try:
+        await session.execute(text("SET LOCAL work_mem = '256MB'"))
+        await session.execute(text("DELETE FROM estatisticas_estabelecimentos"))
+        result = await session.execute(text(build_rollup_sql()))
+        await session.execute(text("ANALYZE estatisticas_estabelecimentos"))
+        await session.commit()
+    except Exception as e:
+        logger.error(f"Error rebuilding aggregates: {e}")
+        await session.rollback()
+        raise
+
+    logger.info(f"✅ estatisticas_estabelecimentos rebuilt ({result.rowcount:,} rows)")
+    return result.rowcount
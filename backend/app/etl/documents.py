@@ -0,0 +1,162 @@
+"""
+Documents Module
+Builds cnpj_documentos: one precomputed lookup payload per CNPJ
+"""
+
+import logging
+from typing import Dict
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dimensions import code_key
+from app.models.empresa import SITUACOES_CADASTRAIS, PORTES_EMPRESA
+
+logger = logging.getLogger(__name__)
+
+
+def _code_key(expression: str) -> str:
+    """SQL version of dimensions.code_key: trimmed, without leading zeros (NULL/empty stay unmatched)"""
+    return f"CASE WHEN btrim({expression}) <> '' THEN coalesce(nullif(ltrim(btrim({expression}), '0'), ''), '0') END"
+
+
+def _code_join(table: str, alias: str, expression: str) -> str:
+    """LEFT JOIN an auxiliary table on the normalized code"""
+    return f"LEFT JOIN {table} {alias} ON {_code_key(f'{alias}.codigo')} = {_code_key(expression)}"
+
+
+def _case(expression: str, mapping: Dict[str, str]) -> str:
+    """Inline a fixed code -> description mapping as a SQL CASE (normalized codes)"""
+    whens = " ".join(f"WHEN '{code_key(code)}' THEN '{desc}'" for code, desc in mapping.items())
+    return f"CASE {_code_key(expression)} {whens} END"
+
+
+def _phone(ddd: str, phone: str) -> str:
+    """Same formatting as the API: (DDD) TELEFONE"""
+    return f"CASE WHEN {ddd} IS NOT NULL THEN '(' || {ddd} || ') ' || coalesce({phone}, '') END"
+
+
+def build_documents_sql(target: str) -> str:
+    """
+    Build the INSERT ... SELECT producing the GET /cnpj/{cnpj} payload
+
+    Key order matches app.api.v1.endpoints.cnpj.montar_documento, and codes
+    are matched as the dimension cache matches them (leading zeros ignored).
+    """
+    return f"""
+        INSERT INTO {target} (cnpj_completo, documento, atualizado_em)
+        SELECT
+            e.cnpj_completo,
+            json_build_object(
+                'cnpj', e.cnpj_completo,
+                'razao_social', emp.razao_social,
+                'nome_fantasia', e.nome_fantasia,
+                'situacao_cadastral', e.situacao_cadastral,
+                'situacao_cadastral_descricao', {_case('e.situacao_cadastral', SITUACOES_CADASTRAIS)},
+                'data_situacao_cadastral', e.data_situacao_cadastral,
+                'motivo_situacao_cadastral', e.motivo_situacao_cadastral,
+                'motivo_situacao_cadastral_descricao', mot.descricao,
+                'endereco', json_build_object(
+                    'logradouro', e.logradouro,
+                    'numero', e.numero,
+                    'complemento', e.complemento,
+                    'bairro', e.bairro,
+                    'cep', e.cep,
+                    'municipio', e.municipio,
+                    'municipio_descricao', mun.descricao,
+                    'uf', e.uf,
+                    'cidade_exterior', e.cidade_exterior,
+                    'pais', e.pais,
+                    'pais_descricao', pai.descricao
+                ),
+                'contato', json_build_object(
+                    'email', e.email,
+                    'telefone_1', {_phone('e.ddd_1', 'e.telefone_1')},
+                    'telefone_2', {_phone('e.ddd_2', 'e.telefone_2')}
+                ),
+                'atividade', json_build_object(
+                    'cnae_principal', e.cnae_fiscal_principal,
+                    'cnae_principal_descricao', cn.descricao,
+                    'cnae_secundaria', e.cnae_fiscal_secundaria
+                ),
+                'socios', coalesce(soc.socios, '[]'::json),
+                'capital_social', emp.capital_social,
+                'porte', emp.porte_empresa,
+                'porte_descricao', {_case('emp.porte_empresa', PORTES_EMPRESA)},
+                'natureza_juridica', emp.natureza_juridica,
+                'natureza_juridica_descricao', nat.descricao
+            ),
+            e.updated_at
+        FROM estabelecimentos e
+        LEFT JOIN empresas emp ON emp.cnpj_basico = e.cnpj_basico
+        LEFT JOIN (
+            SELECT
+                s.cnpj_basico,
+                json_agg(json_build_object(
+                    'nome', s.nome_socio,
+                    'cpf_cnpj', s.cpf_cnpj_socio,
+                    'qualificacao', s.qualificacao_socio,
+                    'qualificacao_descricao', q.descricao,
+                    'data_entrada', s.data_entrada_sociedade
+                ) ORDER BY s.id) AS socios
+            FROM socios s
+            {_code_join('qualificacoes', 'q', 's.qualificacao_socio')}
+            GROUP BY s.cnpj_basico
+        ) soc ON soc.cnpj_basico = e.cnpj_basico
+        {_code_join('municipios', 'mun', 'e.municipio')}
+        {_code_join('cnaes', 'cn', 'e.cnae_fiscal_principal')}
+        {_code_join('naturezas', 'nat', 'emp.natureza_juridica')}
+        {_code_join('motivos', 'mot', 'e.motivo_situacao_cadastral')}
+        {_code_join('paises', 'pai', 'e.pais')}
+        WHERE e.cnpj_completo IS NOT NULL
+    """
+
+
+async def rebuild_documents(session: AsyncSession) -> int:
+    """
+    Rebuild cnpj_documentos from the loaded tables
+
+    Builds into cnpj_documentos_novo (no index during the insert, primary
+    key added afterwards) and swaps it in with a short rename transaction,
+    so lookups keep hitting the previous generation until the swap.
+
+    Returns:
+        Number of documents written
+    """
+    logger.info("Building cnpj_documentos_novo...")
+
+    try:
+        await session.execute(text("DROP TABLE IF EXISTS cnpj_documentos_novo"))
+        await session.execute(text(
+            "CREATE TABLE cnpj_documentos_novo (LIKE cnpj_documentos INCLUDING DEFAULTS)"
+        ))
+        await session.execute(text("SET LOCAL work_mem = '256MB'"))
+        result = await session.execute(text(build_documents_sql("cnpj_documentos_novo")))
+        await session.execute(text(
+            "ALTER TABLE cnpj_documentos_novo "
+            "ADD CONSTRAINT cnpj_documentos_novo_pkey PRIMARY KEY (cnpj_completo)"
+        ))
+        await session.commit()
+    except Exception as e:
+        logger.error(f"Error building cnpj_documentos: {e}")
+        await session.rollback()
+        raise
+
+    logger.info(f"Swapping cnpj_documentos ({result.rowcount:,} documents)...")
+
+    try:
+        await session.execute(text("DROP TABLE cnpj_documentos"))
+        await session.execute(text("ALTER TABLE cnpj_documentos_novo RENAME TO cnpj_documentos"))
+        await session.execute(text(
+            "ALTER TABLE cnpj_documentos "
+            "RENAME CONSTRAINT cnpj_documentos_novo_pkey TO cnpj_documentos_pkey"
+        ))
+        await session.execute(text("ANALYZE cnpj_documentos"))
+        await session.commit()
+    except Exception as e:
+        logger.error(f"Error swapping cnpj_documentos: {e}")
+        await session.rollback()
+        raise
+
+    logger.info("✅ cnpj_documentos rebuilt")
+    return result.rowcount
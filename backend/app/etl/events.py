@@ -0,0 +1,277 @@
+"""
+ETL Events
+Live progress and log lines, from the job runner to the API via Postgres NOTIFY
+
+The job runner publishes on the etl_events channel: a status snapshot on
+every ProgressReporter flush and log lines in small batches. Each API
+process LISTENs on one dedicated connection and keeps the latest snapshot
+and a ring buffer of recent events in memory; /etl/stream (Server-Sent
+Events) and /etl/logs are served from there, without reading etl_status
+or the log file per request.
+
+Event ids come from the publisher, not from the API process: every log
+batch carries a time-based id (microseconds, strictly increasing in the
+runner), the same in every uvicorn worker, so a client reconnecting with
+Last-Event-ID to another worker resumes at the right line. Progress events
+are full snapshots and are never replayed; their SSE id is the id of the
+last log batch received, so Last-Event-ID always marks a log position.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+import asyncpg
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import async_session
+from app.models.etl_status import ETLStatus
+from app.schemas.etl import ETLStatusResponse
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "etl_events"
+MAX_PAYLOAD_BYTES = 7900  # NOTIFY payloads are limited to 8000 bytes
+MAX_LOG_LINE = 1000
+LOG_BATCH_SECONDS = 0.2  # Lines logged within this window share one NOTIFY
+RECONNECT_SECONDS = 5
+
+Event = Tuple[int, str, Any]  # (id, type, data); id = publisher id of the (last) log batch
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def encode(kind: str, data: Any, event_id: Optional[int] = None) -> str:
+    event = {"type": kind, "data": data}
+    if event_id is not None:
+        event["id"] = event_id
+    return json.dumps(event, default=_json_default, ensure_ascii=False)
+
+
+async def publish(db: AsyncSession, kind: str, data: Any, event_id: Optional[int] = None):
+    """
+    NOTIFY an event on the session's transaction
+
+    Delivered when the transaction commits (never for a rollback), so a
+    progress event never announces an UPDATE that did not happen.
+    """
+    payload = encode(kind, data, event_id)
+    if len(payload.encode("utf-8")) > MAX_PAYLOAD_BYTES and isinstance(data, dict):
+        # Long error messages (psql stderr): the full text stays in etl_status
+        data = {key: value[:MAX_LOG_LINE] if isinstance(value, str) else value for key, value in data.items()}
+        payload = encode(kind, data, event_id)
+
+    await db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": CHANNEL, "payload": payload}
+    )
+
+
+class LogPublisher(logging.Handler):
+    """
+    Logging handler of the job runner: forwards lines to the API
+
+    emit() only queues the line; run() sends the queue in batches, so
+    logging never waits on the database. Lines are dropped (not blocked
+    on) when the queue is full.
+    """
+
+    def __init__(self, level: int = logging.INFO):
+        super().__init__(level)
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.ETL_LOG_BUFFER_LINES)
+        self.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        self.last_id = 0
+
+    def next_id(self) -> int:
+        """Microseconds since the epoch, bumped to stay strictly increasing (survives runner restarts)"""
+        self.last_id = max(self.last_id + 1, time.time_ns() // 1000)
+        return self.last_id
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            line = self.format(record)[:MAX_LOG_LINE]
+            self.loop.call_soon_threadsafe(self._put, line)
+        except Exception:
+            self.handleError(record)
+
+    def _put(self, line: str):
+        try:
+            self.queue.put_nowait(line)
+        except asyncio.QueueFull:
+            pass
+
+    async def run(self):
+        """Background task: one NOTIFY per batch of lines"""
+        carry: Optional[str] = None
+        while True:
+            lines = [carry if carry is not None else await self.queue.get()]
+            carry = None
+            await asyncio.sleep(LOG_BATCH_SECONDS)
+
+            size = len(encode("log", lines).encode("utf-8"))
+            while not self.queue.empty():
+                line = self.queue.get_nowait()
+                size += len(json.dumps(line, ensure_ascii=False).encode("utf-8")) + 2
+                if size > MAX_PAYLOAD_BYTES:
+                    carry = line
+                    break
+                lines.append(line)
+
+            try:
+                async with async_session() as db:
+                    await publish(db, "log", lines, event_id=self.next_id())
+                    await db.commit()
+            except Exception:
+                # Not logged: the line would come straight back here
+                pass
+
+
+class ETLEventStream:
+    """
+    Events received by this API process
+
+    - progress: latest status snapshot of the current job (deltas from the
+      runner are merged; a new job_id starts a new snapshot)
+    - log_lines: recent log lines (ETL_LOG_BUFFER_LINES)
+    - events: ring buffer of the last ETL_EVENT_BUFFER_SIZE log batches,
+      keyed by publisher id, replayed to SSE clients reconnecting with
+      Last-Event-ID
+    """
+
+    def __init__(self):
+        self.progress: Optional[Dict[str, Any]] = None
+        self.log_lines: Deque[str] = deque(maxlen=settings.ETL_LOG_BUFFER_LINES)
+        self.events: Deque[Event] = deque(maxlen=settings.ETL_EVENT_BUFFER_SIZE)
+        self.last_id = 0  # Publisher id of the latest log batch
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.listening = False
+
+    def dispatch(self, kind: str, data: Any, event_id: Optional[int] = None):
+        """Record an event and fan it out to the SSE clients"""
+        if kind == "progress":
+            if self.progress is None or self.progress.get("job_id") != data.get("job_id"):
+                self.progress = dict(data)
+            else:
+                self.progress.update(data)
+            event = (self.last_id, kind, dict(self.progress))
+        elif kind == "log":
+            if event_id is None:
+                event_id = self.last_id + 1  # Publisher without ids
+            self.log_lines.extend(data)
+            self.last_id = max(self.last_id, event_id)
+            event = (event_id, kind, data)
+            self.events.append(event)
+        else:
+            return
+
+        for queue in self.subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                pass  # Slow client: the next progress event carries the full state
+
+    def backlog(self, last_event_id: Optional[int] = None) -> List[Event]:
+        """
+        Events for a (re)connecting client
+
+        The buffered log batches after last_event_id (all of them for a new
+        client), then the current snapshot, which carries the latest id.
+        Ids are the publisher's, so this holds whichever worker the client
+        was connected to before.
+        """
+        events = [e for e in self.events if last_event_id is None or e[0] > last_event_id]
+
+        if self.progress is not None:
+            events.append((self.last_id, "progress", dict(self.progress)))
+        return events
+
+    async def seed(self):
+        """Snapshot of the latest job from etl_status (on startup and after a reconnect)"""
+        async with async_session() as db:
+            result = await db.execute(
+                select(ETLStatus).order_by(ETLStatus.created_at.desc()).limit(1)
+            )
+            job = result.scalar_one_or_none()
+
+        if job is not None:
+            snapshot = ETLStatusResponse.model_validate(job).model_dump(mode="json")
+            self.progress = None
+            self.dispatch("progress", snapshot)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            event = json.loads(payload)
+            self.dispatch(event["type"], event["data"], event.get("id"))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Invalid ETL event: {e}")
+
+    async def listen(self):
+        """Background task: LISTEN on a dedicated connection, reconnecting on loss"""
+        while True:
+            connection = None
+            try:
+                lost = asyncio.Event()
+                connection = await asyncpg.connect(settings.DATABASE_URL)
+                connection.add_termination_listener(lambda _conn: lost.set())
+                await connection.add_listener(CHANNEL, self._on_notify)
+                self.listening = True
+                try:
+                    await self.seed()
+                except Exception as e:
+                    logger.warning(f"ETL status snapshot not loaded: {e}")
+                await lost.wait()
+                logger.warning("ETL event connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"ETL event listener failed: {e}")
+            finally:
+                self.listening = False
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    async def sse(self, last_event_id: Optional[int] = None) -> AsyncIterator[str]:
+        """Server-Sent Events: backlog, then live events and heartbeats"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.ETL_EVENT_BUFFER_SIZE)
+        self.subscribers.add(queue)
+        try:
+            # Reconnect delay for EventSource-compatible clients
+            yield f"retry: {RECONNECT_SECONDS * 1000}\n\n"
+            for event in self.backlog(last_event_id):
+                yield format_sse(*event)
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=settings.ETL_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(*event)
+        finally:
+            self.subscribers.discard(queue)
+
+
+def format_sse(event_id: int, kind: str, data: Any) -> str:
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data, default=_json_default, ensure_ascii=False)}\n\n"
+
+
+etl_events = ETLEventStream()
+
+
+async def run_event_listener():
+    """Background task of the API (lifespan)"""
+    await etl_events.listen()
@@ -0,0 +1,211 @@
+"""
+ETL Job Runner
+Out-of-process worker: claims queued etl_status jobs and runs ETLWorker
+
+The API only enqueues (status "queued") and reads status; this process
+claims one job at a time with SELECT ... FOR UPDATE SKIP LOCKED, so
+several runners can poll the same table safely.
+
+While a job runs, the runner holds a session-level advisory lock keyed on
+the job id. A "running"/"paused" job whose lock is free belongs to a dead
+runner: it is re-queued and resumed from its checkpoints.
+
+Log lines of the app.etl loggers are also published to the API (events.py)
+for the admin UI's live view.
+
+Usage:
+    python -m app.etl.job_runner [--once] [--log-file /var/log/etl.log]
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.db.session import async_engine, async_session
+from app.etl.events import LogPublisher
+from app.etl.worker_v2 import ETLWorker
+from app.models.etl_status import ETLStatus
+
+logger = logging.getLogger(__name__)
+
+JOB_LOCK_CLASS = 4801  # pg_advisory_lock(class, hashtext(job_id)) namespace
+
+
+async def try_lock(lock_conn: AsyncConnection, job_id: str) -> bool:
+    result = await lock_conn.execute(
+        text("SELECT pg_try_advisory_lock(:cls, hashtext(:job_id))"),
+        {"cls": JOB_LOCK_CLASS, "job_id": job_id}
+    )
+    return bool(result.scalar())
+
+
+async def unlock(lock_conn: AsyncConnection, job_id: str):
+    await lock_conn.execute(
+        text("SELECT pg_advisory_unlock(:cls, hashtext(:job_id))"),
+        {"cls": JOB_LOCK_CLASS, "job_id": job_id}
+    )
+
+
+async def recover_orphans(lock_conn: AsyncConnection) -> int:
+    """Re-queue running/paused jobs whose runner is gone (lock not held)"""
+    async with async_session() as db:
+        result = await db.execute(
+            select(ETLStatus.job_id).where(ETLStatus.status.in_(("running", "paused")))
+        )
+        job_ids = result.scalars().all()
+
+    recovered = 0
+    for job_id in job_ids:
+        if not await try_lock(lock_conn, job_id):
+            continue  # Another runner is on it
+        try:
+            async with async_session() as db:
+                result = await db.execute(
+                    update(ETLStatus)
+                    .where(ETLStatus.job_id == job_id, ETLStatus.status.in_(("running", "paused")))
+                    .values(status="queued", updated_at=datetime.utcnow())
+                )
+                await db.commit()
+            if result.rowcount:
+                recovered += 1
+                logger.warning(f"♻️  Re-queued orphaned ETL job {job_id}")
+        finally:
+            await unlock(lock_conn, job_id)
+
+    return recovered
+
+
+async def claim_job(lock_conn: AsyncConnection) -> Optional[Tuple[str, dict, bool]]:
+    """
+    Claim the oldest queued job
+
+    The job lock is taken before the claim commits, so the job is never
+    "running" without a live owner.
+
+    Returns:
+        (job_id, metadata, resume) or None when the queue is empty
+    """
+    async with async_session() as db:
+        result = await db.execute(
+            select(ETLStatus)
+            .where(ETLStatus.status == "queued")
+            .order_by(ETLStatus.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = result.scalar_one_or_none()
+        if job is None:
+            return None
+
+        if not await try_lock(lock_conn, job.job_id):
+            await db.rollback()
+            return None
+
+        # A job that already started is resumed from its checkpoints
+        resume = job.started_at is not None
+        job.status = "running"
+        job.updated_at = datetime.utcnow()
+        await db.commit()
+
+        return job.job_id, dict(job.job_metadata or {}), resume
+
+
+async def run_job(lock_conn: AsyncConnection, job_id: str, metadata: dict, resume: bool):
+    logger.info(f"▶️  Running ETL job {job_id}{' (resume)' if resume else ''}")
+    try:
+        worker = ETLWorker(
+            job_id=job_id,
+            skip_download=metadata.get("skip_download", False),
+            tables=metadata.get("tables", ["all"]),
+            resume=resume,
+        )
+        await worker.run()
+    except Exception as e:
+        # ETLWorker already recorded the error on etl_status
+        logger.error(f"ETL job {job_id} failed: {e}")
+    finally:
+        await unlock(lock_conn, job_id)
+
+
+async def run_runner(once: bool = False):
+    """Poll for queued jobs until stopped (SIGTERM/SIGINT)"""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    # Dedicated connection for the advisory locks (autocommit, never idle in transaction)
+    lock_conn = await async_engine.connect()
+    lock_conn = await lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+
+    etl_logger = logging.getLogger("app.etl")
+    log_publisher = LogPublisher()
+    etl_logger.addHandler(log_publisher)
+    log_publisher_task = asyncio.create_task(log_publisher.run())
+    logger.info("🚚 ETL job runner started")
+
+    try:
+        while not stop.is_set():
+            try:
+                await recover_orphans(lock_conn)
+                claimed = await claim_job(lock_conn)
+            except Exception as e:
+                logger.warning(f"Job poll failed: {e}")
+                claimed = None
+
+            if claimed:
+                job = asyncio.create_task(run_job(lock_conn, *claimed))
+                stopping = asyncio.create_task(stop.wait())
+                await asyncio.wait({job, stopping}, return_when=asyncio.FIRST_COMPLETED)
+                if not job.done():
+                    # Shutdown mid-job: the job stays "running" without a lock
+                    # holder and is resumed by the next runner
+                    logger.warning("Stopping with a job in progress; it will be resumed on restart")
+                    job.cancel()
+                    await asyncio.gather(job, return_exceptions=True)
+                stopping.cancel()
+                if once:
+                    break
+                continue
+
+            if once:
+                break
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.ETL_RUNNER_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        etl_logger.removeHandler(log_publisher)
+        log_publisher_task.cancel()
+        await lock_conn.close()
+        await async_engine.dispose()
+        logger.info("ETL job runner stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ETL job runner")
+    parser.add_argument("--once", action="store_true", help="Run at most one queued job and exit")
+    parser.add_argument("--log-file", help="Also write logs to this file (e.g. /var/log/etl.log)")
+    args = parser.parse_args()
+
+    handlers = [logging.StreamHandler()]
+    if args.log_file:
+        handlers.append(logging.FileHandler(args.log_file))
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+        handlers=handlers,
+    )
+
+    asyncio.run(run_runner(once=args.once))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,8 @@ Loads processed data into PostgreSQL efficiently
 """
 
 import logging
-from typing import List, Dict, Any
-from io import StringIO
+from typing import List, Dict, Any, Tuple
+from io import BytesIO
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -63,42 +63,8 @@ class DatabaseLoader:
         logger.info(f"Bulk inserting {len(records)} records into {table_name}")
         
         try:
-            # Get column names from first record
-            columns = list(records[0].keys())
-            
-            # Create CSV buffer
-            buffer = StringIO()
-            
-            for record in records:
-                # Convert record to CSV row
-                values = []
-                for col in columns:
-                    value = record.get(col)
-                    if value is None:
-                        values.append('\\N')  # NULL in COPY format
-                    else:
-                        # Escape special characters
-                        value_str = str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
-                        values.append(value_str)
-                
-                buffer.write('\t'.join(values) + '\n')
-            
-            buffer.seek(0)
-            
-            # Use COPY for bulk insert (much faster than INSERT)
-            copy_sql = f"""
-                COPY {table_name} ({', '.join(columns)})
-                FROM STDIN
-                WITH (FORMAT text, DELIMITER E'\\t', NULL '\\N')
-            """
-            
-            # Execute using raw connection
-            conn = await self.session.connection()
-            raw_conn = await conn.get_raw_connection()
-            
-            cursor = await raw_conn.driver_connection.cursor()
-            await cursor.copy_expert(copy_sql, buffer)
-            
+            columns, data = self.encode_records(records)
+            await self.copy_encoded(table_name, columns, data)
             await self.session.commit()
             
             # Track inserted count
@@ -114,6 +80,51 @@ class DatabaseLoader:
             await self.session.rollback()
             raise
     
+    @staticmethod
+    def encode_records(records: List[Dict[str, Any]]) -> Tuple[List[str], bytes]:
+        """
+        Encode records as COPY text format (tab-separated, \\N for NULL)
+        
+        Returns:
+            (column names from the first record, UTF-8 payload)
+        """
+        columns = list(records[0].keys())
+        lines = []
+        
+        for record in records:
+            values = []
+            for col in columns:
+                value = record.get(col)
+                if value is None:
+                    values.append('\\N')  # NULL in COPY format
+                else:
+                    # Escape special characters
+                    values.append(
+                        str(value)
+                        .replace('\\', '\\\\')
+                        .replace('\t', '\\t')
+                        .replace('\n', '\\n')
+                        .replace('\r', '\\r')
+                    )
+            lines.append('\t'.join(values))
+        
+        lines.append('')
+        return columns, '\n'.join(lines).encode('utf-8')
+    
+    async def copy_encoded(self, table_name: str, columns: List[str], data: bytes):
+        """COPY an encode_records payload through the session's asyncpg connection"""
+        conn = await self.session.connection()
+        raw_conn = await conn.get_raw_connection()
+        
+        await raw_conn.driver_connection.copy_to_table(
+            table_name,
+            source=BytesIO(data),
+            columns=columns,
+            format='text',
+            delimiter='\t',
+            null='\\N',
+        )
+    
     async def truncate_table(self, file_type: str):
         """Truncate table before loading new data"""
         table_name = self.TABLE_MAPPINGS.get(file_type)
@@ -146,6 +157,7 @@ class DatabaseLoader:
             "CREATE INDEX IF NOT EXISTS idx_estabelecimentos_cnpj_basico ON estabelecimentos(cnpj_basico)",
             "CREATE INDEX IF NOT EXISTS idx_estabelecimentos_uf_municipio ON estabelecimentos(uf, municipio)",
             "CREATE INDEX IF NOT EXISTS idx_estabelecimentos_situacao ON estabelecimentos(situacao_cadastral)",
+            "CREATE INDEX IF NOT EXISTS idx_estabelecimentos_cnaes ON estabelecimentos USING gin(cnaes)",
             
             # Sócios
             "CREATE INDEX IF NOT EXISTS idx_socios_cnpj_basico ON socios(cnpj_basico)",
@@ -11,6 +11,9 @@ from typing import Optional, List
 from app.etl.downloader import ReceitaDownloader
 from app.etl.processor import CSVProcessor
 from app.etl.loader import DatabaseLoader
+from app.etl.aggregates import rebuild_aggregates
+from app.etl.documents import rebuild_documents
+from app.core.config import settings
 from app.db.session import async_session
 
 logger = logging.getLogger(__name__)
@@ -164,6 +167,13 @@ class ETLOrchestrator:
                 logger.info("Updating statistics...")
                 await loader.update_statistics()
                 
+                logger.info("Rebuilding aggregates...")
+                await rebuild_aggregates(session)
+                
+                if settings.ETL_BUILD_DOCUMENTS:
+                    logger.info("Rebuilding CNPJ documents...")
+                    await rebuild_documents(session)
+                
                 # Get final stats
                 insert_stats = loader.get_stats()
                 logger.info(f"\n📊 Insertion Statistics:")
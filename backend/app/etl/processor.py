@@ -133,10 +133,13 @@ class CSVProcessor:
         return extract_to
     
     def detect_file_type(self, filename: str) -> str:
-        """Detect file type from filename"""
+        """
+        Detect file type from filename
+        Receita names look like K3241.K03200Y0.D51108.EMPRECSV / F.K03200$W.NATJUCSV
+        """
         filename_upper = filename.upper()
         
-        if "EMPRESA" in filename_upper:
+        if "EMPRE" in filename_upper:
             return "Empresas"
         elif "ESTABELE" in filename_upper:
             return "Estabelecimentos"
@@ -150,11 +153,11 @@ class CSVProcessor:
             return "Motivos"
         elif "MUNIC" in filename_upper:
             return "Municipios"
-        elif "NATUR" in filename_upper:
+        elif "NATJU" in filename_upper or "NATUR" in filename_upper:
             return "Naturezas"
         elif "PAIS" in filename_upper:
             return "Paises"
-        elif "QUALI" in filename_upper:
+        elif "QUALS" in filename_upper or "QUALI" in filename_upper:
             return "Qualificacoes"
         
         return "Unknown"
@@ -240,8 +243,8 @@ class CSVProcessor:
         extract_dir = self.extract_zip(zip_path)
         
         try:
-            # Find all CSV files
-            csv_files = list(extract_dir.glob("*.csv")) + list(extract_dir.glob("**/*.csv"))
+            # Find all data files (Receita names have no .csv extension)
+            csv_files = sorted(p for p in extract_dir.rglob("*") if p.is_file())
             
             logger.info(f"Found {len(csv_files)} CSV files in {zip_path.name}")
             
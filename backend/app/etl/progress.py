@@ -0,0 +1,190 @@
+"""
+ETL Progress Reporter
+Buffers job progress in memory and writes it to etl_status in batches
+
+Counters (files, records, bytes) change in memory only; a flush writes
+them together with any pending field changes in a single UPDATE, at most
+every ETL_PROGRESS_FLUSH_SECONDS, or right away on state transitions
+(status, step, resume metadata).
+
+Throughput and ETA are byte-based: ZIP sizes differ by ~100x between
+files, so "files remaining" says little about time remaining. Time spent
+paused (pause()/resume()) counts neither as elapsed nor in the rates.
+
+Progress is best-effort: a failed flush is logged and retried on the next
+one (pending changes are kept), so a database hiccup never fails a load.
+Only terminal status changes (completed, cancelled, error) raise.
+
+Every flush also NOTIFYs the job's status snapshot (events.py), which the
+API streams to the admin UI.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.db.session import async_session
+from app.etl.events import publish
+from app.models.etl_status import ETLStatus
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"completed", "cancelled", "error"}
+
+
+class ProgressReporter:
+    """Progress of one ETL job (etl_status row `job_id`)"""
+
+    def __init__(self, job_id: str, flush_seconds: Optional[float] = None):
+        self.job_id = job_id
+        self.flush_seconds = settings.ETL_PROGRESS_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+
+        self.files_total = 0
+        self.files_processed = 0
+        self.records_imported = 0
+        self.bytes_total = 0
+        self.bytes_processed = 0
+
+        # Rates only count work done by this run (not files loaded before a resume)
+        self.started = time.monotonic()
+        self.elapsed_before = 0
+        self.run_records = 0
+        self.run_bytes = 0
+        self.paused_seconds = 0.0
+        self._paused_at: Optional[float] = None
+
+        self._pending: Dict[str, Any] = {}
+        self._state: Dict[str, Any] = {"job_id": job_id}  # Everything written so far
+        self._flushed_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def restore(
+        self,
+        files_total: int,
+        bytes_total: int,
+        files_processed: int = 0,
+        records_imported: int = 0,
+        bytes_processed: int = 0,
+        elapsed_seconds: int = 0
+    ):
+        """Set totals and the state carried over from a previous run"""
+        self.files_total = files_total
+        self.bytes_total = bytes_total
+        self.files_processed = files_processed
+        self.records_imported = records_imported
+        self.bytes_processed = bytes_processed
+        self.elapsed_before = elapsed_seconds
+
+    def file_loaded(self, records: int, zip_bytes: int):
+        """Count a loaded file (in memory; written on the next flush)"""
+        self.files_processed += 1
+        self.records_imported += records
+        self.bytes_processed += zip_bytes
+        self.run_records += records
+        self.run_bytes += zip_bytes
+
+    def pause(self):
+        """Stop the clock (job paused)"""
+        if self._paused_at is None:
+            self._paused_at = time.monotonic()
+
+    def resume(self):
+        """Restart the clock; the pause is left out of elapsed time and rates"""
+        if self._paused_at is not None:
+            self.paused_seconds += time.monotonic() - self._paused_at
+            self._paused_at = None
+
+    @property
+    def run_seconds(self) -> float:
+        """Working time of this run (pauses excluded)"""
+        now = time.monotonic()
+        paused = self.paused_seconds + (now - self._paused_at if self._paused_at is not None else 0.0)
+        return max(now - self.started - paused, 0.0)
+
+    @property
+    def elapsed_seconds(self) -> int:
+        return int(self.elapsed_before + self.run_seconds)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters, rates and ETA as etl_status values"""
+        run_seconds = self.run_seconds
+        records_per_second = self.run_records / run_seconds if run_seconds > 0 else 0.0
+        bytes_per_second = self.run_bytes / run_seconds if run_seconds > 0 else 0.0
+
+        if self.bytes_total:
+            progress = self.bytes_processed / self.bytes_total * 100
+        elif self.files_total:
+            progress = self.files_processed / self.files_total * 100
+        else:
+            progress = 0.0
+
+        remaining_bytes = max(self.bytes_total - self.bytes_processed, 0)
+        estimated_remaining = int(remaining_bytes / bytes_per_second) if bytes_per_second > 0 else None
+
+        return {
+            "files_total": self.files_total,
+            "files_processed": self.files_processed,
+            "records_imported": self.records_imported,
+            "bytes_total": self.bytes_total,
+            "bytes_processed": self.bytes_processed,
+            "records_per_second": round(records_per_second, 1),
+            "bytes_per_second": round(bytes_per_second, 1),
+            "progress_percent": round(min(progress, 100.0), 2),
+            "elapsed_seconds": self.elapsed_seconds,
+            "estimated_remaining_seconds": estimated_remaining,
+        }
+
+    async def update(self, **values):
+        """Buffer field changes; flush only if the interval has passed (never raises)"""
+        self._pending.update(values)
+        if time.monotonic() - self._flushed_at >= self.flush_seconds:
+            await self.flush(strict=False)
+
+    async def transition(self, **values):
+        """
+        State change (status, step, resume metadata): flush now
+
+        Raises only for terminal statuses, whose write the caller must not
+        lose; other transitions are retried with the next flush.
+        """
+        self._pending.update(values)
+        await self.flush(strict=values.get("status") in TERMINAL_STATUSES)
+
+    async def flush(self, strict: bool = True):
+        """
+        Write metrics and pending changes in one UPDATE
+
+        Args:
+            strict: Raise on failure; otherwise log it and retry after
+                flush_seconds
+        """
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            # Explicit values win (e.g. progress_percent=100 on completion)
+            values = {**self.metrics(), **pending}
+            try:
+                async with async_session() as db:
+                    await db.execute(
+                        update(ETLStatus)
+                        .where(ETLStatus.job_id == self.job_id)
+                        .values(**values, updated_at=datetime.utcnow())
+                    )
+                    snapshot = {**self._state, **values}
+                    snapshot.pop("job_metadata", None)  # Resume state, not status
+                    await publish(db, "progress", snapshot)
+                    await db.commit()
+            except Exception as e:
+                # Keep the changes for the next flush (newer values win)
+                self._pending = {**pending, **self._pending}
+                if strict:
+                    raise
+                logger.warning(f"ETL progress not saved for {self.job_id}, retrying: {e}")
+                self._flushed_at = time.monotonic()  # Retry after the interval, not on every update
+                return
+            self._state.update(values)
+            self._flushed_at = time.monotonic()
@@ -3,23 +3,35 @@ ETL Worker V2
 Optimized ETL worker with lessons learned
 - PostgreSQL COPY with LATIN1 encoding
 - Automatic ZIP cleanup after processing
-- Real-time progress tracking
-- Resumable state
+- Batched progress reporting with byte-based throughput/ETA (progress.py)
+- Resumable state (per-file checkpoints in etl_checkpoints)
+- Pause/resume/cancel/throttle through etl_status (polled between files)
 """
 
+import asyncio
 import subprocess
 import os
+import re
 import shutil
-import time
 import logging
+import zipfile
 from pathlib import Path
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Any
 from datetime import datetime
+from zoneinfo import ZoneInfo
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
 
 from app.models.etl_status import ETLStatus
+from app.models.etl_checkpoint import ETLCheckpoint, CHECKPOINT_STAGES
 from app.db.session import async_session
+from app.etl.aggregates import rebuild_aggregates
+from app.etl.documents import rebuild_documents
+from app.etl.progress import ProgressReporter
+from app.core.config import settings
+from app.core.dimensions import dimensions
+from app.core.generation import data_generation
 
 # Configuração
 BASE_URL = "https://arquivos.receitafederal.gov.br/dados/cnpj/dados_abertos_cnpj/"
@@ -63,7 +75,7 @@ FILES_CONFIG = {
     ],
     "socios": [
         (f"Socios{i}.zip", f"K3241.K03200Y{i}.D51108.SOCIOCSV", "socios",
-         "cnpj_basico,identificador_socio,nome_socio,cpf_cnpj_socio,qualificacao_socio,data_entrada_sociedade,pais,cpf_representante_legal,nome_representante_legal,qualificacao_representante_legal,faixa_etaria")
+         "cnpj_basico,identificador_socio,nome_socio,cpf_cnpj_socio,qualificacao_socio,data_entrada_sociedade,pais,representante_legal,nome_representante,qualificacao_representante,faixa_etaria")
         for i in range(10)
     ],
     "simples": [
@@ -75,27 +87,119 @@ FILES_CONFIG = {
 logger = logging.getLogger(__name__)
 
 
+class ETLCancelled(Exception):
+    """Raised at the next control check after /etl/cancel"""
+
+
+def in_business_hours(now: Optional[datetime] = None) -> bool:
+    """
+    Whether ETL_BUSINESS_HOURS (local to ETL_TIMEZONE) covers now
+    
+    The setting is validated and zero-padded by Settings, so "HH:MM"
+    strings compare in time order; end < start is an overnight window.
+    """
+    if not settings.ETL_BUSINESS_HOURS:
+        return False
+    start, end = settings.ETL_BUSINESS_HOURS.split("-")
+    now = now or datetime.now(ZoneInfo(settings.ETL_TIMEZONE))
+    current = now.strftime("%H:%M")
+    if start <= end:
+        return start <= current < end
+    return current >= start or current < end
+
+
+def stage_reached(stage: str, target: str) -> bool:
+    """Whether a checkpoint stage is at or past `target`"""
+    return CHECKPOINT_STAGES.index(stage) >= CHECKPOINT_STAGES.index(target)
+
+
 class ETLWorker:
     """ETL Worker with optimized COPY strategy"""
     
-    def __init__(self, job_id: str, skip_download: bool = False, tables: List[str] = None):
+    def __init__(self, job_id: str, skip_download: bool = False, tables: List[str] = None, resume: bool = False):
         self.job_id = job_id
         self.skip_download = skip_download
         self.tables = tables or ["all"]
-        self.start_time = time.time()
-        self.files_processed = 0
-        self.files_total = 0
-        self.records_imported = 0
+        self.resume = resume
+        self.progress = ProgressReporter(job_id)
+        self.checkpoints: Dict[str, Dict[str, Any]] = {}  # zip_file -> {id, stage, zip_bytes, rows_loaded, attempts}
+        self.metadata: Dict[str, Any] = {}  # etl_status.metadata (completed post-process steps)
         
-    async def update_status(self, **kwargs):
-        """Update ETL status in database"""
+    async def set_checkpoint(self, zip_file: str, **values):
+        """Update a file checkpoint (database and local copy)"""
         async with async_session() as db:
             await db.execute(
-                update(ETLStatus)
-                .where(ETLStatus.job_id == self.job_id)
-                .values(**kwargs, updated_at=datetime.utcnow())
+                update(ETLCheckpoint)
+                .where(ETLCheckpoint.id == self.checkpoints[zip_file]["id"])
+                .values(**values, updated_at=datetime.utcnow())
+            )
+            await db.commit()
+        self.checkpoints[zip_file].update(values)
+    
+    def selected_files(self) -> List[tuple]:
+        """(group, zip_file, csv_pattern, table_name, columns) in load order"""
+        return [
+            (group, *entry)
+            for group, files in FILES_CONFIG.items()
+            if "all" in self.tables or group in self.tables
+            for entry in files
+        ]
+    
+    async def load_state(self, files: List[tuple]):
+        """
+        Create missing checkpoints and load job state
+        
+        On resume, files already loaded count as processed and previous
+        elapsed time carries over. Byte totals use the checkpointed ZIP size
+        (loaded ZIPs are deleted) or the size of the ZIP on disk.
+        """
+        async with async_session() as db:
+            await db.execute(
+                insert(ETLCheckpoint)
+                .values([
+                    {"job_id": self.job_id, "zip_file": zip_file, "table_name": table_name, "stage": "pending", "attempts": 0}
+                    for _group, zip_file, _csv, table_name, _columns in files
+                ])
+                .on_conflict_do_nothing(constraint="uq_etl_checkpoints_job_file")
             )
             await db.commit()
+            
+            result = await db.execute(
+                select(ETLCheckpoint).where(ETLCheckpoint.job_id == self.job_id)
+            )
+            self.checkpoints = {
+                cp.zip_file: {
+                    "id": cp.id, "stage": cp.stage, "zip_bytes": cp.zip_bytes,
+                    "rows_loaded": cp.rows_loaded, "attempts": cp.attempts
+                }
+                for cp in result.scalars()
+            }
+            
+            etl_status = (await db.execute(
+                select(ETLStatus).where(ETLStatus.job_id == self.job_id)
+            )).scalar_one()
+            self.metadata = dict(etl_status.job_metadata or {})
+            elapsed_before = (etl_status.elapsed_seconds or 0) if self.resume else 0
+        
+        bytes_total = 0
+        for _group, zip_file, *_rest in files:
+            cp = self.checkpoints[zip_file]
+            if not cp["zip_bytes"] and (DATA_DIR / zip_file).exists():
+                cp["zip_bytes"] = (DATA_DIR / zip_file).stat().st_size
+            bytes_total += cp["zip_bytes"] or 0
+        
+        loaded = [
+            cp for zip_file, cp in self.checkpoints.items()
+            if stage_reached(cp["stage"], "loaded")
+        ]
+        self.progress.restore(
+            files_total=len(files),
+            bytes_total=bytes_total,
+            files_processed=len(loaded),
+            records_imported=sum(cp["rows_loaded"] or 0 for cp in loaded),
+            bytes_processed=sum(cp["zip_bytes"] or 0 for cp in loaded),
+            elapsed_seconds=elapsed_before
+        )
     
     def get_disk_space(self):
         """Get disk space in GB"""
@@ -104,73 +208,197 @@ class ETLWorker:
         used_gb = ((stat.f_blocks - stat.f_bfree) * stat.f_frsize) / (1024**3)
         return free_gb, used_gb
     
+    async def read_control(self) -> tuple:
+        """(control_command, max_parallel_copies) as set by the API"""
+        async with async_session() as db:
+            result = await db.execute(
+                select(ETLStatus.control_command, ETLStatus.max_parallel_copies)
+                .where(ETLStatus.job_id == self.job_id)
+            )
+            return tuple(result.one())
+    
+    def parallel_copies(self, max_parallel_copies: Optional[int]) -> int:
+        """Throttle set through the API, else the (business-hours capped) default"""
+        if max_parallel_copies:
+            return max(1, max_parallel_copies)
+        if in_business_hours():
+            return max(1, min(settings.ETL_MAX_PARALLEL_COPIES, settings.ETL_BUSINESS_HOURS_MAX_COPIES))
+        return max(1, settings.ETL_MAX_PARALLEL_COPIES)
+    
+    async def honor_control(self) -> Optional[int]:
+        """
+        Control point (no file in flight): wait while paused, raise on cancel
+        
+        Returns:
+            Current max_parallel_copies
+        """
+        command, max_parallel_copies = await self.read_control()
+        
+        if command == "pause":
+            logger.info(f"⏸️  ETL {self.job_id} paused")
+            self.progress.pause()
+            await self.progress.transition(status="paused", current_file=None)
+            while command == "pause":
+                await asyncio.sleep(settings.ETL_CONTROL_POLL_SECONDS)
+                command, max_parallel_copies = await self.read_control()
+            self.progress.resume()
+            if command != "cancel":
+                logger.info(f"▶️  ETL {self.job_id} resumed")
+                await self.progress.transition(status="running")
+        
+        if command == "cancel":
+            raise ETLCancelled()
+        
+        return max_parallel_copies
+    
+    async def run_group(self, group: str, files: List[tuple]):
+        """
+        Load the pending files of a group, up to parallel_copies() at a time
+        
+        Control is checked every ETL_CONTROL_POLL_SECONDS: throttling
+        applies to the next file started; pause and cancel stop starting
+        files and take effect once the in-flight ones finish (each file is
+        loaded atomically, so there is nothing to interrupt mid-way).
+        """
+        pending = []
+        for zip_file, csv_pattern, table_name, columns in files:
+            if stage_reached(self.checkpoints[zip_file]["stage"], "loaded"):
+                logger.info(f"⏭️  {zip_file} already loaded, skipping")
+            else:
+                pending.append((zip_file, csv_pattern, table_name, columns))
+        
+        if not pending:
+            return
+        
+        logger.info(f"Processing {group}...")
+        await self.progress.transition(current_step=group)
+        
+        running: Dict[asyncio.Task, str] = {}
+        try:
+            while pending or running:
+                command, max_parallel_copies = await self.read_control()
+                
+                if command is None or not running:
+                    if command is not None:
+                        max_parallel_copies = await self.honor_control()
+                    limit = self.parallel_copies(max_parallel_copies)
+                    while pending and len(running) < limit:
+                        zip_file, *args = pending.pop(0)
+                        running[asyncio.create_task(self.process_file(zip_file, *args))] = zip_file
+                
+                done, _ = await asyncio.wait(
+                    running, timeout=settings.ETL_CONTROL_POLL_SECONDS, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    running.pop(task)
+                    task.result()
+                
+                # Periodic flush (counters and elapsed time) while COPYs run
+                await self.progress.update()
+        finally:
+            # A failed file stops the group; let the other in-flight files finish
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+    
     async def run(self):
         """Run complete ETL process"""
         try:
-            await self.update_status(
-                status="running",
-                started_at=datetime.utcnow()
-            )
+            files = self.selected_files()
+            await self.load_state(files)
             
-            # Calculate total files
-            self.files_total = sum(
-                len(files) for table_name, files in FILES_CONFIG.items()
-                if "all" in self.tables or table_name in self.tables
-            )
+            status_values = {"status": "running", "error_message": None, "completed_at": None}
+            if not self.resume:
+                status_values["started_at"] = datetime.utcnow()
+            await self.progress.transition(**status_values)
             
-            await self.update_status(files_total=self.files_total)
+            if self.resume:
+                logger.info(
+                    f"Resuming {self.job_id}: {self.progress.files_processed}/{self.progress.files_total} files already loaded"
+                )
             
-            # Process each table group
-            for table_group, files in FILES_CONFIG.items():
-                if "all" not in self.tables and table_group not in self.tables:
-                    continue
-                
-                logger.info(f"Processing {table_group}...")
-                await self.update_status(current_step=table_group)
-                
-                for zip_file, csv_pattern, table_name, columns in files:
-                    await self.process_file(zip_file, csv_pattern, table_name, columns)
+            # Process each table group (groups in order, files within a group concurrently)
+            for group in FILES_CONFIG:
+                await self.run_group(group, [f[1:] for f in files if f[0] == group])
             
             # Post-processing
             await self.post_process()
             
             # Mark as completed
-            await self.update_status(
+            await self.progress.transition(
                 status="completed",
                 completed_at=datetime.utcnow(),
                 progress_percent=100.0,
-                elapsed_seconds=int(time.time() - self.start_time)
+                estimated_remaining_seconds=0
             )
             
-            logger.info(f"ETL completed! Total records: {self.records_imported}")
+            logger.info(f"ETL completed! Total records: {self.progress.records_imported}")
+            
+            # New generation: new ETags, lookup tables may have changed
+            try:
+                await data_generation.refresh()
+                await dimensions.load()
+            except Exception as e:
+                logger.warning(f"Dimension cache refresh failed: {e}")
+            
+        except ETLCancelled:
+            logger.info(f"🛑 ETL {self.job_id} cancelled")
+            await self.progress.transition(
+                status="cancelled",
+                control_command=None,
+                completed_at=datetime.utcnow()
+            )
             
         except Exception as e:
             logger.error(f"ETL error: {e}", exc_info=True)
-            await self.update_status(
+            await self.progress.transition(
                 status="error",
                 error_message=str(e),
                 completed_at=datetime.utcnow()
             )
             raise
     
+    def copy_script(self, checkpoint_id: int, table_name: str, columns: str, tmp_file: str) -> str:
+        """
+        psql script: COPY and the "loaded" checkpoint in one transaction
+        
+        A failure (or a killed worker) rolls back the whole file, so a
+        retried file never leaves duplicates; :ROW_COUNT is the COPY count.
+        """
+        return f"""\\set ON_ERROR_STOP on
+BEGIN;
+COPY {table_name}({columns}) FROM '{tmp_file}' WITH (FORMAT csv, DELIMITER ';', QUOTE '"', ENCODING 'LATIN1', HEADER false);
+UPDATE etl_checkpoints SET stage = 'loaded', rows_loaded = :ROW_COUNT, loaded_at = now(), updated_at = now(), error_message = NULL WHERE id = {checkpoint_id};
+COMMIT;
+"""
+    
     async def process_file(self, zip_file: str, csv_pattern: str, table_name: str, columns: str):
-        """Process a single ZIP file"""
+        """Process a single ZIP file (downloaded -> extracted -> loaded)"""
         zip_path = DATA_DIR / zip_file
         extract_dir = DATA_DIR / zip_file.replace('.zip', '')
+        checkpoint = self.checkpoints[zip_file]
         
         try:
-            # Update status
-            await self.update_status(
+            # Update status (buffered)
+            free_gb, used_gb = self.get_disk_space()
+            await self.progress.update(
                 current_file=zip_file,
-                current_table=table_name
+                current_table=table_name,
+                disk_free_gb=free_gb,
+                disk_used_gb=used_gb
             )
+            await self.set_checkpoint(zip_file, attempts=checkpoint["attempts"] + 1, error_message=None)
             
-            free_gb, used_gb = self.get_disk_space()
-            await self.update_status(disk_free_gb=free_gb, disk_used_gb=used_gb)
+            # ZIP on disk (complete archive)
+            if not zip_path.exists():
+                raise FileNotFoundError(f"{zip_file} not found in {DATA_DIR}")
+            if not zipfile.is_zipfile(zip_path):
+                raise ValueError(f"{zip_file} is not a valid ZIP (incomplete download?)")
+            await self.set_checkpoint(zip_file, stage="downloaded", zip_bytes=zip_path.stat().st_size)
             
             # Extract ZIP
             logger.info(f"Extracting {zip_file}...")
-            subprocess.run(
+            await asyncio.to_thread(
+                subprocess.run,
                 ["unzip", "-o", str(zip_path), "-d", str(extract_dir)],
                 check=True,
                 stdout=subprocess.DEVNULL,
@@ -183,101 +411,130 @@ class ETLWorker:
                 raise FileNotFoundError(f"CSV not found in {zip_file} with pattern {csv_pattern}")
             
             csv_file = csv_files[0]
+            await self.set_checkpoint(zip_file, stage="extracted")
             logger.info(f"Importing {csv_file.name} to {table_name}...")
             
             # Copy to container
             tmp_file = f"/tmp/{csv_file.name}"
-            subprocess.run(
+            await asyncio.to_thread(
+                subprocess.run,
                 ["docker", "cp", str(csv_file), f"{CONTAINER_NAME}:{tmp_file}"],
                 check=True,
                 stdout=subprocess.DEVNULL
             )
             
-            # Execute COPY
-            copy_cmd = f"""COPY {table_name}({columns}) FROM '{tmp_file}' WITH (FORMAT csv, DELIMITER ';', QUOTE '"', ENCODING 'LATIN1', HEADER false)"""
-            
-            result = subprocess.run(
-                [
-                    "docker", "exec", CONTAINER_NAME,
-                    "psql", "-U", DB_USER, "-d", DB_NAME,
-                    "-c", copy_cmd
-                ],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            # Execute COPY + checkpoint atomically
+            try:
+                result = await asyncio.to_thread(
+                    subprocess.run,
+                    [
+                        "docker", "exec", "-i", CONTAINER_NAME,
+                        "psql", "-U", DB_USER, "-d", DB_NAME, "-f", "-"
+                    ],
+                    input=self.copy_script(checkpoint["id"], table_name, columns, tmp_file),
+                    capture_output=True,
+                    text=True,
+                    check=True
+                )
+            except subprocess.CalledProcessError as e:
+                raise RuntimeError(f"COPY {zip_file} failed: {e.stderr.strip()}") from e
+            finally:
+                # Cleanup container
+                await asyncio.to_thread(
+                    subprocess.run,
+                    ["docker", "exec", CONTAINER_NAME, "rm", "-f", tmp_file],
+                    stderr=subprocess.DEVNULL
+                )
             
             # Parse result
-            if "COPY" in result.stdout:
-                count_str = result.stdout.strip().split("COPY ")[-1]
-                try:
-                    count = int(count_str)
-                    self.records_imported += count
-                    logger.info(f"✅ {zip_file} - COPY {count}")
-                except ValueError:
-                    pass
-            
-            # Cleanup container
-            subprocess.run(
-                ["docker", "exec", CONTAINER_NAME, "rm", tmp_file],
-                stderr=subprocess.DEVNULL
-            )
+            match = re.search(r"^COPY (\d+)$", result.stdout, re.MULTILINE)
+            count = int(match.group(1)) if match else 0
+            checkpoint.update(stage="loaded", rows_loaded=count)
+            logger.info(f"✅ {zip_file} - COPY {count}")
             
             # Cleanup host
-            shutil.rmtree(extract_dir, ignore_errors=True)
+            await asyncio.to_thread(shutil.rmtree, extract_dir, ignore_errors=True)
             zip_path.unlink(missing_ok=True)
             logger.info(f"🗑️  Deleted {zip_file}")
             
-            # Update progress
-            self.files_processed += 1
-            progress = (self.files_processed / self.files_total) * 100
-            elapsed = int(time.time() - self.start_time)
-            
-            if self.files_processed > 0:
-                avg_time_per_file = elapsed / self.files_processed
-                remaining_files = self.files_total - self.files_processed
-                estimated_remaining = int(avg_time_per_file * remaining_files)
-            else:
-                estimated_remaining = None
-            
-            await self.update_status(
-                files_processed=self.files_processed,
-                progress_percent=round(progress, 2),
-                records_imported=self.records_imported,
-                elapsed_seconds=elapsed,
-                estimated_remaining_seconds=estimated_remaining
-            )
+            # Update progress (written on the next flush)
+            self.progress.file_loaded(count, checkpoint["zip_bytes"] or 0)
+            await self.progress.update()
             
         except Exception as e:
             logger.error(f"Error processing {zip_file}: {e}")
-            # Cleanup on error
-            shutil.rmtree(extract_dir, ignore_errors=True)
+            try:
+                await self.set_checkpoint(zip_file, error_message=str(e))
+            except Exception:
+                pass
+            # Cleanup on error (the ZIP is kept for the retry)
+            await asyncio.to_thread(shutil.rmtree, extract_dir, ignore_errors=True)
             raise
     
+    def post_step_done(self, step: str) -> bool:
+        return step in self.metadata.get("post_process", [])
+    
+    async def finish_post_step(self, step: str):
+        """Record a completed post-processing step (skipped on resume)"""
+        self.metadata["post_process"] = self.metadata.get("post_process", []) + [step]
+        await self.progress.transition(job_metadata=self.metadata)
+    
     async def post_process(self):
         """Post-processing: update cnpj_completo, VACUUM, etc."""
         logger.info("Running post-processing...")
         
-        await self.update_status(
-            current_step="post_processing",
-            current_file="Atualizando cnpj_completo..."
-        )
+        await self.progress.transition(current_step="post_processing")
         
         # Update cnpj_completo
-        subprocess.run([
-            "docker", "exec", CONTAINER_NAME,
-            "psql", "-U", DB_USER, "-d", DB_NAME,
-            "-c", "UPDATE estabelecimentos SET cnpj_completo = cnpj_basico || cnpj_ordem || cnpj_dv WHERE cnpj_completo IS NULL;"
-        ], check=True)
+        await self.honor_control()
+        if not self.post_step_done("cnpj_completo"):
+            await self.progress.transition(current_file="Atualizando cnpj_completo...")
+            await asyncio.to_thread(subprocess.run, [
+                "docker", "exec", CONTAINER_NAME,
+                "psql", "-U", DB_USER, "-d", DB_NAME,
+                "-c", "UPDATE estabelecimentos SET cnpj_completo = cnpj_basico || cnpj_ordem || cnpj_dv WHERE cnpj_completo IS NULL;"
+            ], check=True)
+            await self.finish_post_step("cnpj_completo")
+            
+            logger.info("✅ cnpj_completo updated")
         
-        logger.info("✅ cnpj_completo updated")
+        # VACUUM ANALYZE (indexes are maintained during COPY; statistics refreshed here)
+        await self.honor_control()
+        if not self.post_step_done("vacuum_analyze"):
+            await self.progress.transition(current_file="VACUUM ANALYZE...")
+            await asyncio.to_thread(subprocess.run, [
+                "docker", "exec", CONTAINER_NAME,
+                "psql", "-U", DB_USER, "-d", DB_NAME,
+                "-c", "VACUUM ANALYZE;"
+            ], check=True)
+            
+            async with async_session() as db:
+                await db.execute(
+                    update(ETLCheckpoint)
+                    .where(ETLCheckpoint.job_id == self.job_id, ETLCheckpoint.stage == "loaded")
+                    .values(stage="indexed", updated_at=datetime.utcnow())
+                )
+                await db.commit()
+            await self.finish_post_step("vacuum_analyze")
+            
+            logger.info("✅ VACUUM ANALYZE completed")
         
-        # VACUUM ANALYZE
-        await self.update_status(current_file="VACUUM ANALYZE...")
-        subprocess.run([
-            "docker", "exec", CONTAINER_NAME,
-            "psql", "-U", DB_USER, "-d", DB_NAME,
-            "-c", "VACUUM ANALYZE;"
-        ], check=True)
+        # Aggregate rollups (estatisticas_estabelecimentos)
+        await self.honor_control()
+        if not self.post_step_done("aggregates"):
+            await self.progress.transition(current_file="Estatísticas agregadas...")
+            async with async_session() as db:
+                await rebuild_aggregates(db)
+            await self.finish_post_step("aggregates")
+            
+            logger.info("✅ Aggregates rebuilt")
         
-        logger.info("✅ VACUUM ANALYZE completed")
+        # Precomputed lookup payloads (cnpj_documentos)
+        await self.honor_control()
+        if settings.ETL_BUILD_DOCUMENTS and not self.post_step_done("documents"):
+            await self.progress.transition(current_file="Documentos por CNPJ...")
+            async with async_session() as db:
+                await rebuild_documents(db)
+            await self.finish_post_step("documents")
+            
+            logger.info("✅ Documents rebuilt")
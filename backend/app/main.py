@@ -3,12 +3,27 @@ AuthBrasil CNPJ - Main Application
 FastAPI application initialization and configuration
 """
 
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.core.dimensions import dimensions
+from app.core.api_keys import run_last_used_flusher, flush_last_used
+from app.core.security import shutdown_password_executor
+from app.core.metering import meter, run_usage_flusher
+from app.core.generation import data_generation, run_generation_watcher
+from app.etl.events import run_event_listener
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.core.metrics import metrics_endpoint
+from app.db.base import engine
+from app.db.session import async_engine
+from app.db.instrumentation import instrument_engine
 
 
 @asynccontextmanager
@@ -21,10 +36,50 @@ async def lifespan(app: FastAPI):
     print(f"Starting {settings.PROJECT_NAME} v{settings.VERSION}")
     print(f"Environment: {settings.ENVIRONMENT}")
     
+    # Lookup tables (CNAEs, municípios, ...) in memory
+    try:
+        counts = await dimensions.load()
+        print(f"Dimension cache loaded: {counts}")
+    except Exception as e:
+        print(f"⚠️  Dimension cache not loaded, descriptions disabled: {e}")
+    
+    # Loaded data generation (ETag / Last-Modified)
+    try:
+        await data_generation.refresh()
+        print(f"Data generation: {data_generation.job_id}")
+    except Exception as e:
+        print(f"⚠️  Data generation unknown, HTTP caching disabled: {e}")
+    generation_watcher = asyncio.create_task(run_generation_watcher())
+    
+    # Live ETL progress/logs from the job runner (LISTEN etl_events)
+    etl_event_listener = asyncio.create_task(run_event_listener())
+    
+    # Batched api_keys.last_used_at writes
+    last_used_flusher = asyncio.create_task(run_last_used_flusher())
+    
+    # Batched subscriptions.queries_used writes
+    usage_flusher = asyncio.create_task(run_usage_flusher())
+    
     yield
     
     # Shutdown
     print(f"Shutting down {settings.PROJECT_NAME}")
+    
+    generation_watcher.cancel()
+    etl_event_listener.cancel()
+    last_used_flusher.cancel()
+    try:
+        await flush_last_used()
+    except Exception as e:
+        print(f"⚠️  Could not flush api_keys.last_used_at: {e}")
+    
+    usage_flusher.cancel()
+    try:
+        await meter.flush()
+    except Exception as e:
+        print(f"⚠️  Could not flush subscription usage: {e}")
+    
+    shutdown_password_executor()
 
 
 # OpenAPI tags metadata
@@ -68,6 +123,20 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Compression (innermost: sees the final response body)
+app.add_middleware(CompressionMiddleware)
+
+# Rate limiting (added before CORS, so CORS wraps it and 429s keep CORS headers)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
+# SQL timing, slow-query log and sampled EXPLAIN on both engines
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+# Request metrics and per-request SQL stats (outside rate limiting, so 429s are observed too)
+app.add_middleware(MetricsMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -80,6 +149,10 @@ app.add_middleware(
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+# Prometheus scrape endpoint
+if settings.METRICS_ENABLED:
+    app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
+
 
 @app.get("/")
 async def root():
@@ -0,0 +1,4 @@
+"""
+ASGI middleware
+Cross-cutting request handling (rate limiting, ...)
+"""
@@ -0,0 +1,188 @@
+"""
+Response compression
+gzip/brotli negotiated per request, buffered for small bodies, incremental for streams
+"""
+
+import re
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+# Streamed to the browser event by event; compression would buffer it
+NEVER_COMPRESS_TYPES = ("text/event-stream",)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Preferred encoding the client accepts: br, then gzip"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", accepted.get("*", 0)) > 0:
+        return "gzip"
+    return None
+
+
+class GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress and flush, so the client can decode everything sent so far"""
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI compression middleware
+
+    - Single-message bodies are compressed at once when they reach
+      COMPRESSION_MIN_SIZE (COMPRESSION_LOOKUP_MIN_SIZE for single-CNPJ
+      lookups, where a few KB are not worth the CPU).
+    - Streaming bodies (exports) are compressed chunk by chunk with a sync
+      flush per chunk, so memory stays flat and the download starts at once.
+    - Strong ETags get an encoding suffix, since the bytes differ.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.lookup_path = re.compile(rf"^{re.escape(settings.API_V1_STR)}/cnpj/[\d.\-]+$")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        minimum_size = (
+            settings.COMPRESSION_LOOKUP_MIN_SIZE
+            if self.lookup_path.match(scope["path"])
+            else settings.COMPRESSION_MIN_SIZE
+        )
+        responder = CompressionResponder(send, encoding, minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class CompressionResponder:
+    """Per-request state: holds the response start until the first body chunk"""
+
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.passthrough = False
+        self.stream = None
+
+    def new_stream(self):
+        if self.encoding == "br":
+            return BrotliStream(settings.COMPRESSION_BROTLI_QUALITY)
+        return GzipStream(settings.COMPRESSION_GZIP_LEVEL)
+
+    @staticmethod
+    def compressible(headers: MutableHeaders, status: int) -> bool:
+        if status < 200 or status in (204, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        if content_type.startswith(NEVER_COMPRESS_TYPES):
+            return False
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def mark_encoded(self, headers: MutableHeaders):
+        headers["Content-Encoding"] = self.encoding
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/") and etag.endswith('"'):
+            headers["ETag"] = f'{etag[:-1]}-{self.encoding}"'
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is not None:
+            data = self.stream.chunk(body) if more_body else self.stream.finish(body)
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        # First body message: decide
+        start = self.start_message
+        headers = MutableHeaders(scope=start)
+
+        if not self.compressible(headers, start["status"]):
+            self.passthrough = True
+            await self._send(start)
+            await self._send(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+
+        if not more_body:
+            if len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._send(start)
+                await self._send(message)
+                return
+
+            data = self.new_stream().finish(body)
+            self.mark_encoded(headers)
+            headers["Content-Length"] = str(len(data))
+            await self._send(start)
+            await self._send({"type": "http.response.body", "body": data})
+            return
+
+        # Streaming response
+        self.stream = self.new_stream()
+        self.mark_encoded(headers)
+        if "content-length" in headers:
+            del headers["content-length"]
+        await self._send(start)
+        await self._send({
+            "type": "http.response.body", "body": self.stream.chunk(body), "more_body": True
+        })
@@ -0,0 +1,82 @@
+"""
+Request metrics
+Latency, status and SQL activity per route template
+"""
+
+import logging
+import time
+
+from app.core.config import settings
+from app.core.metrics import REQUEST_SECONDS, DB_SECONDS, DB_QUERIES
+from app.db.instrumentation import QueryStats, current_query_stats
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware observing every HTTP request
+
+    Routes are labelled by template (/api/v1/cnpj/{cnpj}), resolved from the
+    endpoint the router stored in the scope, so label cardinality stays bounded.
+    SQL statements run while handling the request are counted through
+    current_query_stats; requests above SQL_QUERY_COUNT_WARN are logged.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._templates = None
+
+    def route_template(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+
+        if self._templates is None:
+            router = scope["app"].router
+            self._templates = {
+                route.endpoint: route.path
+                for route in router.routes
+                if hasattr(route, "endpoint")
+            }
+        return self._templates.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+        # Template, not the raw path: paths carry CPFs and partner names
+        stats = QueryStats(route=lambda: f"{scope['method']} {self.route_template(scope)}")
+        token = current_query_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SQL_TRACE_HEADER:
+                    message["headers"] = list(message.get("headers", [])) + [(
+                        b"server-timing",
+                        f'db;dur={stats.seconds * 1000:.1f};desc="{stats.queries} queries"'.encode(),
+                    )]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_query_stats.reset(token)
+            route = self.route_template(scope)
+
+            if stats.queries >= settings.SQL_QUERY_COUNT_WARN:
+                logger.warning(
+                    f"{scope['method']} {route}: {stats.queries} queries, "
+                    f"{stats.seconds * 1000:.1f} ms SQL in {elapsed * 1000:.1f} ms"
+                )
+
+            if settings.METRICS_ENABLED:
+                REQUEST_SECONDS.labels(scope["method"], route, str(status_code)).observe(elapsed)
+                if stats.queries:
+                    DB_SECONDS.labels(route).observe(stats.seconds)
+                DB_QUERIES.labels(route).observe(stats.queries)
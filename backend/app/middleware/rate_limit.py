@@ -0,0 +1,224 @@
+"""
+Rate limiting
+Token buckets per API key / user / IP, in process or shared through Redis
+"""
+
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+
+from jose import jwt, JWTError
+
+from app.core.config import settings
+from app.core.api_keys import is_api_key, hash_api_key
+
+logger = logging.getLogger(__name__)
+
+REDIS_TIMEOUT_SECONDS = 0.5  # Bounds the latency a down Redis adds to a probing request
+
+
+class RateDecision(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: float  # Seconds until one token is available
+
+
+class MemoryRateLimiter:
+    """
+    In-process token buckets (per worker)
+
+    Buckets refill lazily on access, so each hit is O(1); the least recently
+    used buckets are dropped past RATE_LIMIT_MAX_KEYS.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def hit(self, key: str, capacity: int, per_second: float) -> RateDecision:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * per_second)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return RateDecision(allowed, int(tokens), 0.0 if allowed else (1 - tokens) / per_second)
+
+
+# Atomic refill + take; the bucket expires once it would be full again
+REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local per_second = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * per_second)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / per_second * 1000))
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimiter:
+    """
+    Token buckets shared by all workers through Redis (one EVALSHA per hit)
+
+    Falls back to the in-process limiter while Redis is unreachable: after
+    a failure, Redis is not tried again for RATE_LIMIT_REDIS_RETRY_SECONDS
+    (circuit breaker), so an outage costs one warning, not a timeout and a
+    log line per request.
+    """
+
+    def __init__(self, url: str, fallback: MemoryRateLimiter, retry_seconds: float = 10.0):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(
+            url, socket_connect_timeout=REDIS_TIMEOUT_SECONDS, socket_timeout=REDIS_TIMEOUT_SECONDS
+        )
+        self._script = self._redis.register_script(REDIS_TOKEN_BUCKET)
+        self._fallback = fallback
+        self.retry_seconds = retry_seconds
+        self._down_until: Optional[float] = None  # Set while Redis is considered down
+
+    async def hit(self, key: str, capacity: int, per_second: float) -> RateDecision:
+        if self._down_until is not None and time.monotonic() < self._down_until:
+            return await self._fallback.hit(key, capacity, per_second)
+
+        try:
+            allowed, tokens = await self._script(
+                keys=[f"ratelimit:{key}"], args=[capacity, per_second, time.time()]
+            )
+        except Exception as e:
+            if self._down_until is None:
+                logger.warning(f"Redis rate limiter unavailable, using in-process buckets: {e}")
+            self._down_until = time.monotonic() + self.retry_seconds
+            return await self._fallback.hit(key, capacity, per_second)
+
+        if self._down_until is not None:
+            self._down_until = None
+            logger.info("Redis rate limiter available again")
+
+        tokens = float(tokens)
+        allowed = bool(allowed)
+        return RateDecision(allowed, int(tokens), 0.0 if allowed else (1 - tokens) / per_second)
+
+
+def create_rate_limiter():
+    """Limiter for RATE_LIMIT_BACKEND (memory | redis)"""
+    memory = MemoryRateLimiter(settings.RATE_LIMIT_MAX_KEYS)
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimiter(settings.REDIS_URL, memory, settings.RATE_LIMIT_REDIS_RETRY_SECONDS)
+    return memory
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI rate limiting middleware
+
+    Each request takes one token from a bucket chosen by route class:
+    - login/signup: RATE_LIMIT_LOGIN_ATTEMPTS per minute per IP
+    - searches, insights and exports: RATE_LIMIT_SEARCH_PER_MINUTE
+    - everything else under the API: RATE_LIMIT_PER_MINUTE
+    Authenticated requests are bucketed by API key / user, anonymous ones
+    by client IP (run uvicorn with --proxy-headers behind nginx).
+    """
+
+    def __init__(self, app, limiter=None):
+        self.app = app
+        self.limiter = limiter or create_rate_limiter()
+        self.prefix = settings.API_V1_STR
+        self.exempt = (f"{self.prefix}/health", f"{self.prefix}/docs", f"{self.prefix}/redoc", f"{self.prefix}/openapi.json")
+        self.login_paths = (f"{self.prefix}/auth/login", f"{self.prefix}/auth/signup")
+        self.expensive_paths = (f"{self.prefix}/cnpj/search", f"{self.prefix}/insights", f"{self.prefix}/export")
+
+    def classify(self, path: str) -> Optional[Tuple[str, int]]:
+        """Bucket name and per-minute limit for a path (None = not limited)"""
+        if not path.startswith(self.prefix) or path.startswith(self.exempt):
+            return None
+        if path.startswith(self.login_paths):
+            return "login", settings.RATE_LIMIT_LOGIN_ATTEMPTS
+        if path.startswith(self.expensive_paths):
+            return "search", settings.RATE_LIMIT_SEARCH_PER_MINUTE
+        return "default", settings.RATE_LIMIT_PER_MINUTE
+
+    @staticmethod
+    def identify(scope) -> str:
+        """Client identity: API key hash, JWT subject, or IP"""
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, credential = value.decode("latin-1").partition(" ")
+                if scheme.lower() != "bearer" or not credential:
+                    break
+                if is_api_key(credential):
+                    return f"key:{hash_api_key(credential)}"
+                try:
+                    payload = jwt.decode(
+                        credential, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+                    )
+                    return f"user:{payload.get('sub')}"
+                except JWTError:
+                    break
+
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            return await self.app(scope, receive, send)
+
+        bucket = self.classify(scope["path"])
+        if bucket is None:
+            return await self.app(scope, receive, send)
+
+        name, per_minute = bucket
+        if name == "login":
+            client = scope.get("client")
+            identity = f"ip:{client[0] if client else 'unknown'}"
+        else:
+            identity = self.identify(scope)
+
+        decision = await self.limiter.hit(f"{name}:{identity}", per_minute, per_minute / 60)
+
+        limit_headers = [
+            (b"x-ratelimit-limit", str(per_minute).encode()),
+            (b"x-ratelimit-remaining", str(decision.remaining).encode()),
+        ]
+
+        if not decision.allowed:
+            body = json.dumps(
+                {"detail": "Limite de requisições excedido. Tente novamente em instantes."}
+            ).encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": limit_headers + [
+                    (b"retry-after", str(math.ceil(decision.retry_after)).encode()),
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + limit_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
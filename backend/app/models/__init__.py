@@ -9,6 +9,9 @@ from app.models.subscription import Subscription
 from app.models.api_key import APIKey
 from app.models.empresa import Empresa, Estabelecimento, Socio
 from app.models.etl_status import ETLStatus
+from app.models.etl_checkpoint import ETLCheckpoint
+from app.models.estatistica import EstatisticaEstabelecimento
+from app.models.documento import CNPJDocumento
 
 __all__ = [
     "User",
@@ -19,4 +22,7 @@ __all__ = [
     "Estabelecimento",
     "Socio",
     "ETLStatus",
+    "ETLCheckpoint",
+    "EstatisticaEstabelecimento",
+    "CNPJDocumento",
 ]
@@ -17,7 +17,8 @@ class APIKey(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    key = Column(String, unique=True, index=True, nullable=False)
+    key_hash = Column(String(64), unique=True, index=True, nullable=False)  # HMAC-SHA256 of the key; plaintext is never stored
+    key_prefix = Column(String(16), nullable=False)  # First characters, for display only
     name = Column(String, nullable=True)  # Optional key name for user reference
     is_active = Column(Boolean, default=True)
     last_used_at = Column(DateTime, nullable=True)
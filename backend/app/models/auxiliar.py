@@ -4,7 +4,7 @@ Lookup tables from Receita Federal
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 
 from app.db.base import Base
 
@@ -0,0 +1,24 @@
+"""
+Documento Model
+Precomputed CNPJ lookup payloads built by the ETL
+"""
+
+from sqlalchemy import Column, String, DateTime, JSON
+
+from app.db.base import Base
+
+
+class CNPJDocumento(Base):
+    """
+    Documento pronto por CNPJ - payload final do GET /cnpj/{cnpj}
+
+    Uma linha por cnpj_completo, com códigos já resolvidos para descrições.
+    Armazenado como json (texto) para preservar a ordem das chaves e evitar
+    re-serialização no banco. Reconstruída a cada carga pelo ETL.
+    """
+
+    __tablename__ = "cnpj_documentos"
+
+    cnpj_completo = Column(String(14), primary_key=True, comment="CNPJ completo (14 dígitos)")
+    documento = Column(JSON, nullable=False, comment="Payload da consulta de CNPJ")
+    atualizado_em = Column(DateTime, nullable=True, comment="updated_at do estabelecimento de origem")
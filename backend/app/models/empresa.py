@@ -4,11 +4,35 @@ CNPJ data models from Receita Federal
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Index, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Index, ForeignKey, Computed
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
 
+# Principal + secundários parseados no próprio COPY (coluna gerada)
+CNAES_EXPRESSION = (
+    "array_remove(string_to_array("
+    "coalesce(cnae_fiscal_principal, '') || ',' || coalesce(cnae_fiscal_secundaria, ''), ','"
+    "), '')::integer[]"
+)
+
+# Domínios fixos da Receita (não há tabela auxiliar para eles)
+SITUACOES_CADASTRAIS = {
+    "01": "NULA",
+    "02": "ATIVA",
+    "03": "SUSPENSA",
+    "04": "INAPTA",
+    "08": "BAIXADA",
+}
+
+PORTES_EMPRESA = {
+    "00": "NÃO INFORMADO",
+    "01": "MICRO EMPRESA",
+    "03": "EMPRESA DE PEQUENO PORTE",
+    "05": "DEMAIS",
+}
+
 
 class Empresa(Base):
     """Empresa model - Dados da matriz (CNPJ básico)"""
@@ -42,6 +66,7 @@ class Estabelecimento(Base):
         Index('idx_estabelecimentos_uf_municipio', 'uf', 'municipio'),
         Index('idx_estabelecimentos_situacao', 'situacao_cadastral'),
         Index('idx_estabelecimentos_cnae_principal', 'cnae_fiscal_principal'),
+        Index('idx_estabelecimentos_cnaes', 'cnaes', postgresql_using='gin'),
         {'comment': 'Estabelecimentos (matriz e filiais) com endereços completos'}
     )
     
@@ -60,6 +85,11 @@ class Estabelecimento(Base):
     data_inicio_atividade = Column(String(8), nullable=True, comment="Data início (YYYYMMDD)")
     cnae_fiscal_principal = Column(String(7), nullable=True, index=True, comment="CNAE principal")
     cnae_fiscal_secundaria = Column(Text, nullable=True, comment="CNAEs secundários (separados por vírgula)")
+    cnaes = Column(
+        ARRAY(Integer),
+        Computed(CNAES_EXPRESSION, persisted=True),
+        comment="CNAE principal + secundários como inteiros (gerado, indexado com GIN)"
+    )
     tipo_logradouro = Column(String, nullable=True, comment="Tipo: RUA, AVENIDA, etc")
     logradouro = Column(String, nullable=True, comment="Nome do logradouro")
     numero = Column(String, nullable=True, comment="Número")
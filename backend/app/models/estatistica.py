@@ -0,0 +1,37 @@
+"""
+Estatística Models
+Aggregate rollups built by the ETL for market-sizing queries
+"""
+
+from sqlalchemy import Column, Integer, BigInteger, String, Index
+
+from app.db.base import Base
+
+
+class EstatisticaEstabelecimento(Base):
+    """
+    Contagem de estabelecimentos por combinação de dimensões.
+
+    Cada linha pertence a um nível de agregação (ver app.etl.aggregates.ROLLUP_LEVELS).
+    Dimensões fora do nível ficam NULL. A tabela é reconstruída a cada carga
+    e nunca é escrita pela API.
+    """
+
+    __tablename__ = "estatisticas_estabelecimentos"
+
+    __table_args__ = (
+        Index('idx_estatisticas_nivel_uf_municipio', 'nivel', 'uf', 'municipio', 'cnae_fiscal_principal'),
+        Index('idx_estatisticas_nivel_cnae', 'nivel', 'cnae_fiscal_principal', 'uf'),
+        {'comment': 'Rollups de estabelecimentos por UF, município, CNAE, situação, porte, Simples e MEI'}
+    )
+
+    id = Column(Integer, primary_key=True)
+    nivel = Column(String(32), nullable=False, comment="Nível de agregação (grouping set)")
+    uf = Column(String(2), nullable=True, comment="UF (sigla)")
+    municipio = Column(String(4), nullable=True, comment="Código do município")
+    cnae_fiscal_principal = Column(String(7), nullable=True, comment="CNAE principal")
+    situacao_cadastral = Column(String(2), nullable=True, comment="Código da situação cadastral")
+    porte_empresa = Column(String(2), nullable=True, comment="Código do porte da empresa")
+    opcao_simples = Column(String(1), nullable=True, comment="S/N - optante do Simples")
+    opcao_mei = Column(String(1), nullable=True, comment="S/N - optante do MEI")
+    total = Column(BigInteger, nullable=False, default=0, comment="Quantidade de estabelecimentos")
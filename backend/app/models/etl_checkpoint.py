@@ -0,0 +1,46 @@
+"""
+ETL Checkpoint Model
+Per-file progress of an ETL job (for resume)
+"""
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+# Stages in order; a file is skipped on resume once it reached "loaded"
+CHECKPOINT_STAGES = ["pending", "downloaded", "extracted", "loaded", "indexed"]
+
+
+class ETLCheckpoint(Base):
+    """
+    One row per (job, ZIP file)
+
+    "loaded" is written in the same transaction as the file's COPY, so a
+    file is either fully loaded and checkpointed or not loaded at all.
+    """
+
+    __tablename__ = "etl_checkpoints"
+
+    __table_args__ = (
+        UniqueConstraint('job_id', 'zip_file', name='uq_etl_checkpoints_job_file'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String, index=True, nullable=False)  # etl_status.job_id
+    zip_file = Column(String, nullable=False)  # Estabelecimentos3.zip
+    table_name = Column(String, nullable=False)  # estabelecimentos
+
+    # pending, downloaded, extracted, loaded, indexed
+    stage = Column(String, default="pending", nullable=False)
+    zip_bytes = Column(BigInteger)
+    rows_loaded = Column(BigInteger)
+    attempts = Column(Integer, default=0, nullable=False)
+    error_message = Column(String)
+
+    loaded_at = Column(DateTime)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<ETLCheckpoint(job_id={self.job_id}, file={self.zip_file}, stage={self.stage})>"
@@ -4,7 +4,7 @@ Tracks ETL job status and progress
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Float
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, JSON, Float
 from sqlalchemy.sql import func
 
 from app.db.base import Base
@@ -20,9 +20,13 @@ class ETLStatus(Base):
     id = Column(Integer, primary_key=True, index=True)
     job_id = Column(String, unique=True, index=True, nullable=False)
     
-    # Status: idle, running, paused, completed, error
+    # Status: queued, running, paused, completed, error, cancelled (idle = no job yet)
     status = Column(String, default="idle", nullable=False)
     
+    # Control channel (written by the API, polled by the worker between files)
+    control_command = Column(String)  # pause, cancel (None = run)
+    max_parallel_copies = Column(Integer)  # Throttle (None = ETL_MAX_PARALLEL_COPIES)
+    
     # Current progress
     current_step = Column(String)  # auxiliares, empresas, estabelecimentos, socios, simples
     current_file = Column(String)  # Estabelecimentos3.zip
@@ -33,6 +37,12 @@ class ETLStatus(Base):
     files_processed = Column(Integer, default=0)
     files_total = Column(Integer, default=0)
     records_imported = Column(Integer, default=0)
+    bytes_total = Column(BigInteger)  # ZIP bytes of the selected files
+    bytes_processed = Column(BigInteger, default=0)  # ZIP bytes of the loaded files
+    
+    # Throughput of the current run (ETA is bytes remaining / bytes_per_second)
+    records_per_second = Column(Float)
+    bytes_per_second = Column(Float)
     
     # Disk space
     disk_free_gb = Column(Float)
@@ -49,7 +59,7 @@ class ETLStatus(Base):
     warnings = Column(JSON)  # List of warning messages
     
     # Detailed state (for resume)
-    job_metadata = Column(JSON)  # {processed_files: [...], failed_files: [...]}
+    job_metadata = Column("metadata", JSON)  # {post_process: [completed steps], ...}
     
     # Timestamps
     created_at = Column(DateTime, default=func.now())
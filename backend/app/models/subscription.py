@@ -4,7 +4,7 @@ User subscription management
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, Boolean
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -22,7 +22,8 @@ class Subscription(Base):
     status = Column(String, default="active")  # active, canceled, past_due, etc
     current_period_start = Column(DateTime, nullable=True)
     current_period_end = Column(DateTime, nullable=True)
-    queries_used = Column(Integer, default=0)
+    queries_used = Column(Integer, default=0)  # Queries in the month starting at queries_period_start
+    queries_period_start = Column(Date, nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -3,6 +3,8 @@ Authentication Schemas
 Pydantic models for auth requests/responses
 """
 
+from datetime import datetime
+
 from pydantic import BaseModel, EmailStr
 
 
@@ -37,3 +39,28 @@ class UserResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class APIKeyCreate(BaseModel):
+    """API key creation request"""
+    name: str | None = None
+    expires_at: datetime | None = None
+
+
+class APIKeyResponse(BaseModel):
+    """API key info (never includes the key itself)"""
+    id: int
+    name: str | None = None
+    key_prefix: str
+    is_active: bool
+    last_used_at: datetime | None = None
+    created_at: datetime | None = None
+    expires_at: datetime | None = None
+    
+    class Config:
+        from_attributes = True
+
+
+class APIKeyCreated(APIKeyResponse):
+    """API key creation response - the only time the plaintext key is returned"""
+    key: str
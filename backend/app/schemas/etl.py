@@ -18,7 +18,7 @@ class ETLStartRequest(BaseModel):
 class ETLValidationResponse(BaseModel):
     """ETL pre-validation response"""
     can_proceed: bool
-    warnings: List[str] = []
+    warnings: Optional[List[str]] = []
     errors: List[str] = []
     disk_free_gb: float
     disk_used_gb: float
@@ -29,7 +29,7 @@ class ETLValidationResponse(BaseModel):
 class ETLStatusResponse(BaseModel):
     """ETL status response"""
     job_id: str
-    status: str  # idle, running, paused, completed, error
+    status: str  # idle, queued, running, paused, completed, error, cancelled
     current_step: Optional[str] = None
     current_file: Optional[str] = None
     current_table: Optional[str] = None
@@ -37,6 +37,10 @@ class ETLStatusResponse(BaseModel):
     files_processed: int = 0
     files_total: int = 0
     records_imported: int = 0
+    bytes_total: Optional[int] = None
+    bytes_processed: Optional[int] = 0
+    records_per_second: Optional[float] = None
+    bytes_per_second: Optional[float] = None
     disk_free_gb: Optional[float] = None
     disk_used_gb: Optional[float] = None
     started_at: Optional[datetime] = None
@@ -44,7 +48,42 @@ class ETLStatusResponse(BaseModel):
     elapsed_seconds: int = 0
     estimated_remaining_seconds: Optional[int] = None
     error_message: Optional[str] = None
-    warnings: List[str] = []
+    warnings: Optional[List[str]] = []
+    control_command: Optional[str] = None
+    max_parallel_copies: Optional[int] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class ETLThrottleRequest(BaseModel):
+    """Change COPY concurrency of the running job"""
+    max_parallel_copies: Optional[int] = Field(
+        default=None, ge=1, le=16,
+        description="Arquivos carregados em paralelo (null volta ao padrão do servidor)"
+    )
+
+
+class ETLControlResponse(BaseModel):
+    """Response of pause/resume/cancel/throttle"""
+    job_id: str
+    status: str
+    control_command: Optional[str] = None
+    max_parallel_copies: Optional[int] = None
+    message: str
+
+
+class ETLCheckpointResponse(BaseModel):
+    """Per-file progress of a job"""
+    zip_file: str
+    table_name: str
+    stage: str  # pending, downloaded, extracted, loaded, indexed
+    zip_bytes: Optional[int] = None
+    rows_loaded: Optional[int] = None
+    attempts: int = 0
+    error_message: Optional[str] = None
+    loaded_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
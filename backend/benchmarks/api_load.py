@@ -0,0 +1,406 @@
+"""
+API load test
+Mixed read traffic against the API with per-endpoint latency SLOs
+
+Starts uvicorn (or targets --url) against a Postgres seeded with the
+synthetic Receita dataset, then runs `--concurrency` closed-loop clients for
+`--duration` seconds over a weighted mix of:
+
+    lookup_hot     /cnpj/{cnpj}            small hot set (cache-friendly)
+    lookup_cold    /cnpj/{cnpj}            uniform over the sampled CNPJs
+    lookup_miss    /cnpj/{cnpj}            unknown CNPJs (404 expected)
+    search         /cnpj/search/razao-social
+    filiais        /insights/filiais/{cnpj_basico}
+    socio          /insights/socio/{cpf_cnpj}/empresas
+    socio_nome     /insights/socio/nome/{nome}
+    cnae           /insights/cnae/{cnae}?uf=..
+
+The API has no batch lookup endpoint, so there is no batch traffic class.
+
+Reports p50/p95/p99, throughput and error rate per endpoint and overall, and
+exits 1 when a threshold is missed (default: p95 < 100 ms, p99 < 250 ms,
+errors < 1%).
+
+Usage:
+    DATABASE_URL=postgresql://... python -m benchmarks.api_load \
+        --seed-scale 100000 --create-schema --start-server \
+        --concurrency 32 --duration 60 [--output results.json]
+
+    python -m benchmarks.api_load --url http://localhost:8000 \
+        --email ... --password ... --duration 30
+
+--seed-scale truncates and reloads the CNPJ tables of the target database.
+The benchmark user is a superuser, so quota metering does not cut it off;
+the server started by --start-server runs with RATE_LIMIT_ENABLED=false.
+A --url target must run with RATE_LIMIT_ENABLED=false too (the per-user
+limits are a few requests per second): the run aborts on the first 429.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import httpx
+from sqlalchemy import select, text
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.db.session import async_session
+from app.etl.aggregates import rebuild_aggregates
+from app.etl.documents import rebuild_documents
+from app.models.user import User
+from benchmarks.auth_concurrency import summarize
+from benchmarks.etl_pipeline import ResourceSampler, create_schema, git_revision, reset_tables, run_worker_path
+from benchmarks.receita_dataset import NOMES, PALAVRAS, UFS, generate
+
+DEFAULT_MIX = "lookup_hot=45,lookup_cold=25,lookup_miss=5,search=8,filiais=5,socio=4,socio_nome=3,cnae=5"
+BENCH_EMAIL = "loadtest@authbrasil.com.br"
+BENCH_PASSWORD = "loadtest-benchmark"
+
+
+@dataclass
+class Keyspace:
+    """Values the traffic generator draws from (sampled from the database)"""
+    cnpjs: List[str]
+    basicos: List[str]
+    socios: List[str]
+    cnaes: List[str]
+    hot: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Sample:
+    seconds: float
+    status: int
+
+
+async def seed_database(args):
+    """Load the synthetic dataset through the worker path and build derived tables"""
+    dataset = args.workdir / f"dataset-{args.seed_scale}-{args.seed}"
+    if not (dataset / "manifest.json").exists():
+        print(f"Generating dataset (scale={args.seed_scale})...", file=sys.stderr)
+        generate(dataset, args.seed_scale, args.seed)
+
+    if args.create_schema:
+        await create_schema()
+
+    print("Loading dataset...", file=sys.stderr)
+    await reset_tables()
+    sampler = ResourceSampler(args.workdir)
+    await run_worker_path(dataset, args.workdir, sampler)
+
+    async with async_session() as db:
+        await rebuild_aggregates(db)
+    if settings.ETL_BUILD_DOCUMENTS:
+        async with async_session() as db:
+            await rebuild_documents(db)
+
+
+async def ensure_user(email: str, password: str):
+    """Create (or reset) the benchmark superuser"""
+    async with async_session() as db:
+        user = (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
+        if user is None:
+            user = User(email=email, full_name="Load test")
+            db.add(user)
+        user.hashed_password = get_password_hash(password)
+        user.is_active = True
+        user.is_superuser = True
+        user.is_verified = True
+        await db.commit()
+
+
+async def sample_keyspace(sample_size: int, hot_keys: int, rng: random.Random) -> Keyspace:
+    """Draw lookup keys from the loaded tables"""
+    async with async_session() as db:
+        async def column(sql: str) -> List[str]:
+            rows = await db.execute(text(sql), {"n": sample_size})
+            return sorted(row[0] for row in rows if row[0])
+
+        keyspace = Keyspace(
+            cnpjs=await column("SELECT cnpj_completo FROM estabelecimentos ORDER BY random() LIMIT :n"),
+            basicos=await column("SELECT DISTINCT cnpj_basico FROM estabelecimentos WHERE cnpj_ordem <> '0001' LIMIT :n"),
+            socios=await column("SELECT DISTINCT cpf_cnpj_socio FROM socios WHERE cpf_cnpj_socio ~ '^[0-9]{14}$' LIMIT :n"),
+            cnaes=await column("SELECT DISTINCT cnae_fiscal_principal FROM estabelecimentos LIMIT :n"),
+        )
+
+    if not keyspace.cnpjs:
+        raise RuntimeError("No estabelecimentos loaded; run with --seed-scale first")
+
+    keyspace.hot = rng.sample(keyspace.cnpjs, min(hot_keys, len(keyspace.cnpjs)))
+    return keyspace
+
+
+def build_requests(keyspace: Keyspace) -> Dict[str, Tuple[Callable[[random.Random], str], Set[int]]]:
+    """Traffic class -> (path generator, accepted status codes)"""
+    def pick(values: List[str], fallback: str) -> Callable[[random.Random], str]:
+        return lambda rng: rng.choice(values) if values else fallback
+
+    hot, cold = pick(keyspace.hot, ""), pick(keyspace.cnpjs, "")
+    basico, socio, cnae = pick(keyspace.basicos, "00000000"), pick(keyspace.socios, "00000000000000"), pick(keyspace.cnaes, "0000000")
+
+    return {
+        "lookup_hot": (lambda rng: f"/cnpj/{hot(rng)}", {200}),
+        "lookup_cold": (lambda rng: f"/cnpj/{cold(rng)}", {200}),
+        "lookup_miss": (lambda rng: f"/cnpj/99{rng.randint(0, 10**12 - 1):012d}", {404}),
+        "search": (lambda rng: f"/cnpj/search/razao-social?q={rng.choice(PALAVRAS)}&limit=10", {200}),
+        "filiais": (lambda rng: f"/insights/filiais/{basico(rng)}", {200, 404}),
+        "socio": (lambda rng: f"/insights/socio/{socio(rng)}/empresas", {200, 404}),
+        "socio_nome": (lambda rng: f"/insights/socio/nome/{rng.choice(NOMES)}", {200, 404}),
+        "cnae": (lambda rng: f"/insights/cnae/{cnae(rng)}?uf={rng.choice(UFS)}&limit=20", {200, 404}),
+    }
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+async def login(client: httpx.AsyncClient, api: str, email: str, password: str) -> str:
+    response = await client.post(f"{api}/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def wait_for_server(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=2) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{url}/")).status_code < 500:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"Server at {url} did not become ready in {timeout:.0f}s")
+
+
+def start_server(args) -> subprocess.Popen:
+    env = {**os.environ, "RATE_LIMIT_ENABLED": "false"}
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(args.port),
+            "--workers", str(args.workers), "--log-level", "warning", "--no-access-log",
+        ],
+        env=env,
+    )
+
+
+async def drive(args, api: str, token: str, keyspace: Keyspace) -> dict:
+    """Closed-loop clients over the weighted mix; returns the report"""
+    requests = build_requests(keyspace)
+    weights = parse_mix(args.mix)
+    unknown = set(weights) - set(requests)
+    if unknown:
+        raise ValueError(f"Unknown traffic classes: {', '.join(sorted(unknown))}")
+    names = [name for name in weights if weights[name] > 0]
+    class_weights = [weights[name] for name in names]
+
+    samples: Dict[str, List[Sample]] = defaultdict(list)
+    errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    rate_limited: Dict[str, int] = defaultdict(int)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip"}
+
+    async with httpx.AsyncClient(base_url=api, headers=headers, timeout=args.timeout, limits=limits) as client:
+        async def client_loop(worker: int, until: float, record: bool):
+            rng = random.Random(f"{args.seed}:{worker}:{record}")
+            while time.monotonic() < until and not rate_limited:
+                name = rng.choices(names, weights=class_weights)[0]
+                make_path, accepted = requests[name]
+                started = time.perf_counter()
+                try:
+                    response = await client.get(make_path(rng))
+                    status = response.status_code
+                except httpx.HTTPError as e:
+                    status = 0
+                    if record:
+                        errors[name][type(e).__name__] += 1
+                elapsed = time.perf_counter() - started
+                if status == 429:
+                    # Not a latency sample: every client stops at the next iteration
+                    rate_limited[name] += 1
+                    continue
+                if not record:
+                    continue
+                samples[name].append(Sample(elapsed, status))
+                if status and status not in accepted:
+                    errors[name][str(status)] += 1
+
+        if args.warmup:
+            until = time.monotonic() + args.warmup
+            await asyncio.gather(*(client_loop(i, until, False) for i in range(args.concurrency)))
+            if rate_limited:
+                raise RateLimited(dict(rate_limited))
+
+        started = time.monotonic()
+        until = started + args.duration
+        await asyncio.gather(*(client_loop(i, until, True) for i in range(args.concurrency)))
+        wall = time.monotonic() - started
+        if rate_limited:
+            raise RateLimited(dict(rate_limited))
+
+    endpoints = {}
+    for name in names:
+        recorded = samples[name]
+        failed = sum(errors[name].values())
+        endpoints[name] = {
+            **summarize([s.seconds for s in recorded]),
+            "rps": round(len(recorded) / wall, 1),
+            "error_rate": round(failed / len(recorded), 4) if recorded else 0.0,
+            "errors": dict(errors[name]),
+        }
+
+    every = [s for recorded in samples.values() for s in recorded]
+    failed = sum(sum(e.values()) for e in errors.values())
+    return {
+        "overall": {
+            **summarize([s.seconds for s in every]),
+            "rps": round(len(every) / wall, 1),
+            "error_rate": round(failed / len(every), 4) if every else 0.0,
+        },
+        "endpoints": endpoints,
+    }
+
+
+class RateLimited(Exception):
+    """The target answered 429: its rate limiter is on"""
+
+
+def check_thresholds(report: dict, args) -> List[str]:
+    """Threshold violations (empty when the run passes)"""
+    failures = []
+    for name, stats in [("overall", report["overall"]), *report["endpoints"].items()]:
+        if not stats.get("count"):
+            continue
+        if stats["p95_ms"] > args.p95_ms:
+            failures.append(f"{name}: p95 {stats['p95_ms']}ms > {args.p95_ms}ms")
+        if stats["p99_ms"] > args.p99_ms:
+            failures.append(f"{name}: p99 {stats['p99_ms']}ms > {args.p99_ms}ms")
+        if stats["error_rate"] > args.max_error_rate:
+            failures.append(f"{name}: error rate {stats['error_rate']:.2%} > {args.max_error_rate:.2%}")
+    if args.min_rps and report["overall"]["rps"] < args.min_rps:
+        failures.append(f"overall: {report['overall']['rps']} req/s < {args.min_rps} req/s")
+    return failures
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+
+    if args.seed_scale:
+        args.workdir.mkdir(parents=True, exist_ok=True)
+        await seed_database(args)
+
+    email, password = args.email, args.password
+    if not email:
+        email, password = BENCH_EMAIL, BENCH_PASSWORD
+        await ensure_user(email, password)
+
+    keyspace = await sample_keyspace(args.sample_size, args.hot_keys, rng)
+
+    server: Optional[subprocess.Popen] = None
+    url = args.url or f"http://127.0.0.1:{args.port}"
+    if args.start_server:
+        server = start_server(args)
+
+    try:
+        await wait_for_server(url)
+        api = f"{url.rstrip('/')}{settings.API_V1_STR}"
+        async with httpx.AsyncClient(timeout=30) as client:
+            token = await login(client, api, email, password)
+
+        print(f"Running {args.duration}s at concurrency {args.concurrency}...", file=sys.stderr)
+        report = await drive(args, api, token, keyspace)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git": git_revision(),
+            "url": url,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "workers": args.workers if args.start_server else None,
+            "mix": parse_mix(args.mix),
+            "seed_scale": args.seed_scale,
+            "keyspace": {"cnpjs": len(keyspace.cnpjs), "hot": len(keyspace.hot)},
+        },
+        "thresholds": {"p95_ms": args.p95_ms, "p99_ms": args.p99_ms, "max_error_rate": args.max_error_rate},
+        **report,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running API")
+    parser.add_argument("--start-server", action="store_true", help="Start uvicorn on --port")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (--start-server)")
+    parser.add_argument("--email", help="Existing user (default: create a benchmark superuser)")
+    parser.add_argument("--password")
+    parser.add_argument("--seed-scale", type=int, default=0, help="Load a synthetic dataset of this many companies")
+    parser.add_argument("--create-schema", action="store_true", help="Create tables before seeding")
+    parser.add_argument("--workdir", type=Path, default=Path("/tmp/api-load"))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before the run")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Traffic class weights")
+    parser.add_argument("--hot-keys", type=int, default=100, help="Size of the hot CNPJ set")
+    parser.add_argument("--sample-size", type=int, default=10000, help="Keys sampled per class")
+    parser.add_argument("--p95-ms", type=float, default=100.0)
+    parser.add_argument("--p99-ms", type=float, default=250.0)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--min-rps", type=float, default=0.0, help="Minimum overall throughput")
+    parser.add_argument("--output", type=Path, help="Write the report to this file")
+    args = parser.parse_args()
+
+    if not (args.url or args.start_server):
+        parser.error("either --url or --start-server is required")
+    if args.email and not args.password:
+        parser.error("--password is required with --email")
+
+    try:
+        report = asyncio.run(run(args))
+    except RateLimited as e:
+        print(
+            f"ABORT: the API answered 429 Too Many Requests ({e.args[0]}). "
+            "Run the target with RATE_LIMIT_ENABLED=false.",
+            file=sys.stderr,
+        )
+        sys.exit(2)
+    failures = check_thresholds(report, args)
+    report["passed"] = not failures
+    report["failures"] = failures
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(output)
+
+    for line in failures:
+        print(f"FAIL {line}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Auth concurrency benchmark
+Shows whether login bursts inflate the latency of concurrent CNPJ lookups
+
+Modes:
+    python -m benchmarks.auth_concurrency
+        In-process: simulated lookups (short awaits) run while a burst of
+        bcrypt verifications executes inline (old behaviour) and on the
+        password hashing pool (current behaviour).
+
+    python -m benchmarks.auth_concurrency --url http://localhost:8000 \
+        --email admin@authbrasil.com.br --password ... --cnpj 00000000000191
+        Against a running server: CNPJ lookup latency alone and during a
+        burst of concurrent logins. Lookups are authenticated as --email
+        (use a superuser, or the subscription quota ends the run).
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+import bcrypt
+
+from app.core.config import settings
+from app.core.security import verify_password, verify_password_async
+
+
+def summarize(samples: List[float]) -> dict:
+    """p50/p95/p99/max in milliseconds"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 2)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": round(ordered[-1] * 1000, 2),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+    }
+
+
+async def measure_lookups(
+    lookup: Callable[[], Awaitable[None]], stop: asyncio.Event, concurrency: int
+) -> List[float]:
+    """Run lookups back-to-back on `concurrency` tasks until stop is set"""
+    samples: List[float] = []
+
+    async def runner():
+        while not stop.is_set():
+            started = time.perf_counter()
+            await lookup()
+            samples.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(runner() for _ in range(concurrency)))
+    return samples
+
+
+async def run_scenario(
+    lookup: Callable[[], Awaitable[None]],
+    burst: Callable[[], Awaitable[None]],
+    concurrency: int,
+    warmup: float,
+) -> dict:
+    """Lookup latency while `burst` runs"""
+    stop = asyncio.Event()
+    lookups = asyncio.create_task(measure_lookups(lookup, stop, concurrency))
+    await asyncio.sleep(warmup)
+
+    started = time.perf_counter()
+    await burst()
+    burst_seconds = time.perf_counter() - started
+
+    stop.set()
+    result = summarize(await lookups)
+    result["burst_seconds"] = round(burst_seconds, 3)
+    return result
+
+
+async def in_process(args) -> dict:
+    """Simulated lookups vs inline and pooled bcrypt"""
+    hashed = bcrypt.hashpw(b"benchmark", bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode()
+
+    async def lookup():
+        await asyncio.sleep(args.lookup_ms / 1000)
+
+    async def no_burst():
+        await asyncio.sleep(args.idle_seconds)
+
+    async def inline_burst():
+        async def login():
+            await asyncio.sleep(0)
+            verify_password("benchmark", hashed)
+        await asyncio.gather(*(login() for _ in range(args.logins)))
+
+    async def pooled_burst():
+        await asyncio.gather(
+            *(verify_password_async("benchmark", hashed) for _ in range(args.logins))
+        )
+
+    return {
+        "mode": "in-process",
+        "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+        "password_hash_workers": settings.PASSWORD_HASH_WORKERS,
+        "logins": args.logins,
+        "baseline": await run_scenario(lookup, no_burst, args.concurrency, args.warmup),
+        "inline_bcrypt": await run_scenario(lookup, inline_burst, args.concurrency, args.warmup),
+        "pooled_bcrypt": await run_scenario(lookup, pooled_burst, args.concurrency, args.warmup),
+    }
+
+
+async def against_server(args) -> dict:
+    """Real /cnpj lookups vs a burst of real /auth/login calls"""
+    import httpx
+
+    api = f"{args.url.rstrip('/')}{settings.API_V1_STR}"
+    limits = httpx.Limits(max_connections=args.concurrency + args.logins)
+
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        credentials = {"email": args.email, "password": args.password}
+
+        # /cnpj requires a token: log in once, before any measurement
+        response = await client.post(f"{api}/auth/login", json=credentials)
+        response.raise_for_status()
+        auth = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        async def lookup():
+            response = await client.get(f"{api}/cnpj/{args.cnpj}", headers=auth)
+            response.raise_for_status()
+
+        async def no_burst():
+            await asyncio.sleep(args.idle_seconds)
+
+        async def login_burst():
+            responses = await asyncio.gather(
+                *(client.post(f"{api}/auth/login", json=credentials) for _ in range(args.logins))
+            )
+            failed = [r.status_code for r in responses if r.status_code != 200]
+            if failed:
+                raise RuntimeError(f"{len(failed)} logins failed: {failed[:5]}")
+
+        return {
+            "mode": "server",
+            "url": args.url,
+            "logins": args.logins,
+            "baseline": await run_scenario(lookup, no_burst, args.concurrency, args.warmup),
+            "login_burst": await run_scenario(lookup, login_burst, args.concurrency, args.warmup),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running API (omit for in-process mode)")
+    parser.add_argument("--email", help="Login email (server mode)")
+    parser.add_argument("--password", help="Login password (server mode)")
+    parser.add_argument("--cnpj", default="00000000000191", help="CNPJ to look up (server mode)")
+    parser.add_argument("--logins", type=int, default=50, help="Logins in the burst")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent lookup loops")
+    parser.add_argument("--lookup-ms", type=float, default=2.0, help="Simulated lookup time (in-process)")
+    parser.add_argument("--idle-seconds", type=float, default=2.0, help="Baseline duration")
+    parser.add_argument("--warmup", type=float, default=0.2, help="Seconds of lookups before the burst")
+    args = parser.parse_args()
+
+    if args.url:
+        if not (args.email and args.password):
+            parser.error("--email and --password are required with --url")
+        result = asyncio.run(against_server(args))
+    else:
+        result = asyncio.run(in_process(args))
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
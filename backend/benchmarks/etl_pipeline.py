@@ -0,0 +1,408 @@
+"""
+ETL pipeline benchmark
+Per-stage throughput of the ETL paths against a local Postgres, on synthetic data
+
+Paths:
+    processor_loader  CSVProcessor.process_zip_file stages + DatabaseLoader.bulk_insert
+                      (unzip, decode, parse, encode, copy) then create_indexes / ANALYZE
+    worker            worker_v2.process_file shape: unzip, CSV COPY (LATIN1, ';'),
+                      cnpj_completo UPDATE, indexes, VACUUM ANALYZE. The CSV is streamed
+                      from the client instead of `docker cp` + server-side COPY.
+
+Every stage reports seconds, MB/s, rows/s and peak RSS; each run reports the
+disk high-water mark of the work directory's filesystem and database growth.
+
+Usage:
+    DATABASE_URL=postgresql://... python -m benchmarks.etl_pipeline \
+        --scales 1000,10000,100000 --workdir /tmp/etl-bench --create-schema \
+        [--output results.json] [--baseline previous.json --tolerance 0.2]
+
+WARNING: truncates the CNPJ tables of the target database.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.db.base import Base
+from app.db.session import async_engine, async_session
+from app.etl.loader import DatabaseLoader
+from app.etl.processor import CSVProcessor
+from app.etl.worker_v2 import FILES_CONFIG
+from benchmarks.receita_dataset import generate
+
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+
+DATA_TABLES = [
+    "socios", "simples", "estabelecimentos", "empresas",
+    "cnaes", "motivos", "municipios", "naturezas", "paises", "qualificacoes",
+]
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+MB = 1024 * 1024
+
+
+class ResourceSampler:
+    """Background sampling of RSS and disk usage (every 50 ms)"""
+
+    def __init__(self, workdir: Path):
+        self.workdir = workdir
+        self.disk_baseline = shutil.disk_usage(workdir).used
+        self.disk_peak = self.disk_baseline
+        self.rss_peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def rss() -> int:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+
+    def sample(self):
+        self.rss_peak = max(self.rss_peak, self.rss())
+        self.disk_peak = max(self.disk_peak, shutil.disk_usage(self.workdir).used)
+
+    def _run(self):
+        while not self._stop.wait(0.05):
+            self.sample()
+
+    def reset_rss_peak(self):
+        self.rss_peak = self.rss()
+
+    def reset_disk(self):
+        self.disk_baseline = shutil.disk_usage(self.workdir).used
+        self.disk_peak = self.disk_baseline
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+class StageTimer:
+    """Accumulates seconds, bytes, rows and peak RSS per stage"""
+
+    def __init__(self, sampler: ResourceSampler):
+        self.sampler = sampler
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    def add(self, name: str, seconds: float, nbytes: int = 0, rows: int = 0):
+        stage = self.stages.setdefault(name, {"seconds": 0.0, "bytes": 0, "rows": 0, "peak_rss_mb": 0.0})
+        stage["seconds"] += seconds
+        stage["bytes"] += nbytes
+        stage["rows"] += rows
+        self.sampler.sample()
+        stage["peak_rss_mb"] = max(stage["peak_rss_mb"], round(self.sampler.rss_peak / MB, 1))
+
+    @contextmanager
+    def stage(self, name: str, nbytes: int = 0, rows: int = 0):
+        """Time a contiguous stage; counts may be added to the yielded dict"""
+        self.sampler.reset_rss_peak()
+        counts = {"bytes": nbytes, "rows": rows}
+        started = time.perf_counter()
+        yield counts
+        self.add(name, time.perf_counter() - started, counts["bytes"], counts["rows"])
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        report = {}
+        for name, stage in self.stages.items():
+            seconds = stage["seconds"] or 1e-9
+            report[name] = {
+                "seconds": round(stage["seconds"], 3),
+                "mb": round(stage["bytes"] / MB, 2),
+                "rows": int(stage["rows"]),
+                "mb_per_s": round(stage["bytes"] / MB / seconds, 2),
+                "rows_per_s": round(stage["rows"] / seconds, 1),
+                "peak_rss_mb": stage["peak_rss_mb"],
+            }
+        return report
+
+
+def ordered_files():
+    """(zip, csv name, table, columns) in load order (lookups and empresas first)"""
+    for group in ("auxiliares", "empresas", "estabelecimentos", "socios", "simples"):
+        yield from FILES_CONFIG[group]
+
+
+async def reset_tables():
+    async with async_session() as db:
+        await db.execute(text(f"TRUNCATE {', '.join(DATA_TABLES)} RESTART IDENTITY CASCADE"))
+        await db.commit()
+
+
+async def database_size() -> int:
+    async with async_session() as db:
+        return (await db.execute(text("SELECT pg_database_size(current_database())"))).scalar()
+
+
+async def create_schema():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        # worker_v2 COPYs estabelecimentos without cnpj_completo and fills it afterwards
+        await conn.execute(text("ALTER TABLE estabelecimentos ALTER COLUMN cnpj_completo DROP NOT NULL"))
+
+
+async def run_processor_loader(dataset: Path, workdir: Path, sampler: ResourceSampler, chunk_size: int) -> dict:
+    """CSVProcessor + DatabaseLoader, stage by stage"""
+    timer = StageTimer(sampler)
+    processor = CSVProcessor(chunk_size=chunk_size)
+
+    async with async_session() as session:
+        loader = DatabaseLoader(session)
+
+        for zip_file, _csv_name, _table, _columns in ordered_files():
+            zip_path = dataset / zip_file
+            extract_dir = workdir / zip_path.stem
+
+            with timer.stage("unzip") as counts:
+                processor.extract_zip(zip_path, extract_dir)
+                files = sorted(p for p in extract_dir.rglob("*") if p.is_file())
+                counts["bytes"] = sum(p.stat().st_size for p in files)
+
+            for csv_file in files:
+                size = csv_file.stat().st_size
+
+                with timer.stage("decode", nbytes=size):
+                    with open(csv_file, "rb") as f:
+                        while block := f.read(MB):
+                            block.decode("latin-1")
+
+                file_type = processor.detect_file_type(csv_file.name)
+                chunks = processor.process_csv_chunk(csv_file, file_type)
+                sampler.reset_rss_peak()
+                parse_seconds, parse_rows = 0.0, 0
+                while True:
+                    started = time.perf_counter()
+                    chunk = next(chunks, None)
+                    parse_seconds += time.perf_counter() - started
+                    if chunk is None:
+                        break
+                    parse_rows += len(chunk)
+
+                    started = time.perf_counter()
+                    columns, data = loader.encode_records(chunk)
+                    timer.add("encode", time.perf_counter() - started, len(data), len(chunk))
+
+                    started = time.perf_counter()
+                    await loader.copy_encoded(loader.TABLE_MAPPINGS[file_type], columns, data)
+                    await session.commit()
+                    timer.add("copy", time.perf_counter() - started, len(data), len(chunk))
+
+                timer.add("parse", parse_seconds, size, parse_rows)
+
+            shutil.rmtree(extract_dir, ignore_errors=True)
+
+        with timer.stage("index"):
+            await loader.create_indexes()
+
+        with timer.stage("analyze"):
+            await loader.update_statistics()
+
+    return timer.report()
+
+
+def unzip(zip_path: Path, extract_dir: Path):
+    """`unzip` like worker_v2 when available, zipfile otherwise"""
+    if shutil.which("unzip"):
+        subprocess.run(
+            ["unzip", "-o", str(zip_path), "-d", str(extract_dir)],
+            check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+    else:
+        with zipfile.ZipFile(zip_path) as archive:
+            archive.extractall(extract_dir)
+
+
+async def run_worker_path(dataset: Path, workdir: Path, sampler: ResourceSampler) -> dict:
+    """worker_v2.process_file + post_process, without docker"""
+    timer = StageTimer(sampler)
+
+    for zip_file, csv_name, table_name, columns in ordered_files():
+        zip_path = dataset / zip_file
+        extract_dir = workdir / zip_path.stem
+
+        with timer.stage("unzip") as counts:
+            unzip(zip_path, extract_dir)
+            csv_file = next(extract_dir.glob(f"{csv_name}*"))
+            counts["bytes"] = csv_file.stat().st_size
+
+        with timer.stage("copy", nbytes=csv_file.stat().st_size) as counts:
+            async with async_engine.connect() as conn:
+                raw = await conn.get_raw_connection()
+                status = await raw.driver_connection.copy_to_table(
+                    table_name,
+                    source=str(csv_file),
+                    columns=columns.split(","),
+                    format="csv",
+                    delimiter=";",
+                    quote='"',
+                    encoding="LATIN1",
+                    header=False,
+                )
+                await conn.commit()
+            counts["rows"] = int(status.split()[-1])
+
+        shutil.rmtree(extract_dir, ignore_errors=True)
+
+    async with async_session() as db:
+        with timer.stage("cnpj_completo") as counts:
+            result = await db.execute(text(
+                "UPDATE estabelecimentos SET cnpj_completo = cnpj_basico || cnpj_ordem || cnpj_dv "
+                "WHERE cnpj_completo IS NULL"
+            ))
+            await db.commit()
+            counts["rows"] = result.rowcount
+
+        with timer.stage("index"):
+            await DatabaseLoader(db).create_indexes()
+
+    with timer.stage("analyze"):
+        async with async_engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("VACUUM ANALYZE"))
+
+    return timer.report()
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Stages whose throughput fell more than `tolerance` below the baseline"""
+    regressions = []
+    previous = {(r["scale"], r["path"]): r["stages"] for r in baseline.get("runs", [])}
+
+    for run in results["runs"]:
+        old_stages = previous.get((run["scale"], run["path"]))
+        if not old_stages:
+            continue
+        for name, stage in run["stages"].items():
+            old = old_stages.get(name)
+            if not old:
+                continue
+            metric = "rows_per_s" if stage["rows"] and old["rows"] else "mb_per_s"
+            if old[metric] and stage[metric] < old[metric] * (1 - tolerance):
+                regressions.append(
+                    f"scale={run['scale']} {run['path']}.{name}: {metric} "
+                    f"{old[metric]} -> {stage[metric]}"
+                )
+    return regressions
+
+
+async def run(args) -> dict:
+    workdir = args.workdir
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    if args.create_schema:
+        await create_schema()
+
+    sampler = ResourceSampler(workdir)
+    sampler.start()
+
+    results = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": args.seed,
+            "chunk_size": args.chunk_size,
+        },
+        "runs": [],
+    }
+
+    try:
+        for scale in args.scales:
+            dataset = workdir / f"dataset-{scale}-{args.seed}"
+            if not (dataset / "manifest.json").exists():
+                print(f"Generating dataset (scale={scale})...", file=sys.stderr)
+                generate(dataset, scale, args.seed)
+            manifest = json.loads((dataset / "manifest.json").read_text())
+            zip_mb = sum(f["zip_bytes"] for f in manifest["files"].values()) / MB
+
+            for path in args.paths:
+                print(f"Running {path} (scale={scale})...", file=sys.stderr)
+                await reset_tables()
+                db_before = await database_size()
+                sampler.reset_disk()
+                started = time.perf_counter()
+
+                if path == "processor_loader":
+                    stages = await run_processor_loader(dataset, workdir, sampler, args.chunk_size)
+                else:
+                    stages = await run_worker_path(dataset, workdir, sampler)
+
+                results["runs"].append({
+                    "scale": scale,
+                    "path": path,
+                    "input_zip_mb": round(zip_mb, 2),
+                    "total_seconds": round(time.perf_counter() - started, 3),
+                    "disk_high_water_mb": round((sampler.disk_peak - sampler.disk_baseline) / MB, 1),
+                    "db_growth_mb": round((await database_size() - db_before) / MB, 1),
+                    "stages": stages,
+                })
+    finally:
+        sampler.stop()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1000,10000", help="Comma-separated company counts")
+    parser.add_argument("--paths", default="processor_loader,worker", help="Comma-separated paths to run")
+    parser.add_argument("--workdir", type=Path, default=Path("/tmp/etl-bench"))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=100000, help="CSVProcessor chunk size")
+    parser.add_argument("--create-schema", action="store_true", help="Create tables before running")
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/etl-<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, help="Previous results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed throughput drop vs baseline")
+    args = parser.parse_args()
+
+    args.scales = [int(s) for s in args.scales.split(",")]
+    args.paths = [p.strip() for p in args.paths.split(",")]
+    unknown = set(args.paths) - {"processor_loader", "worker"}
+    if unknown:
+        parser.error(f"Unknown paths: {', '.join(sorted(unknown))}")
+
+    results = asyncio.run(run(args))
+
+    output = args.output or Path(__file__).parent / "results" / f"etl-{datetime.utcnow():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
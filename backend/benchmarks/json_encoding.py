@@ -0,0 +1,156 @@
+"""
+JSON encoding microbenchmark
+FastAPI's default path (jsonable_encoder + JSONResponse) vs FastJSONResponse
+
+Usage:
+    python -m benchmarks.json_encoding [--items 100] [--number 2000]
+
+Payloads mirror /cnpj/{cnpj} (document with N sócios), /insights/filiais
+(N filiais) and /cnpj/search/razao-social (N results).
+"""
+
+import argparse
+import json
+import timeit
+from datetime import datetime
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core import responses
+from app.core.responses import FastJSONResponse
+
+
+def cnpj_payload(items: int) -> dict:
+    return {
+        "success": True,
+        "data": {
+            "cnpj": "12345678000190",
+            "razao_social": "EMPRESA DE TESTE LTDA",
+            "nome_fantasia": "TESTE",
+            "situacao_cadastral": "02",
+            "situacao_cadastral_descricao": "Ativa",
+            "endereco": {
+                "logradouro": "PAULISTA", "numero": "1000", "bairro": "BELA VISTA",
+                "municipio": "7107", "municipio_descricao": "SÃO PAULO", "uf": "SP", "cep": "01310100",
+            },
+            "atividade": {"cnae_principal": "6201501", "cnae_secundaria": "6202300,6203100"},
+            "socios": [
+                {
+                    "nome": f"SÓCIO NÚMERO {i}",
+                    "cpf_cnpj": f"***{i:06d}**",
+                    "qualificacao": "49",
+                    "qualificacao_descricao": "Sócio-Administrador",
+                    "data_entrada": "20200115",
+                }
+                for i in range(items)
+            ],
+            "capital_social": Decimal("150000.00"),
+            "porte": "05",
+            "natureza_juridica": "2062",
+        },
+        "metadata": {"cached": False, "timestamp": datetime(2026, 10, 1, 3, 0).isoformat()},
+    }
+
+
+def filiais_payload(items: int) -> dict:
+    return {
+        "cnpj_basico": "12345678",
+        "total_filiais": items,
+        "matriz": {"cnpj_completo": "12345678000190", "uf": "SP", "municipio": "7107"},
+        "filiais": [
+            {
+                "cnpj_completo": f"12345678{i:04d}00",
+                "cnpj_ordem": f"{i:04d}",
+                "nome_fantasia": f"FILIAL {i}",
+                "uf": "SP",
+                "municipio": "7107",
+                "municipio_descricao": "SÃO PAULO",
+                "situacao_cadastral": "02",
+                "situacao_cadastral_descricao": "Ativa",
+                "logradouro": "RUA DAS FLORES",
+                "numero": str(i),
+                "bairro": "CENTRO",
+                "cep": "01001000",
+            }
+            for i in range(items)
+        ],
+    }
+
+
+def search_payload(items: int) -> dict:
+    return {
+        "success": True,
+        "data": [
+            {
+                "cnpj_basico": f"{i:08d}",
+                "razao_social": f"EMPRESA {i} COMÉRCIO LTDA",
+                "natureza_juridica": "2062",
+                "natureza_juridica_descricao": "Sociedade Empresária Limitada",
+                "porte": "01",
+                "porte_descricao": "Micro Empresa",
+            }
+            for i in range(items)
+        ],
+        "metadata": {"query": "comercio", "results_count": items, "limit": items},
+    }
+
+
+def fastapi_default(content) -> bytes:
+    """What FastAPI does for a returned dict without response_model"""
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def fast(content) -> bytes:
+    return FastJSONResponse(content).body
+
+
+def fast_stdlib(content) -> bytes:
+    """FastJSONResponse when orjson is not installed"""
+    orjson, responses.orjson = responses.orjson, None
+    try:
+        return FastJSONResponse(content).body
+    finally:
+        responses.orjson = orjson
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON encoding microbenchmark")
+    parser.add_argument("--items", type=int, default=100, help="Nested items per payload")
+    parser.add_argument("--number", type=int, default=2000, help="Encodes per measurement")
+    args = parser.parse_args()
+
+    encoders = {
+        "fastapi_default": fastapi_default,
+        "fast_json_stdlib": fast_stdlib,
+        "fast_json": fast,
+    }
+    payloads = {
+        "cnpj": cnpj_payload(args.items),
+        "filiais": filiais_payload(args.items),
+        "search": search_payload(args.items),
+    }
+
+    result = {"orjson": responses.orjson is not None, "items": args.items, "payloads": {}}
+    for name, payload in payloads.items():
+        reference = json.loads(fastapi_default(payload))
+        rows = {}
+        for encoder_name, encoder in encoders.items():
+            body = encoder(payload)
+            assert json.loads(body) == reference, f"{encoder_name} output differs on {name}"
+            seconds = min(timeit.repeat(lambda: encoder(payload), number=args.number, repeat=3))
+            rows[encoder_name] = {
+                "us_per_response": round(seconds / args.number * 1e6, 1),
+                "bytes": len(body),
+            }
+        baseline = rows["fastapi_default"]["us_per_response"]
+        for row in rows.values():
+            row["speedup"] = round(baseline / row["us_per_response"], 1)
+        result["payloads"][name] = rows
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Synthetic Receita dataset
+Deterministic Receita Federal-format ZIPs for offline ETL benchmarks
+
+Writes one ZIP per entry of worker_v2.FILES_CONFIG (Empresas0.zip ...
+Simples.zip, Cnaes.zip ...), each holding a single latin-1, ';'-separated,
+fully quoted CSV named like the real one (K3241.K03200Y0.D51108.EMPRECSV).
+The same --scale and --seed always produce byte-identical files.
+
+Usage:
+    python -m benchmarks.receita_dataset /tmp/receita --scale 100000
+"""
+
+import argparse
+import csv
+import io
+import json
+import random
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List
+
+from app.etl.worker_v2 import FILES_CONFIG
+
+ZIP_DATE = (1980, 1, 1, 0, 0, 0)  # Fixed timestamps keep the ZIPs reproducible
+
+UFS = ["SP", "RJ", "MG", "RS", "PR", "BA", "SC", "GO", "PE", "CE", "DF", "ES", "AM", "PA", "MT"]
+TIPOS_LOGRADOURO = ["RUA", "AVENIDA", "TRAVESSA", "ALAMEDA", "RODOVIA", "PRACA", ""]
+PALAVRAS = [
+    "COMERCIO", "SERVICOS", "INDUSTRIA", "TECNOLOGIA", "ALIMENTOS", "CONSTRUCOES",
+    "TRANSPORTES", "CONSULTORIA", "DISTRIBUIDORA", "AGROPECUARIA", "SAUDE", "EDUCACAO",
+    "SÃO JOÃO", "AÇÚCAR", "CONCEIÇÃO", "GUARANÁ", "PÃO", "JOSÉ", "IRMÃOS",
+]
+SUFIXOS = ["LTDA", "S.A.", "EIRELI", "ME", "EPP", ""]
+NOMES = ["MARIA", "JOSE", "ANA", "JOAO", "ANTONIO", "FRANCISCA", "CARLOS", "PAULO", "LUCIA", "JOSÉ", "CONCEIÇÃO"]
+SOBRENOMES = ["SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "LIMA", "PEREIRA", "COSTA", "D'ÁVILA", "GONÇALVES"]
+NATUREZAS = ["2062", "2135", "2305", "2240", "1015", "3999", "2046", "2143"]
+QUALIFICACOES = ["05", "10", "16", "22", "28", "49", "50", "65"]
+PORTES = ["00", "01", "03", "05"]
+SITUACOES = ["01", "02", "03", "04", "08"]
+MOTIVOS = ["00", "01", "21", "63", "71", "73"]
+
+
+def _edge_text(rng: random.Random, text: str) -> str:
+    """Occasionally inject the quirks seen in real files"""
+    roll = rng.random()
+    if roll < 0.02:
+        return f'{text} "FILIAL"'  # Embedded quotes
+    if roll < 0.03:
+        return f"{text}; UNIDADE 2"  # Embedded delimiter
+    if roll < 0.04:
+        return f"{text}  "  # Trailing spaces
+    if roll < 0.045:
+        return f"{text}\\CENTRO"  # Backslash (breaks naive COPY text format)
+    return text
+
+
+def _date(rng: random.Random) -> str:
+    """YYYYMMDD, with the '0' / empty placeholders found in the real data"""
+    roll = rng.random()
+    if roll < 0.03:
+        return "0"
+    if roll < 0.06:
+        return ""
+    return f"{rng.randint(1950, 2025)}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}"
+
+
+def _digits(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice("0123456789") for _ in range(length))
+
+
+def _razao(rng: random.Random) -> str:
+    words = " ".join(rng.sample(PALAVRAS, rng.randint(1, 3)))
+    return _edge_text(rng, f"{words} {rng.choice(SUFIXOS)}".strip())
+
+
+def _pessoa(rng: random.Random) -> str:
+    return f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}"
+
+
+def lookup_rows(name: str, rng: random.Random) -> List[List[str]]:
+    """Auxiliary tables (codigo, descricao)"""
+    if name == "cnaes":
+        return [
+            [f"{code:07d}", _edge_text(rng, f"ATIVIDADE {code} - {' '.join(rng.sample(PALAVRAS, 2))}")]
+            for code in sorted(rng.sample(range(111301, 9900000), 1300))
+        ]
+    if name == "municipios":
+        return [[f"{code:04d}", f"MUNICÍPIO {code}"] for code in range(1, 5571)]
+    if name == "naturezas":
+        return [[code, f"NATUREZA JURÍDICA {code}"] for code in NATUREZAS]
+    if name == "qualificacoes":
+        return [[code, f"QUALIFICAÇÃO {code}"] for code in ["00"] + QUALIFICACOES]
+    if name == "motivos":
+        return [[code, f"MOTIVO {code}"] for code in MOTIVOS]
+    if name == "paises":
+        return [["105", "BRASIL"], ["249", "ESTADOS UNIDOS"], ["607", "PORTUGAL"], ["063", "ARGENTINA"]]
+    raise ValueError(f"Unknown lookup table {name}")
+
+
+class DatasetBuilder:
+    """
+    Row generators for the main tables
+
+    Companies are numbered 0..scale-1 and spread over the parts by
+    cnpj_basico, like the real split; every table is generated from its
+    own seeded stream so parts can be written independently.
+    """
+
+    def __init__(self, scale: int, seed: int, parts: int):
+        self.scale = scale
+        self.seed = seed
+        self.parts = parts
+        self.cnaes = [row[0] for row in lookup_rows("cnaes", random.Random(seed))]
+
+    def rng(self, table: str, part: int) -> random.Random:
+        return random.Random(f"{self.seed}:{table}:{part}")
+
+    def companies(self, part: int) -> Iterator[int]:
+        return iter(range(part, self.scale, self.parts))
+
+    @staticmethod
+    def cnpj_basico(company: int) -> str:
+        return f"{company * 7919 % 100000000:08d}"
+
+    def empresas(self, part: int) -> Iterator[List[str]]:
+        rng = self.rng("empresas", part)
+        for company in self.companies(part):
+            yield [
+                self.cnpj_basico(company),
+                _razao(rng),
+                rng.choice(NATUREZAS),
+                rng.choice(QUALIFICACOES),
+                f"{rng.randint(0, 5000000)},{rng.randint(0, 99):02d}",
+                rng.choice(PORTES),
+                "" if rng.random() < 0.99 else "UNIÃO",
+            ]
+
+    def estabelecimentos(self, part: int) -> Iterator[List[str]]:
+        rng = self.rng("estabelecimentos", part)
+        for company in self.companies(part):
+            basico = self.cnpj_basico(company)
+            branches = 1 + (rng.randint(1, 40) if rng.random() < 0.05 else 0)
+            for ordem in range(1, branches + 1):
+                exterior = rng.random() < 0.002
+                secundarias = ",".join(rng.sample(self.cnaes, rng.randint(0, 6)))
+                yield [
+                    basico,
+                    f"{ordem:04d}",
+                    _digits(rng, 2),
+                    "1" if ordem == 1 else "2",
+                    _edge_text(rng, rng.choice(PALAVRAS)) if rng.random() < 0.6 else "",
+                    rng.choice(SITUACOES),
+                    _date(rng),
+                    rng.choice(MOTIVOS),
+                    "MIAMI" if exterior else "",
+                    "249" if exterior else "",
+                    _date(rng),
+                    rng.choice(self.cnaes),
+                    secundarias,
+                    rng.choice(TIPOS_LOGRADOURO),
+                    _edge_text(rng, f"{rng.choice(PALAVRAS)} {rng.choice(SOBRENOMES)}"),
+                    str(rng.randint(1, 9999)) if rng.random() < 0.9 else "S/N",
+                    "" if rng.random() < 0.7 else f"SALA {rng.randint(1, 999)}",
+                    rng.choice(PALAVRAS),
+                    _digits(rng, 8),
+                    "EX" if exterior else rng.choice(UFS),
+                    f"{rng.randint(1, 5570):04d}",
+                    _digits(rng, 2),
+                    _digits(rng, 8),
+                    "" if rng.random() < 0.8 else _digits(rng, 2),
+                    "" if rng.random() < 0.8 else _digits(rng, 8),
+                    "",
+                    "",
+                    "" if rng.random() < 0.4 else f"contato{ordem}@empresa{basico}.com.br",
+                    "",
+                    "",
+                ]
+
+    def socios(self, part: int) -> Iterator[List[str]]:
+        rng = self.rng("socios", part)
+        for company in self.companies(part):
+            for _ in range(rng.choice([0, 1, 1, 2, 2, 3, 5])):
+                tipo = rng.choice("1222223")
+                yield [
+                    self.cnpj_basico(company),
+                    tipo,
+                    _razao(rng) if tipo == "1" else _pessoa(rng),
+                    _digits(rng, 14) if tipo == "1" else f"***{_digits(rng, 6)}**",
+                    rng.choice(QUALIFICACOES),
+                    _date(rng),
+                    "607" if tipo == "3" else "",
+                    "***000000**",
+                    "",
+                    "00",
+                    str(rng.randint(0, 9)),
+                ]
+
+    def simples(self, part: int) -> Iterator[List[str]]:
+        rng = self.rng("simples", part)
+        for company in range(self.scale):
+            if rng.random() >= 0.4:
+                continue
+            mei = rng.random() < 0.3
+            yield [
+                self.cnpj_basico(company),
+                "S" if rng.random() < 0.8 else "N",
+                _date(rng) or "00000000",
+                "00000000",
+                "S" if mei else "N",
+                _date(rng) if mei else "00000000",
+                "00000000",
+            ]
+
+
+def write_zip(zip_path: Path, inner_name: str, rows: Iterable[List[str]]) -> Dict[str, int]:
+    """
+    One latin-1, ';'-separated, fully quoted CSV inside a deflated ZIP
+
+    Rows are streamed into the archive, so memory stays flat at any scale.
+    """
+    info = zipfile.ZipInfo(inner_name, date_time=ZIP_DATE)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    count = 0
+    with zipfile.ZipFile(zip_path, "w") as archive:
+        # force_zip64: the size is unknown until the stream is closed
+        with archive.open(info, "w", force_zip64=True) as raw:
+            with io.TextIOWrapper(raw, encoding="latin-1", newline="") as text_stream:
+                writer = csv.writer(text_stream, delimiter=";", quotechar='"', quoting=csv.QUOTE_ALL, lineterminator="\n")
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+
+    # file_size: uncompressed bytes counted by the ZIP writer as rows were streamed
+    return {"rows": count, "csv_bytes": info.file_size, "zip_bytes": zip_path.stat().st_size}
+
+
+def generate(output_dir: Path, scale: int = 10000, seed: int = 42) -> dict:
+    """
+    Write the full dataset
+
+    Args:
+        output_dir: Directory for the ZIPs (created if missing)
+        scale: Number of companies (estabelecimentos ~1.1x, sócios ~2x, simples ~0.4x)
+        seed: Random seed
+
+    Returns:
+        Manifest {zip name: {table, csv, rows, csv_bytes, zip_bytes}}
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    parts = len(FILES_CONFIG["empresas"])
+    builder = DatasetBuilder(scale, seed, parts)
+
+    tables: Dict[str, Callable[[int], Iterator[List[str]]]] = {
+        "empresas": builder.empresas,
+        "estabelecimentos": builder.estabelecimentos,
+        "socios": builder.socios,
+        "simples": builder.simples,
+    }
+
+    manifest = {"scale": scale, "seed": seed, "files": {}}
+    for group, files in FILES_CONFIG.items():
+        for part, (zip_file, csv_name, table_name, _columns) in enumerate(files):
+            if group == "auxiliares":
+                rows = lookup_rows(table_name, random.Random(seed))
+            else:
+                rows = tables[table_name](part)
+
+            stats = write_zip(output_dir / zip_file, csv_name, rows)
+            manifest["files"][zip_file] = {"table": table_name, "csv": csv_name, **stats}
+
+    (output_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Receita dataset")
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument("--scale", type=int, default=10000, help="Number of companies")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    manifest = generate(args.output_dir, args.scale, args.seed)
+    totals: Dict[str, int] = {}
+    for entry in manifest["files"].values():
+        totals[entry["table"]] = totals.get(entry["table"], 0) + entry["rows"]
+    print(json.dumps({"output_dir": str(args.output_dir), "rows": totals}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+ETL event stream tests
+Snapshot merging, log replay by Last-Event-ID and SSE framing, without a database
+
+Events are fed to ETLEventStream the way the LISTEN callback does, as
+NOTIFY payloads built with encode().
+"""
+
+import asyncio
+import logging
+
+import pytest
+
+try:
+    from app.etl.events import ETLEventStream, LogPublisher, encode
+except Exception as e:  # Settings need the full environment (SECRET_KEY, DATABASE_URL, ...)
+    pytest.skip(f"App not importable: {e}", allow_module_level=True)
+
+
+def notify(stream: ETLEventStream, kind: str, data, event_id=None):
+    stream._on_notify(None, 0, "etl_events", encode(kind, data, event_id))
+
+
+def feed(*streams: ETLEventStream):
+    """Same NOTIFY sequence to every stream (one per uvicorn worker)"""
+    for stream in streams:
+        notify(stream, "progress", {"job_id": "etl_1", "status": "running", "files_processed": 0})
+        notify(stream, "log", ["a1", "a2"], 1_000_100)
+        notify(stream, "progress", {"job_id": "etl_1", "files_processed": 1})
+        notify(stream, "log", ["b1"], 1_000_200)
+        notify(stream, "log", ["c1"], 1_000_300)
+
+
+def test_progress_deltas_merge_and_new_job_resets():
+    stream = ETLEventStream()
+    feed(stream)
+
+    assert stream.progress == {"job_id": "etl_1", "status": "running", "files_processed": 1}
+
+    notify(stream, "progress", {"job_id": "etl_2", "status": "queued"})
+    assert stream.progress == {"job_id": "etl_2", "status": "queued"}
+
+
+def test_new_client_gets_all_buffered_logs_then_snapshot():
+    stream = ETLEventStream()
+    feed(stream)
+
+    backlog = stream.backlog()
+
+    assert [e[2] for e in backlog[:-1]] == [["a1", "a2"], ["b1"], ["c1"]]
+    assert backlog[-1][1] == "progress"
+    assert backlog[-1][0] == 1_000_300  # Snapshot carries the last log id
+
+
+def test_last_event_id_resumes_on_another_worker():
+    worker_a, worker_b = ETLEventStream(), ETLEventStream()
+    feed(worker_a, worker_b)
+    notify(worker_b, "log", ["d1"], 1_000_400)  # Worker A has not received it yet
+
+    # Client saw up to b1 on worker A, reconnects to worker B
+    seen = next(e[0] for e in worker_a.backlog() if e[2] == ["b1"])
+    backlog = worker_b.backlog(seen)
+
+    assert [e[2] for e in backlog if e[1] == "log"] == [["c1"], ["d1"]]
+
+
+def test_last_event_id_of_a_snapshot_skips_logs_already_sent():
+    stream = ETLEventStream()
+    feed(stream)
+    snapshot_id = stream.backlog()[-1][0]
+
+    backlog = stream.backlog(snapshot_id)
+
+    assert [e[1] for e in backlog] == ["progress"]
+
+
+def test_logs_evicted_from_the_ring_are_not_replayed():
+    stream = ETLEventStream()
+    stream.events = type(stream.events)(maxlen=2)
+    feed(stream)
+
+    backlog = stream.backlog(1_000_000)
+
+    assert [e[2] for e in backlog if e[1] == "log"] == [["b1"], ["c1"]]
+    assert list(stream.log_lines) == ["a1", "a2", "b1", "c1"]
+
+
+def test_sse_framing_and_live_fan_out():
+    stream = ETLEventStream()
+    feed(stream)
+
+    async def scenario():
+        sse = stream.sse(1_000_200)
+        chunks = [await sse.__anext__() for _ in range(3)]
+        notify(stream, "log", ["live"], 1_000_500)
+        chunks.append(await sse.__anext__())
+        await sse.aclose()
+        return chunks
+
+    retry, log, snapshot, live = asyncio.run(scenario())
+
+    assert retry.startswith("retry: ")
+    assert log == 'id: 1000300\nevent: log\ndata: ["c1"]\n\n'
+    assert snapshot.startswith("id: 1000300\nevent: progress\n")
+    assert live == 'id: 1000500\nevent: log\ndata: ["live"]\n\n'
+    assert not stream.subscribers
+
+
+def test_log_publisher_ids_strictly_increase():
+    async def scenario():
+        publisher = LogPublisher(logging.INFO)
+        return [publisher.next_id() for _ in range(1000)]
+
+    ids = asyncio.run(scenario())
+
+    assert all(later > earlier for earlier, later in zip(ids, ids[1:]))
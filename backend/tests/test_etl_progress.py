@@ -0,0 +1,193 @@
+"""
+ProgressReporter tests
+Flush batching, byte-based rates/ETA and pause accounting, without a database
+
+The session factory and publish() are replaced by fakes that record each
+flush; time comes from a manual clock.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+try:
+    from app.etl import progress
+    from app.etl.progress import ProgressReporter
+except Exception as e:  # Settings need the full environment (SECRET_KEY, DATABASE_URL, ...)
+    pytest.skip(f"App not importable: {e}", allow_module_level=True)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class FakeSession:
+    def __init__(self, fail: bool):
+        self.fail = fail
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        if self.fail:
+            raise ConnectionError("database down")
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def env(monkeypatch):
+    """Manual clock; every successful flush appends its published snapshot"""
+    clock = Clock()
+    state = SimpleNamespace(clock=clock, flushes=[], fail=False)
+
+    async def publish(db, kind, data):
+        state.flushes.append(data)
+
+    monkeypatch.setattr(progress, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(progress, "async_session", lambda: FakeSession(state.fail))
+    monkeypatch.setattr(progress, "publish", publish)
+    return state
+
+
+def test_updates_within_the_interval_are_batched(env):
+    reporter = ProgressReporter("job", flush_seconds=2.0)
+
+    async def scenario():
+        await reporter.transition(status="running")
+        for i in range(10):
+            await reporter.update(current_file=f"Empresas{i}.zip")
+        assert len(env.flushes) == 1
+
+        env.clock.advance(2.0)
+        await reporter.update()
+
+    asyncio.run(scenario())
+
+    assert len(env.flushes) == 2
+    assert env.flushes[-1]["current_file"] == "Empresas9.zip"
+    assert env.flushes[-1]["status"] == "running"  # Earlier fields stay in the snapshot
+
+
+def test_transitions_flush_immediately(env):
+    reporter = ProgressReporter("job", flush_seconds=60.0)
+
+    async def scenario():
+        await reporter.transition(status="running")
+        await reporter.transition(current_step="empresas")
+        await reporter.transition(status="paused")
+
+    asyncio.run(scenario())
+
+    assert [f.get("status") for f in env.flushes] == ["running", "running", "paused"]
+    assert env.flushes[1]["current_step"] == "empresas"
+
+
+def test_eta_is_based_on_bytes(env):
+    reporter = ProgressReporter("job")
+    reporter.restore(files_total=2, bytes_total=1000)
+
+    env.clock.advance(10)
+    reporter.file_loaded(records=500, zip_bytes=100)  # Small file first
+    metrics = reporter.metrics()
+
+    assert metrics["bytes_per_second"] == 10.0
+    assert metrics["records_per_second"] == 50.0
+    assert metrics["progress_percent"] == 10.0  # Half the files, a tenth of the bytes
+    assert metrics["estimated_remaining_seconds"] == 90
+
+
+def test_rates_only_count_the_current_run(env):
+    reporter = ProgressReporter("job")
+    reporter.restore(
+        files_total=3, bytes_total=300, files_processed=1,
+        records_imported=1000, bytes_processed=100, elapsed_seconds=500
+    )
+
+    env.clock.advance(20)
+    reporter.file_loaded(records=200, zip_bytes=100)
+    metrics = reporter.metrics()
+
+    assert metrics["bytes_per_second"] == 5.0
+    assert metrics["records_imported"] == 1200
+    assert metrics["elapsed_seconds"] == 520
+    assert metrics["estimated_remaining_seconds"] == 20
+
+
+def test_paused_time_is_excluded(env):
+    reporter = ProgressReporter("job")
+    reporter.restore(files_total=2, bytes_total=200)
+
+    env.clock.advance(10)
+    reporter.pause()
+    env.clock.advance(3600)
+    assert reporter.elapsed_seconds == 10  # Clock stopped while paused
+    reporter.resume()
+    env.clock.advance(10)
+    reporter.file_loaded(records=100, zip_bytes=100)
+    metrics = reporter.metrics()
+
+    assert metrics["elapsed_seconds"] == 20
+    assert metrics["bytes_per_second"] == 5.0
+    assert metrics["estimated_remaining_seconds"] == 20
+
+
+def test_failed_flush_keeps_pending_changes(env):
+    reporter = ProgressReporter("job", flush_seconds=0.0)
+
+    async def scenario():
+        env.fail = True
+        await reporter.update(current_file="Socios0.zip")  # Logged, not raised
+        env.fail = False
+        await reporter.update(current_table="socios")
+
+    asyncio.run(scenario())
+
+    assert len(env.flushes) == 1
+    assert env.flushes[0]["current_file"] == "Socios0.zip"
+    assert env.flushes[0]["current_table"] == "socios"
+
+
+def test_failed_flush_waits_for_the_interval(env):
+    reporter = ProgressReporter("job", flush_seconds=2.0)
+
+    async def scenario():
+        env.fail = True
+        await reporter.update(current_file="Socios0.zip")
+        env.fail = False
+        await reporter.update()
+        assert env.flushes == []
+
+        env.clock.advance(2.0)
+        await reporter.update()
+
+    asyncio.run(scenario())
+
+    assert [f["current_file"] for f in env.flushes] == ["Socios0.zip"]
+
+
+def test_only_terminal_transitions_raise(env):
+    reporter = ProgressReporter("job")
+    env.fail = True
+
+    async def scenario():
+        await reporter.transition(current_step="socios")
+        with pytest.raises(ConnectionError):
+            await reporter.transition(status="error", error_message="psql failed")
+
+    asyncio.run(scenario())
+
+    assert reporter._pending["current_step"] == "socios"
+    assert reporter._pending["status"] == "error"
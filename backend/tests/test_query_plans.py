@@ -0,0 +1,357 @@
+"""
+Query plan regression tests
+EXPLAIN every query issued by the CNPJ and insights endpoints against a seeded database
+
+Each endpoint is called directly; the SQL it sends is captured with a
+before_cursor_execute hook (the same event app.db.instrumentation uses) and
+re-planned with EXPLAIN (FORMAT JSON) under enable_seqscan = off, so the
+planner picks an index whenever a usable one exists, whatever the size of
+the seeded data. A query passes when:
+
+    - no Seq Scan touches a large table
+    - no Index Scan on a large table walks the whole index (no Index Cond)
+    - the intended index is used, matched by table, leading column and
+      access method (names differ between the models, loader and
+      scripts/optimize_database.py)
+
+Needs DATABASE_URL pointing at a database loaded with data (e.g.
+`python -m benchmarks.api_load --seed-scale 10000 --create-schema ...`)
+and scripts/optimize_database.py applied for the trigram searches;
+skipped when the database is unreachable or empty.
+"""
+
+import asyncio
+import json
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import pytest
+
+try:
+    from fastapi import HTTPException, Response
+    from sqlalchemy import event, text
+    from sqlalchemy.exc import DBAPIError
+    from sqlalchemy.orm import Session, sessionmaker
+
+    from app.api.v1.endpoints import cnpj as cnpj_endpoints
+    from app.api.v1.endpoints import cnpj_insights
+    from app.db.base import engine
+    from app.db.session import async_engine, async_session
+    from app.models.documento import CNPJDocumento
+except Exception as e:  # Settings need the full environment (SECRET_KEY, DATABASE_URL, ...)
+    pytest.skip(f"App not importable: {e}", allow_module_level=True)
+
+LARGE_TABLES = {"empresas", "estabelecimentos", "socios", "simples", "cnpj_documentos"}
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+class IndexInfo(NamedTuple):
+    table: str
+    column: Optional[str]  # Leading column (None for expression indexes)
+    method: str
+
+
+class Expected(NamedTuple):
+    """An index the plan must use"""
+    table: str
+    column: str
+    method: Optional[str] = None
+
+
+@dataclass
+class Captured:
+    statement: str
+    parameters: object
+    is_async: bool
+
+
+@dataclass
+class SeedKeys:
+    documento_cnpj: Optional[str]
+    cnpj: str
+    cnpj_basico: str
+    cpf_cnpj_socio: Optional[str]
+    nome_socio: Optional[str]
+    razao_termo: str
+    cnae: str
+    uf: str
+
+
+class DocumentMissSession(Session):
+    """Sync session that never finds a cnpj_documentos row (fallback path)"""
+
+    def get(self, entity, ident, **kwargs):
+        if entity is CNPJDocumento:
+            return None
+        return super().get(entity, ident, **kwargs)
+
+
+@pytest.fixture(scope="module")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.run_until_complete(async_engine.dispose())
+    loop.close()
+
+
+@pytest.fixture(scope="module")
+def indexes() -> Dict[str, IndexInfo]:
+    """Index name -> (table, leading column, access method)"""
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(text("""
+                SELECT i.relname, t.relname, a.attname, am.amname
+                FROM pg_index x
+                JOIN pg_class i ON i.oid = x.indexrelid
+                JOIN pg_class t ON t.oid = x.indrelid
+                JOIN pg_am am ON am.oid = i.relam
+                JOIN pg_namespace n ON n.oid = t.relnamespace
+                LEFT JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = x.indkey[0]
+                WHERE n.nspname = current_schema()
+            """)).all()
+    except DBAPIError as e:
+        pytest.skip(f"Database unavailable: {e}")
+    return {name: IndexInfo(table, column, method) for name, table, column, method in rows}
+
+
+@pytest.fixture(scope="module")
+def keys(indexes) -> SeedKeys:
+    """Lookup keys drawn from the seeded data"""
+    with engine.connect() as conn:
+        def scalar(sql: str):
+            try:
+                return conn.execute(text(sql)).scalar()
+            except DBAPIError:
+                conn.rollback()
+                return None
+
+        cnpj = scalar("SELECT cnpj_completo FROM estabelecimentos WHERE identificador_matriz_filial = '1' LIMIT 1")
+        if cnpj is None:
+            pytest.skip("No estabelecimentos loaded")
+
+        cnae, uf = conn.execute(text(
+            "SELECT cnae_fiscal_principal, uf FROM estabelecimentos "
+            "WHERE cnae_fiscal_principal IS NOT NULL AND uf IS NOT NULL LIMIT 1"
+        )).one()
+        razao = scalar("SELECT razao_social FROM empresas WHERE length(razao_social) >= 3 LIMIT 1")
+
+        return SeedKeys(
+            documento_cnpj=scalar("SELECT cnpj_completo FROM cnpj_documentos LIMIT 1"),
+            cnpj=cnpj,
+            cnpj_basico=cnpj[:8],
+            cpf_cnpj_socio=scalar("SELECT cpf_cnpj_socio FROM socios WHERE length(cpf_cnpj_socio) IN (11, 14) LIMIT 1"),
+            nome_socio=scalar("SELECT split_part(nome_socio, ' ', 1) FROM socios WHERE length(nome_socio) >= 3 LIMIT 1"),
+            razao_termo=razao.split()[0] if razao and len(razao.split()[0]) >= 3 else (razao or "LTDA"),
+            cnae=cnae,
+            uf=uf,
+        )
+
+
+@contextmanager
+def capture_queries():
+    """Record every SELECT sent through the sync and async engines"""
+    captured: List[Captured] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip()[:6].upper() == "SELECT":
+            captured.append(Captured(statement, parameters, conn.dialect.is_async))
+
+    targets = [engine, async_engine.sync_engine]
+    for target in targets:
+        event.listen(target, "before_cursor_execute", record)
+    try:
+        yield captured
+    finally:
+        for target in targets:
+            event.remove(target, "before_cursor_execute", record)
+
+
+def explain(loop, query: Captured) -> dict:
+    """Plan of a captured query with sequential scans disabled"""
+    sql = f"EXPLAIN (FORMAT JSON) {query.statement}"
+
+    if query.is_async:
+        async def run():
+            async with async_engine.connect() as conn:
+                await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+                result = await conn.exec_driver_sql(sql, query.parameters)
+                plan = result.scalar()
+                await conn.rollback()
+                return plan
+        plan = loop.run_until_complete(run())
+    else:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            plan = conn.exec_driver_sql(sql, query.parameters).scalar()
+            conn.rollback()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def walk(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk(child)
+
+
+def plan_problems(plan: dict, indexes: Dict[str, IndexInfo], expected: List[Expected]) -> List[str]:
+    """Violations of the plan rules (empty when the plan is acceptable)"""
+    problems = []
+    used: List[Tuple[IndexInfo, str]] = []
+
+    for node in walk(plan):
+        node_type = node["Node Type"]
+        if node_type == "Seq Scan" and node.get("Relation Name") in LARGE_TABLES:
+            problems.append(f"Seq Scan on {node['Relation Name']}")
+        if node_type not in INDEX_SCANS:
+            continue
+
+        info = indexes.get(node["Index Name"])
+        if info is None:
+            continue
+        if "Index Cond" not in node:
+            if info.table in LARGE_TABLES:
+                problems.append(f"{node_type} on {node['Index Name']} without Index Cond (full index walk)")
+            continue
+        used.append((info, node["Index Name"]))
+
+    for want in expected:
+        if not any(
+            info.table == want.table and info.column == want.column
+            and (want.method is None or info.method == want.method)
+            for info, _name in used
+        ):
+            method = f" using {want.method}" if want.method else ""
+            problems.append(f"expected an index on {want.table}({want.column}){method}")
+
+    return problems
+
+
+def assert_plans(loop, indexes, captured: List[Captured], expected: List[List[Expected]]):
+    """One expectation list per captured query, in execution order"""
+    assert len(captured) == len(expected), (
+        f"expected {len(expected)} queries, captured {len(captured)}:\n"
+        + "\n".join(q.statement for q in captured)
+    )
+
+    failures = []
+    for query, wanted in zip(captured, expected):
+        plan = explain(loop, query)
+        problems = plan_problems(plan, indexes, wanted)
+        if problems:
+            failures.append(
+                f"{' '.join(query.statement.split())}\n  "
+                + "\n  ".join(problems)
+                + f"\n  plan: {json.dumps(plan, indent=1)}"
+            )
+
+    assert not failures, "Query plan regressions:\n\n" + "\n\n".join(failures)
+
+
+def call(loop, endpoint, *args, **kwargs):
+    """Run an endpoint coroutine; expected 404s are fine, the queries are what matter"""
+    try:
+        return loop.run_until_complete(endpoint(*args, **kwargs))
+    except HTTPException as e:
+        if e.status_code != 404:
+            raise
+
+
+def call_async(loop, endpoint, *args, **kwargs):
+    async def run():
+        async with async_session() as db:
+            try:
+                return await endpoint(*args, db=db, **kwargs)
+            except HTTPException as e:
+                if e.status_code != 404:
+                    raise
+    return loop.run_until_complete(run())
+
+
+ESTAB_CNPJ = Expected("estabelecimentos", "cnpj_completo")
+ESTAB_BASICO = Expected("estabelecimentos", "cnpj_basico")
+EMPRESA_BASICO = Expected("empresas", "cnpj_basico")
+SOCIO_BASICO = Expected("socios", "cnpj_basico")
+SOCIO_CPF = Expected("socios", "cpf_cnpj_socio")
+
+
+# cnpj.py
+
+def test_get_cnpj_documento(loop, indexes, keys):
+    if keys.documento_cnpj is None:
+        pytest.skip("cnpj_documentos not built")
+
+    with Session(bind=engine) as db, capture_queries() as captured:
+        call(loop, cnpj_endpoints.get_cnpj, keys.documento_cnpj, Response(), db=db)
+
+    assert_plans(loop, indexes, captured, [[Expected("cnpj_documentos", "cnpj_completo")]])
+
+
+def test_get_cnpj_fallback(loop, indexes, keys):
+    with sessionmaker(bind=engine, class_=DocumentMissSession)() as db, capture_queries() as captured:
+        call(loop, cnpj_endpoints.get_cnpj, keys.cnpj, Response(), db=db)
+
+    assert_plans(loop, indexes, captured, [[ESTAB_CNPJ], [EMPRESA_BASICO], [SOCIO_BASICO]])
+
+
+def test_search_razao_social(loop, indexes, keys):
+    with Session(bind=engine) as db, capture_queries() as captured:
+        call(loop, cnpj_endpoints.search_by_razao_social, keys.razao_termo, Response(), db=db)
+
+    # Trigram GIN index from scripts/optimize_database.py
+    assert_plans(loop, indexes, captured, [[Expected("empresas", "razao_social", "gin")]])
+
+
+# cnpj_insights.py
+
+def test_filiais(loop, indexes, keys):
+    with capture_queries() as captured:
+        call_async(loop, cnpj_insights.get_filiais, keys.cnpj_basico, Response())
+
+    assert_plans(loop, indexes, captured, [[ESTAB_BASICO], [ESTAB_BASICO], [ESTAB_BASICO]])
+
+
+def test_socio_empresas(loop, indexes, keys):
+    if keys.cpf_cnpj_socio is None:
+        pytest.skip("No socios with CPF/CNPJ loaded")
+
+    with capture_queries() as captured:
+        call_async(loop, cnpj_insights.get_empresas_socio, keys.cpf_cnpj_socio, Response())
+
+    assert_plans(loop, indexes, captured, [
+        [SOCIO_CPF],
+        [SOCIO_CPF, EMPRESA_BASICO, ESTAB_BASICO],
+    ])
+
+
+def test_socio_por_nome(loop, indexes, keys):
+    if keys.nome_socio is None:
+        pytest.skip("No socios loaded")
+
+    with capture_queries() as captured:
+        call_async(loop, cnpj_insights.get_empresas_socio_por_nome, keys.nome_socio, Response())
+
+    # Trigram GIN index from scripts/optimize_database.py
+    assert_plans(loop, indexes, captured, [
+        [Expected("socios", "nome_socio", "gin"), EMPRESA_BASICO, ESTAB_BASICO],
+    ])
+
+
+def test_cnae_principal_e_secundarios(loop, indexes, keys):
+    with capture_queries() as captured:
+        call_async(loop, cnpj_insights.get_estabelecimentos_por_cnae, keys.cnae, Response(), uf=keys.uf)
+
+    assert_plans(loop, indexes, captured, [[Expected("estabelecimentos", "cnaes", "gin")]])
+
+
+def test_cnae_somente_principal(loop, indexes, keys):
+    with capture_queries() as captured:
+        call_async(
+            loop, cnpj_insights.get_estabelecimentos_por_cnae, keys.cnae, Response(),
+            somente_principal=True,
+        )
+
+    assert_plans(loop, indexes, captured, [[Expected("estabelecimentos", "cnae_fiscal_principal")]])
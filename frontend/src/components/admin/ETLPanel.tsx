@@ -5,12 +5,18 @@
  * Admin interface for managing CNPJ data imports
  */
 
-import { useState } from 'react'
+import { useEffect, useRef, useState } from 'react'
 import { useETL } from '@/lib/hooks/useETL'
 
 export function ETLPanel() {
-  const { status, validation, loading, error, validateETL, startETL, refresh } = useETL()
+  const { status, validation, loading, error, logs, validateETL, startETL, refresh } = useETL()
   const [showConfirm, setShowConfirm] = useState(false)
+  const logsEndRef = useRef<HTMLDivElement>(null)
+
+  // Follow new log lines
+  useEffect(() => {
+    logsEndRef.current?.scrollIntoView({ block: 'nearest' })
+  }, [logs])
 
   const handleStartClick = async () => {
     // Validate first
@@ -78,7 +84,10 @@ export function ETLPanel() {
               <p className="text-sm text-gray-600">Status</p>
               <p className="text-2xl font-bold">
                 {status?.status === 'idle' && '⏸️ Parado'}
+                {status?.status === 'queued' && '⏳ Na fila'}
                 {status?.status === 'running' && '🔄 Rodando'}
+                {status?.status === 'paused' && '⏸️ Pausado'}
+                {status?.status === 'cancelled' && '🛑 Cancelado'}
                 {status?.status === 'completed' && '✅ Concluído'}
                 {status?.status === 'error' && '❌ Erro'}
               </p>
@@ -123,6 +132,18 @@ export function ETLPanel() {
               </p>
             </div>
             
+            {status?.bytes_per_second && status.bytes_per_second > 0 && (
+              <div>
+                <p className="text-sm text-gray-600">Velocidade</p>
+                <p className="text-lg font-semibold">
+                  {(status.bytes_per_second / 1024 ** 2).toFixed(1)} MB/s
+                </p>
+                <p className="text-sm text-gray-500">
+                  {Math.round(status.records_per_second || 0).toLocaleString('pt-BR')} registros/s
+                </p>
+              </div>
+            )}
+            
             <div>
               <p className="text-sm text-gray-600">Espaço Livre</p>
               <p className="text-lg font-semibold">
@@ -196,6 +217,19 @@ export function ETLPanel() {
           )}
         </div>
 
+        {/* Live Logs */}
+        {logs.length > 0 && (
+          <div className="mt-6">
+            <p className="text-sm text-gray-600 mb-2">Logs</p>
+            <div className="h-64 overflow-y-auto p-3 bg-gray-900 text-gray-100 rounded-lg font-mono text-xs">
+              {logs.map((line, i) => (
+                <div key={i} className="whitespace-pre-wrap">{line}</div>
+              ))}
+              <div ref={logsEndRef} />
+            </div>
+          </div>
+        )}
+
         {/* Job Info */}
         {status?.job_id && status.job_id !== 'none' && (
           <div className="mt-6 p-4 bg-gray-50 rounded-lg">
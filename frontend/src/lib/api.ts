@@ -57,6 +57,10 @@ export interface ETLStatusResponse {
   files_processed: number
   files_total: number
   records_imported: number
+  bytes_total?: number
+  bytes_processed?: number
+  records_per_second?: number
+  bytes_per_second?: number
   disk_free_gb?: number
   disk_used_gb?: number
   started_at?: string
@@ -78,6 +82,10 @@ export interface ETLLogsResponse {
   total_lines: number
 }
 
+export type ETLStreamEvent =
+  | { type: 'progress'; data: Partial<ETLStatusResponse> & { job_id: string } }
+  | { type: 'log'; data: string[] }
+
 class ApiClient {
   private baseURL: string
 
@@ -159,6 +167,63 @@ class ApiClient {
   async getETLLogs(lines: number = 100): Promise<ETLLogsResponse> {
     return this.request<ETLLogsResponse>(`/etl/logs?lines=${lines}`)
   }
+
+  /**
+   * Live ETL progress and logs (Server-Sent Events)
+   * Read with fetch: EventSource cannot send the Authorization header.
+   * `onEvent` receives each event with its id (pass the last one back as
+   * `lastEventId` to resume). Resolves when the server closes the stream,
+   * rejects when the connection drops; abort `signal` to stop.
+   */
+  async streamETL(
+    onEvent: (event: ETLStreamEvent, id?: string) => void,
+    signal: AbortSignal,
+    lastEventId?: string
+  ): Promise<void> {
+    const headers: Record<string, string> = { Accept: 'text/event-stream' }
+
+    const token = localStorage.getItem('access_token')
+    if (token) {
+      headers['Authorization'] = `Bearer ${token}`
+    }
+    if (lastEventId) {
+      headers['Last-Event-ID'] = lastEventId
+    }
+
+    const response = await fetch(`${this.baseURL}/etl/stream`, { headers, signal })
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP ${response.status}`)
+    }
+
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+    let buffer = ''
+
+    while (true) {
+      const { value, done } = await reader.read()
+      if (done) return
+      buffer += value
+
+      // Events are separated by a blank line
+      let end: number
+      while ((end = buffer.indexOf('\n\n')) >= 0) {
+        const block = buffer.slice(0, end)
+        buffer = buffer.slice(end + 2)
+
+        let type = 'message'
+        let data = ''
+        let id: string | undefined
+        for (const line of block.split('\n')) {
+          if (line.startsWith('id: ')) id = line.slice(4)
+          else if (line.startsWith('event: ')) type = line.slice(7)
+          else if (line.startsWith('data: ')) data += line.slice(6)
+        }
+
+        if (data && (type === 'progress' || type === 'log')) {
+          onEvent({ type, data: JSON.parse(data) } as ETLStreamEvent, id)
+        }
+      }
+    }
+  }
 }
 
 export const api = new ApiClient(API_BASE_URL)
@@ -1,19 +1,29 @@
 /**
  * useETL Hook
- * Manages ETL state and polling
+ * Manages ETL state, updated live from /etl/stream
  */
 
 import { useState, useEffect, useCallback } from 'react'
-import { api, ETLStatusResponse, ETLValidationResponse, ETLStartRequest } from '../api'
+import { api, ETLStatusResponse, ETLValidationResponse, ETLStartRequest, ETLStreamEvent } from '../api'
 
-const POLL_INTERVAL = 5000 // 5 seconds
+const RECONNECT_DELAY = 3000 // 3 seconds
+const MAX_LOG_LINES = 500
+
+const EMPTY_STATUS = {
+  progress_percent: 0,
+  files_processed: 0,
+  files_total: 0,
+  records_imported: 0,
+  elapsed_seconds: 0,
+  warnings: [],
+}
 
 export function useETL() {
   const [status, setStatus] = useState<ETLStatusResponse | null>(null)
   const [validation, setValidation] = useState<ETLValidationResponse | null>(null)
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState<string | null>(null)
-  const [polling, setPolling] = useState(false)
+  const [logs, setLogs] = useState<string[]>([])
 
   // Fetch validation
   const validateETL = useCallback(async () => {
@@ -38,24 +48,13 @@ export function useETL() {
     try {
       const result = await api.getETLStatus()
       setStatus(result)
-      
-      // Auto-enable polling if running
-      if (result.status === 'running' && !polling) {
-        setPolling(true)
-      }
-      
-      // Auto-disable polling if completed/error
-      if ((result.status === 'completed' || result.status === 'error') && polling) {
-        setPolling(false)
-      }
-      
       return result
     } catch (err) {
       const message = err instanceof Error ? err.message : 'Erro ao buscar status'
       setError(message)
       throw err
     }
-  }, [polling])
+  }, [])
 
   // Start ETL
   const startETL = useCallback(async (data: ETLStartRequest) => {
@@ -63,15 +62,8 @@ export function useETL() {
     setError(null)
     
     try {
-      const result = await api.startETL(data)
-      
-      // Immediately fetch status
-      await fetchStatus()
-      
-      // Enable polling
-      setPolling(true)
-      
-      return result
+      // Progress arrives through the stream
+      return await api.startETL(data)
     } catch (err) {
       const message = err instanceof Error ? err.message : 'Erro ao iniciar ETL'
       setError(message)
@@ -79,18 +71,43 @@ export function useETL() {
     } finally {
       setLoading(false)
     }
-  }, [fetchStatus])
+  }, [])
 
-  // Polling effect
+  // Live updates (reconnects, resuming after the last event received)
   useEffect(() => {
-    if (!polling) return
+    const controller = new AbortController()
+    // Updated per event: a dropped connection rejects streamETL, and the
+    // reconnect must still resume after the last event received
+    let lastEventId: string | undefined
 
-    const interval = setInterval(() => {
-      fetchStatus()
-    }, POLL_INTERVAL)
+    const onEvent = (event: ETLStreamEvent, id?: string) => {
+      if (id) lastEventId = id
+      if (event.type === 'log') {
+        setLogs((prev) => [...prev, ...event.data].slice(-MAX_LOG_LINES))
+        return
+      }
+      // Snapshots of the same job are merged; a new job starts over
+      setStatus((prev) =>
+        prev && prev.job_id === event.data.job_id
+          ? { ...prev, ...event.data }
+          : ({ ...EMPTY_STATUS, ...event.data } as ETLStatusResponse)
+      )
+    }
+
+    const run = async () => {
+      while (!controller.signal.aborted) {
+        try {
+          await api.streamETL(onEvent, controller.signal, lastEventId)
+        } catch {
+          if (controller.signal.aborted) return
+        }
+        await new Promise((resolve) => setTimeout(resolve, RECONNECT_DELAY))
+      }
+    }
 
-    return () => clearInterval(interval)
-  }, [polling, fetchStatus])
+    run()
+    return () => controller.abort()
+  }, [])
 
   // Initial fetch
   useEffect(() => {
@@ -102,6 +119,7 @@ export function useETL() {
     validation,
     loading,
     error,
+    logs,
     validateETL,
     startETL,
     refresh: fetchStatus,